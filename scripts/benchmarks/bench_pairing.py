@@ -0,0 +1,330 @@
+# -*- coding: utf-8 -*-
+# benchmark of the pairing of screw, nut, thread and hole on synthetic populations, without salome
+#   python benchmarks/bench_pairing.py
+#   python benchmarks/bench_pairing.py --sizes 1000,10000,100000 --max-exponent 1.3
+# License: LGPL v 3.0
+# Autor: Marc DUBOC
+# Version: 19/10/2026
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import tracemalloc
+import numpy as np
+
+SCRIPTS_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if SCRIPTS_PATH not in sys.path:
+    sys.path.append(SCRIPTS_PATH)
+
+# log in the temp dir, not in scripts/log: the logging of the common package is then left as configured here
+LOG_FILE = os.path.join(tempfile.gettempdir(), "bench_pairing.log")
+logging.basicConfig(filename=LOG_FILE, level=logging.DEBUG, format='%(asctime)s %(levelname)s %(message)s')
+
+from common.geometry import Point, Vector
+from common.bolt.pairing import Screw, Nut, Thread, pair_screw_nut_threads, pair_holes, create_virtual_bolt, create_virtual_bolt_from_thread, create_virtual_bolt_from_hole, create_virtual_bolts
+
+# spacing between the fasteners, the model grows with the number of items at constant density
+SPACING = 50.0
+# a distractor is moved this number of tolerances away from a true pair
+NEAR_MISS_FACTOR = 5.0
+# bolts of a flange
+FLANGE_BOLTS = 8
+# gap between the two holes of a pair (washer)
+HOLE_GAP = 0.5
+
+
+def random_axes(rng, n:int) -> np.ndarray:
+    """n random unit vectors of shape (n,3)"""
+    v = rng.normal(size=(n, 3))
+    return v/np.linalg.norm(v, axis=1)[:, None]
+
+
+def normals(axes:np.ndarray) -> np.ndarray:
+    """one unit vector normal to each axis"""
+    ref = np.where(np.abs(axes[:, [0]]) < 0.9, [[1.0, 0.0, 0.0]], [[0.0, 1.0, 0.0]])
+    u = np.cross(axes, ref)
+    return u/np.linalg.norm(u, axis=1)[:, None]
+
+
+def tilted(axes:np.ndarray, angle:float) -> np.ndarray:
+    """the axes rotated by angle (rad) about a normal"""
+    t = np.cos(angle)*axes + np.sin(angle)*normals(axes)
+    return t/np.linalg.norm(t, axis=1)[:, None]
+
+
+def flange_frames(rng, n_flanges:int, extent:float) -> tuple:
+    """origins and axes of FLANGE_BOLTS bolts on a circle of each flange, all parallel to the flange axis"""
+    centers = rng.uniform(-extent, extent, (n_flanges, 3))
+    axes = random_axes(rng, n_flanges)
+    u = normals(axes)
+    v = np.cross(axes, u)
+    radius = rng.uniform(40.0, 200.0, n_flanges)
+    angles = 2*np.pi*np.arange(FLANGE_BOLTS)/FLANGE_BOLTS
+
+    origins = (centers[:, None, :]
+               + radius[:, None, None]*(np.cos(angles)[None, :, None]*u[:, None, :] + np.sin(angles)[None, :, None]*v[:, None, :]))
+    return origins.reshape(-1, 3), np.repeat(axes, FLANGE_BOLTS, axis=0)
+
+
+def _split(n:int, fractions:dict, unit:dict) -> dict:
+    """number of groups of each kind for n items, unit: number of items of a group"""
+    return {k: max(1, int(n*f)//unit[k]) for k, f in fractions.items()}
+
+
+def make_screw_population(n:int, rng, tol_angle:float=0.01, tol_dist:float=0.01) -> dict:
+    """
+    about n screws, nuts and threads:
+        screw/nut stacks and screw/thread stacks with random position and axis,
+        flanges of screw/nut stacks with parallel axes,
+        nuts close to a screw/nut stack, shifted or tilted by NEAR_MISS_FACTOR tolerances
+
+    Returns:
+        dict(screws, nuts, threads, expected=dict(bolts, threads))
+    """
+    counts = _split(n, dict(nut=0.40, thread=0.25, flange=0.20, shifted=0.075, tilted=0.075),
+                    dict(nut=2, thread=2, flange=2*FLANGE_BOLTS, shifted=1, tilted=1))
+    extent = SPACING*n**(1/3)/2
+
+    #1. screw/nut frames, the flanges are screw/nut stacks too
+    o1 = rng.uniform(-extent, extent, (counts["nut"], 3))
+    a1 = random_axes(rng, counts["nut"])
+    o2, a2 = flange_frames(rng, counts["flange"], extent)
+    origins = np.vstack((o1, o2))
+    axes = np.vstack((a1, a2))
+    m = len(origins)
+
+    height = rng.uniform(10.0, 80.0, m)
+    grip = height*rng.uniform(0.3, 0.9, m)
+    radius = rng.uniform(1.5, 12.0, m)
+    nut_height = radius*rng.uniform(1.0, 1.6, m)
+
+    screws = []
+    nuts = []
+    for i in range(m):
+        screws.append(Screw(part_id=f"S{i}", origin=Point(*origins[i]), axis=Vector(*axes[i]), height=height[i],
+                            radius=radius[i], contact_radius=1.6*radius[i]))
+        nuts.append(Nut(part_id=f"N{i}", origin=Point(*(origins[i] + grip[i]*axes[i])), axis=Vector(*axes[i]),
+                        height=nut_height[i], radius=radius[i], contact_radius=1.6*radius[i]))
+
+    #2. screw/thread stacks
+    k = counts["thread"]
+    o3 = rng.uniform(-extent, extent, (k, 3))
+    a3 = random_axes(rng, k)
+    h3 = rng.uniform(10.0, 80.0, k)
+    r3 = rng.uniform(1.5, 12.0, k)
+    engaged = h3*rng.uniform(0.2, 0.6, k)
+    threads = []
+    for i in range(k):
+        start = o3[i] + (h3[i] - engaged[i])*a3[i]
+        screws.append(Screw(part_id=f"S{m+i}", origin=Point(*o3[i]), axis=Vector(*a3[i]), height=h3[i],
+                            radius=r3[i], contact_radius=1.6*r3[i]))
+        threads.append(Thread(part_id=f"T{i}", origin=Point(*start), end=Point(*(start + 2*engaged[i]*a3[i])),
+                              axis=Vector(*a3[i]), height=2*engaged[i], radius=r3[i]))
+
+    #3. near-miss nuts around the screw/nut stacks
+    for kind in ("shifted", "tilted"):
+        idx = rng.integers(0, m, counts[kind])
+        if kind == "shifted":
+            o = origins[idx] + grip[idx, None]*axes[idx] + NEAR_MISS_FACTOR*tol_dist*normals(axes[idx])
+            a = axes[idx]
+        else:
+            o = origins[idx] + grip[idx, None]*axes[idx]
+            a = tilted(axes[idx], NEAR_MISS_FACTOR*tol_angle)
+        for j, i in enumerate(idx):
+            nuts.append(Nut(part_id=f"N{kind}{j}", origin=Point(*o[j]), axis=Vector(*a[j]),
+                            height=nut_height[i], radius=radius[i], contact_radius=1.6*radius[i]))
+
+    return dict(screws=screws, nuts=nuts, threads=threads, expected=dict(bolts=m, threads=k))
+
+
+def make_hole_population(n:int, rng, tol_angle:float=0.01, tol_dist:float=0.01) -> dict:
+    """
+    about n holes:
+        pairs of coaxial holes one after the other with random position and axis,
+        flanges of hole pairs with parallel axes,
+        holes close to a pair, shifted or tilted by NEAR_MISS_FACTOR tolerances,
+        pairs of overlapping coaxial holes, rejected on their extremities distance
+
+    Returns:
+        dict(holes, expected=dict(holes))
+    """
+    counts = _split(n, dict(pair=0.55, flange=0.25, shifted=0.05, tilted=0.05, overlap=0.10),
+                    dict(pair=2, flange=2*FLANGE_BOLTS, shifted=1, tilted=1, overlap=2))
+    extent = SPACING*n**(1/3)/2
+
+    o1 = rng.uniform(-extent, extent, (counts["pair"], 3))
+    a1 = random_axes(rng, counts["pair"])
+    o2, a2 = flange_frames(rng, counts["flange"], extent)
+    origins = np.vstack((o1, o2))
+    axes = np.vstack((a1, a2))
+    m = len(origins)
+
+    h0 = rng.uniform(5.0, 40.0, m)
+    h1 = rng.uniform(5.0, 40.0, m)
+    r0 = rng.uniform(1.5, 12.0, m)
+    # one pair out of two is a screw and a thread: different radius
+    r1 = np.where(rng.random(m) < 0.5, r0, r0*0.8)
+
+    def hole(name, origin, axis, height, radius):
+        return Thread(part_id=name, origin=Point(*origin), end=Point(*(origin + height*axis)),
+                      axis=Vector(*axis), height=height, radius=radius)
+
+    holes = []
+    for i in range(m):
+        holes.append(hole(f"H{i}a", origins[i], axes[i], h0[i], r0[i]))
+        holes.append(hole(f"H{i}b", origins[i] + (h0[i] + HOLE_GAP)*axes[i], axes[i], h1[i], r1[i]))
+
+    for kind in ("shifted", "tilted"):
+        idx = rng.integers(0, m, counts[kind])
+        if kind == "shifted":
+            o = origins[idx] + (h0[idx, None] + HOLE_GAP)*axes[idx] + NEAR_MISS_FACTOR*tol_dist*normals(axes[idx])
+            a = axes[idx]
+        else:
+            o = origins[idx] + (h0[idx, None] + HOLE_GAP)*axes[idx]
+            a = tilted(axes[idx], NEAR_MISS_FACTOR*tol_angle)
+        for j, i in enumerate(idx):
+            holes.append(hole(f"H{kind}{j}", o[j], a[j], h1[i], r1[i]))
+
+    k = counts["overlap"]
+    o3 = rng.uniform(-extent, extent, (k, 3))
+    a3 = random_axes(rng, k)
+    h3 = rng.uniform(10.0, 40.0, k)
+    for i in range(k):
+        holes.append(hole(f"O{i}a", o3[i], a3[i], h3[i], 5.0))
+        holes.append(hole(f"O{i}b", o3[i] + 0.25*h3[i]*a3[i], a3[i], 0.5*h3[i], 5.0))
+
+    return dict(holes=holes, expected=dict(holes=m))
+
+
+def scalar_bolts(connections:dict) -> list:
+    """virtual bolts built pair by pair with create_virtual_bolt*"""
+    builders = dict(bolts=create_virtual_bolt, threads=create_virtual_bolt_from_thread, holes=create_virtual_bolt_from_hole)
+    res = []
+    for kind, func in builders.items():
+        for p in connections.get(kind, []):
+            prop = func(p)
+            if prop is not None:
+                res.append(prop)
+    return res
+
+
+def compare_bolts(vectorized:list, scalar:list, tol:float=1e-6) -> int:
+    """number of bolts of create_virtual_bolts that differ from create_virtual_bolt* (endpoints and radii)"""
+    if len(vectorized) != len(scalar):
+        return abs(len(vectorized) - len(scalar))
+    mismatches = 0
+    for (_, _, a), b in zip(vectorized, scalar):
+        same = all(np.allclose(a[k].get_coordinate(), b[k].get_coordinate(), atol=tol) for k in ("start", "end"))
+        same &= all(np.isclose(a[k], b[k], atol=tol) for k in ("radius", "start_radius", "end_radius"))
+        mismatches += not same
+    return mismatches
+
+
+def measure(func, repeat:int=3) -> tuple:
+    """return (result, best time in s, peak memory in bytes), the memory is measured on an extra run"""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        res = func()
+        best = min(best, time.perf_counter() - t0)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return res, best, peak
+
+
+def run_size(n:int, seed:int=0, repeat:int=3, tol_angle:float=0.01, tol_dist:float=0.01) -> dict:
+    """benchmark the pairing and the builders of the screw and hole populations of n items"""
+    rng = np.random.default_rng(seed)
+    res = dict()
+
+    pop = make_screw_population(n, rng, tol_angle, tol_dist)
+    items = len(pop["screws"]) + len(pop["nuts"]) + len(pop["threads"])
+    connections, t, mem = measure(lambda: pair_screw_nut_threads(pop["screws"], pop["nuts"], pop["threads"], tol_angle=tol_angle, tol_dist=tol_dist), repeat)
+    found = dict(bolts=len(connections["bolts"]), threads=len(connections["threads"]))
+    res["pair_screw_nut_threads"] = dict(items=items, time=t, memory=mem, pairs=found, expected=pop["expected"])
+    screw_connections = connections
+
+    pop = make_hole_population(n, rng, tol_angle, tol_dist)
+    items = len(pop["holes"])
+    connections, t, mem = measure(lambda: pair_holes(pop["holes"], tol_angle=tol_angle, tol_dist=tol_dist), repeat)
+    res["pair_holes"] = dict(items=items, time=t, memory=mem, pairs=dict(holes=len(connections["holes"])), expected=pop["expected"])
+
+    connections = dict(screw_connections, holes=connections["holes"])
+    n_pairs = sum(len(v) for v in connections.values())
+    bolts, t, mem = measure(lambda: create_virtual_bolts(connections), repeat)
+    res["create_virtual_bolts"] = dict(items=n_pairs, time=t, memory=mem, pairs=dict(bolts=len(bolts)))
+    scalar, t, mem = measure(lambda: scalar_bolts(connections), repeat)
+    res["create_virtual_bolt*"] = dict(items=n_pairs, time=t, memory=mem, pairs=dict(bolts=len(scalar)))
+    res["create_virtual_bolts"]["mismatches"] = compare_bolts(bolts, scalar)
+
+    return res
+
+
+def growth_exponent(items:list, times:list) -> float:
+    """slope of log(time) against log(items), 1 for a linear stage"""
+    if len(items) < 2:
+        return float("nan")
+    return float(np.polyfit(np.log(items), np.log(np.maximum(times, 1e-9)), 1)[0])
+
+
+def main(argv:list=None) -> int:
+    parser = argparse.ArgumentParser(description="benchmark of the fastener pairing on synthetic populations")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="comma separated number of items")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per stage, the best is kept")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tol-angle", type=float, default=0.01)
+    parser.add_argument("--tol-dist", type=float, default=0.01)
+    parser.add_argument("--max-exponent", type=float, default=1.3,
+                        help="fail if the time of a stage grows faster than items**max_exponent")
+    parser.add_argument("--json", help="write the results in a json file")
+    parser.add_argument("--log", action="store_true", help=f"keep the info messages of the pairing in {LOG_FILE}")
+    args = parser.parse_args(argv)
+
+    if not args.log:
+        logging.disable(logging.INFO)
+
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+    results = dict()
+    failures = []
+
+    print(f"{'stage':<24}{'size':>8}{'items':>9} {'pairs':>27}{'time (s)':>11}{'items/s':>12}{'peak (MB)':>11}")
+    for n in sizes:
+        results[n] = run_size(n, seed=args.seed, repeat=args.repeat, tol_angle=args.tol_angle, tol_dist=args.tol_dist)
+        for stage, r in results[n].items():
+            pairs = ", ".join(f"{k}={v}" for k, v in r["pairs"].items())
+            print(f"{stage:<24}{n:>8}{r['items']:>9} {pairs:>27}{r['time']:>11.4f}{r['items']/max(r['time'], 1e-9):>12.0f}{r['memory']/2**20:>11.2f}")
+            if "expected" in r and r["pairs"] != r["expected"]:
+                failures.append(f"{stage} n={n}: {r['pairs']} pairs found, {r['expected']} expected")
+
+        mismatches = results[n]["create_virtual_bolts"]["mismatches"]
+        if mismatches:
+            failures.append(f"create_virtual_bolts n={n}: {mismatches} bolts differ from create_virtual_bolt* (endpoints or radii)")
+
+    #complexity guard
+    print()
+    for stage in results[sizes[0]]:
+        items = [results[n][stage]["items"] for n in sizes]
+        times = [results[n][stage]["time"] for n in sizes]
+        exponent = growth_exponent(items, times)
+        print(f"{stage:<24} growth exponent {exponent:.2f}")
+        if exponent > args.max_exponent:
+            failures.append(f"{stage}: time grows as items**{exponent:.2f} (maximum {args.max_exponent})")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({str(n): r for n, r in results.items()}, f, indent=4)
+
+    for msg in failures:
+        print(f"FAILED {msg}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
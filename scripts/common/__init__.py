@@ -5,9 +5,13 @@ import logging
 #Logging
 PATH = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
 LOG_FILE = os.path.join(PATH, '..' ,'log', 'debug.log')
+os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
 LOG_LEVEL = logging.DEBUG
 logging.basicConfig(filename=LOG_FILE, level=LOG_LEVEL, format='%(asctime)s %(levelname)s %(message)s')
 
+#Cache folder, created on first save
+CACHE_PATH = os.path.join(PATH, '..', 'cache')
+
 #Gui image folder
 ROOT_PATH= os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
 IMG_PATH = os.path.join(ROOT_PATH, 'img')
\ No newline at end of file
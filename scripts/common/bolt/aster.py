@@ -5,10 +5,14 @@
 # Version: 28/08/2023
 
 import numpy as np
+from functools import lru_cache
 from collections import defaultdict 
 from common.bolt.data import VirtualBolt
 #from common import logging
 
+# number of bolts whose comm fragments are kept between two exports
+BOLT_FRAGMENTS_CACHE_SIZE = 16384
+
 class MakeComm:
 
     start_rbe="PROP = AFFE_CARA_ELEM(POUTRE=("
@@ -112,103 +116,108 @@ class MakeComm:
                  "   TOUT_ORDRE='OUI'),\n")
         return post
     
-    def write_concept(self,start:str, end:str, data:str):
-        sz = len(start)
+    @staticmethod
+    def _indent(data:str, sz:int) -> str:
+        """indent all the lines of data by sz spaces"""
+        pad = ' '*sz
+        return ''.join(pad + line + '\n' for line in data.splitlines())
 
-        dataline = data.splitlines()
-        data_spaced = start
-        for i in range(len(dataline)):
-            if i == 0:
-                data_spaced += dataline[i] + '\n'
+    @staticmethod
+    @lru_cache(maxsize=BOLT_FRAGMENTS_CACHE_SIZE, typed=True)
+    def bolt_fragments(ma_bolt:str, start_name:str, end_name:str, radius:float, start_radius:float, start_height:float,
+                       end_radius:float, end_height:float, preload:float) -> dict:
+        """
+        indented fragments of a bolt for each concept, memoized on the bolt parameters:
+        an export after editing one bolt only regenerates the fragments of this bolt.
+        The returned dict is shared, it must not be modified
+        """
+        grp_no_start = start_name+"S"
+        grp_no_end = end_name+"S"
+
+        no = (MakeComm.str_defi_group_tunnel(ma_bolt, start_name, start_height, start_radius, grp_no_start)
+              + MakeComm.str_defi_group_tunnel(ma_bolt, end_name, end_height, end_radius, grp_no_end))
+        rbe = MakeComm.str_rbe3(grp_no_start, start_name) + MakeComm.str_rbe3(grp_no_end, end_name)
+
+        return dict(BOLTS_NO=MakeComm._indent(no, len(MakeComm.start_no)),
+                    BOLTS_RBE=MakeComm._indent(rbe, len(MakeComm.start_rbe)),
+                    BOLTS_PRE=MakeComm._indent(MakeComm.str_pre_espi(ma_bolt, radius, preload, 2.1e5), len(MakeComm.start_pre)),
+                    BOLTS_RELEVE=MakeComm._indent(MakeComm.str_post_releve_t(ma_bolt), len(MakeComm.start_releve)))
+
+    def iter_concept(self, start:str, end:str, blocks):
+        """
+        yield a concept: start then the blocks then end
+        the blocks are already indented by len(start), the first line is written after start
+        """
+        sz = len(start)
+        first = True
+        for block in blocks:
+            if first:
+                yield start + block[sz:]
+                first = False
             else:
-                data_spaced += ' '*sz + dataline[i] + '\n'
+                yield block
 
-        end = end.splitlines()
-        for i in range(len(end)):
-            data_spaced += ' '*sz + end[i] + '\n'
-        return data_spaced
-    
-    def process(self, bolts:list) -> str:
-        comm = dict(BOLTS_NO="", 
-                    BOLTS_MODELE="",
-                    BOLTS_PROP="" , 
-                    BOLTS_RBE="",
-                    BOLTS_PRE="",
-                    BOLTS_ELNO="",
-                    BOLTS_RELEVE="",)
+        if first:
+            yield start
+        yield self._indent(end, sz)
+
+    def write_concept(self,start:str, end:str, data:str):
+        return ''.join(self.iter_concept(start, end, [self._indent(data, len(start))]))
+
+    def iter_blocks(self, bolts:list):
+        """yield (key, start, end, blocks) of each concept, the blocks are generated on demand"""
+        fragments = []
         grp_bolt_name=[]
-        grp_bolt_size=defaultdict() # {radius_str: [bolt_name_1,bolt_name_2,...]}
+        grp_bolt_size=defaultdict(list) # {radius_str: [bolt_name_1,bolt_name_2,...]}
 
         for bolt in bolts:
             if isinstance(bolt,VirtualBolt):
-
-                # group name
                 ma_bolt = bolt.get_bolt_name()
-                start_name = bolt.get_start_name()
-                end_name = bolt.get_end_name()
                 grp_bolt_name.append(ma_bolt)
-
-                # variable
-                radius = bolt.radius
-                start_radius = bolt.start_radius
-                start_height = bolt.start_height
-                end_radius = bolt.end_radius
-                end_height = bolt.end_height
-                preload = bolt.preload
-                
-                grp_no_start = bolt.get_start_name()+"S"
-                grp_no_end = bolt.get_end_name()+"S"
-
-                # group size
-                if str(radius) not in grp_bolt_size:
-                    grp_bolt_size[str(radius)] = [ma_bolt]
-                else:
-                    grp_bolt_size[str(radius)].append(ma_bolt)
-
-                
-                comm["BOLTS_NO"] += MakeComm.str_defi_group_tunnel(ma_bolt, 
-                                                             start_name, 
-                                                             start_height, 
-                                                             start_radius, 
-                                                             grp_no_start)
-
-                comm["BOLTS_NO"] += MakeComm.str_defi_group_tunnel(ma_bolt, 
-                                                             end_name, 
-                                                             end_height, 
-                                                             end_radius, 
-                                                             grp_no_end)
-                
-                comm["BOLTS_PRE"] += MakeComm.str_pre_espi(ma_bolt, radius, preload, 2.1e5)
-
-                comm["BOLTS_RBE"] += MakeComm.str_rbe3(grp_no_start, start_name)
-
-                comm["BOLTS_RBE"] += MakeComm.str_rbe3(grp_no_end, end_name)
-
-                comm["BOLTS_RELEVE"] += MakeComm.str_post_releve_t(ma_bolt)
-
-                
-        comm["BOLTS_MODELE"] += MakeComm.str_affe_model(grp_bolt_name)
-        comm["BOLTS_ELNO"] += MakeComm.str_bolts_elno(grp_bolt_name)
-
-        for k,v in grp_bolt_size.items():
-            comm["BOLTS_PROP"]+= MakeComm.str_affe_cara(v, float(k))
-
-        # add begining and end string
-        comm["BOLTS_NO"] = self.write_concept(self.start_no, self.end_no, comm["BOLTS_NO"])
-        comm["BOLTS_MODELE"] = self.write_concept(self.start_model, self.end_model, comm["BOLTS_MODELE"])
-        comm["BOLTS_PROP"] = self.write_concept(self.start_prop, self.end_prop, comm["BOLTS_PROP"])
-        comm["BOLTS_RBE"] = self.write_concept(self.start_rbe, self.end_rbe, comm["BOLTS_RBE"])
-        comm["BOLTS_PRE"] = self.write_concept(self.start_pre, self.end_pre, comm["BOLTS_PRE"])
-        comm["BOLTS_ELNO"] = self.write_concept(self.start_elno, self.end_elno, comm["BOLTS_ELNO"])
-        comm["BOLTS_RELEVE"] = self.write_concept(self.start_releve, self.end_releve, comm["BOLTS_RELEVE"])
-        
+                grp_bolt_size[str(bolt.radius)].append(ma_bolt)
+                fragments.append(MakeComm.bolt_fragments(ma_bolt,
+                                                         bolt.get_start_name(),
+                                                         bolt.get_end_name(),
+                                                         bolt.radius,
+                                                         bolt.start_radius,
+                                                         bolt.start_height,
+                                                         bolt.end_radius,
+                                                         bolt.end_height,
+                                                         bolt.preload))
+
+        yield "BOLTS_NO", self.start_no, self.end_no, (f["BOLTS_NO"] for f in fragments)
+        yield ("BOLTS_MODELE", self.start_model, self.end_model,
+               [self._indent(MakeComm.str_affe_model(grp_bolt_name), len(self.start_model))])
+        yield ("BOLTS_PROP", self.start_prop, self.end_prop,
+               (self._indent(MakeComm.str_affe_cara(v, float(k)), len(self.start_prop)) for k,v in grp_bolt_size.items()))
+        yield "BOLTS_RBE", self.start_rbe, self.end_rbe, (f["BOLTS_RBE"] for f in fragments)
+        yield "BOLTS_PRE", self.start_pre, self.end_pre, (f["BOLTS_PRE"] for f in fragments)
+        yield ("BOLTS_ELNO", self.start_elno, self.end_elno,
+               [self._indent(MakeComm.str_bolts_elno(grp_bolt_name), len(self.start_elno))])
+        yield "BOLTS_RELEVE", self.start_releve, self.end_releve, (f["BOLTS_RELEVE"] for f in fragments)
+
+    def process(self, bolts:list) -> dict:
+        comm = dict()
+        for key, start, end, blocks in self.iter_blocks(bolts):
+            comm[key] = ''.join(self.iter_concept(start, end, blocks))
         return comm
     
     def to_str(self, comm:dict) -> str:
-        str_comm = ""
+        str_comm = []
         for key, value in comm.items():
-            str_comm += f"# {key}====================================================\n"
-            str_comm += f"{value}\n\n"
+            str_comm.append(f"# {key}====================================================\n")
+            str_comm.append(f"{value}\n\n")
             
-        return str_comm
-    
\ No newline at end of file
+        return ''.join(str_comm)
+
+    def iter_comm(self, bolts:list):
+        """yield the comm file of the bolts piece by piece, same text as to_str(process(bolts))"""
+        for key, start, end, blocks in self.iter_blocks(bolts):
+            yield f"# {key}====================================================\n"
+            yield from self.iter_concept(start, end, blocks)
+            yield "\n\n"
+
+    def write(self, f, bolts:list):
+        """write the comm file of the bolts in the file object f, without building the whole text"""
+        for piece in self.iter_comm(bolts):
+            f.write(piece)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# spatial hash of axis lines, used to pair screw, nut, thread and hole
+# License: LGPL v 3.0
+# Autor: Marc DUBOC
+# Version: 19/10/2026
+
+import numpy as np
+from itertools import product
+from collections import defaultdict
+
+
+def axis_arrays(items:list):
+    """return the origins and the unit axes of a list of items (Screw, Nut, Thread...) as arrays of shape (n,3)
+
+    items with a null axis get a nan axis, they are never colinear
+    """
+    origins = np.array([it.origin.get_coordinate() for it in items], dtype=np.float64).reshape(-1, 3)
+    axes = np.array([it.axis.get_vector() for it in items], dtype=np.float64).reshape(-1, 3)
+    norm = np.linalg.norm(axes, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        axes = axes/norm[:, None]
+    return origins, axes
+
+
+def sign_normalize(axes:np.ndarray) -> np.ndarray:
+    """flip the axes so that their first non null component is positive"""
+    n = len(axes)
+    idx = np.argmax(np.abs(axes) > 1e-9, axis=1)
+    sign = np.sign(axes[np.arange(n), idx])
+    sign[sign == 0] = 1
+    return axes*sign[:, None]
+
+
+class AxisIndex():
+    """
+    Spatial hash of axis lines
+
+    Each axis is reduced to a canonical line key: the sign normalized direction and the foot of the
+    perpendicular from a reference point, both quantized. Two axes accepted by
+    pairing.AxisCoincidence.are_axis_colinear always fall in the same or in neighbouring buckets,
+    so only these candidates have to be checked.
+
+    The buckets are twice the tolerances: the direction of colinear axes differ by less than tol_angle
+    (per component), their foot points by less than tol_dist + tol_angle*extent where extent is the
+    largest distance between an origin and the reference point.
+
+    attributes:
+        tol_angle: float
+        tol_dist: float
+        reference: np.ndarray, reference point (center of the origins)
+        buckets: dict {key: [item index,...]}
+
+    methods:
+        candidates: indices of the items possibly colinear with an axis
+        pairs: candidate pairs (query index, item index) sorted as itertools.product
+        self_pairs: candidate pairs (i, j) with i < j sorted as itertools.combinations
+    """
+
+    def __init__(self, items:list, tol_angle:float=0.01, tol_dist:float=0.01, queries:list=None):
+        self.tol_angle = tol_angle
+        self.tol_dist = tol_dist
+        self.origins, self.axes = axis_arrays(items)
+
+        # the reference frame is shared by the items and the queries
+        all_origins = self.origins
+        if queries:
+            all_origins = np.vstack((all_origins, axis_arrays(queries)[0]))
+
+        if len(all_origins):
+            self.reference = all_origins.mean(axis=0)
+            extent = np.max(np.linalg.norm(all_origins - self.reference, axis=1))
+        else:
+            self.reference = np.zeros(3)
+            extent = 0.0
+
+        # cell size are twice the tolerance: a neighbour can only be in the closest adjacent cell
+        angle = tol_angle + 1e-5*np.pi + 1e-9
+        self.dir_cell = 2*angle
+        self.foot_cell = 2*(tol_dist + angle*extent + 1e-9)
+
+        self.buckets = defaultdict(list)
+        valid = np.all(np.isfinite(self.axes), axis=1)
+        if np.any(valid):
+            keys = self._keys(self.origins[valid], sign_normalize(self.axes[valid]))
+            for i, k in zip(np.flatnonzero(valid), map(tuple, keys)):
+                self.buckets[k].append(int(i))
+
+    def _scaled(self, origins:np.ndarray, axes:np.ndarray) -> np.ndarray:
+        """direction and foot point of the lines, in cell units, as array of shape (n,6)"""
+        vec = origins - self.reference
+        foot = vec - np.sum(vec*axes, axis=1)[:, None]*axes
+        return np.hstack((axes/self.dir_cell, foot/self.foot_cell))
+
+    def _keys(self, origins:np.ndarray, axes:np.ndarray) -> np.ndarray:
+        return np.floor(self._scaled(origins, axes)).astype(np.int64)
+
+    def _neighbour_keys(self, origin:np.ndarray, axis:np.ndarray) -> set:
+        """keys of the cell and of the closest adjacent cell in each dimension, for both directions"""
+        keys = set()
+        for a in (axis, -axis):
+            scaled = self._scaled(origin[None, :], a[None, :])[0]
+            cell = np.floor(scaled)
+            side = np.where(scaled - cell < 0.5, -1, 1)
+            choices = [(int(c), int(c + s)) for c, s in zip(cell, side)]
+            keys.update(product(*choices))
+        return keys
+
+    def candidates(self, origin, axis) -> list:
+        """return the sorted indices of the items possibly colinear with the line (origin, axis)"""
+        axis = np.asarray(axis, dtype=np.float64)
+        norm = np.linalg.norm(axis)
+        if not np.isfinite(norm) or norm == 0:
+            return []
+        axis = axis/norm
+        origin = np.asarray(origin, dtype=np.float64)
+
+        res = set()
+        for k in self._neighbour_keys(origin, axis):
+            if k in self.buckets:
+                res.update(self.buckets[k])
+        return sorted(res)
+
+    def pairs(self, queries:list) -> list:
+        """return the candidate pairs (query index, item index), in the order of itertools.product(queries, items)"""
+        res = []
+        for i, q in enumerate(queries):
+            for j in self.candidates(q.origin.get_coordinate(), q.axis.get_vector()):
+                res.append((i, j))
+        return res
+
+    def self_pairs(self) -> list:
+        """return the candidate pairs (i, j) of the items with i < j, in the order of itertools.combinations(items, 2)"""
+        res = []
+        for i in range(len(self.origins)):
+            for j in self.candidates(self.origins[i], self.axes[i]):
+                if j > i:
+                    res.append((i, j))
+        return res
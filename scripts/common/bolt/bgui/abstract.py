@@ -124,11 +124,17 @@ class HideShowDelegate(QItemDelegate):
 
 class TableModel(QAbstractTableModel):
     updateBolt = pyqtSignal(int,float,float,float,float,float,float)  # Signal avec l'ID de la ligne en argument
+    updateBolts = pyqtSignal(list,dict)  # ids of the rows and bolt properties changed
+
+    # bolt property of the editable columns
+    column_keys = {1:'radius', 2:'start_radius', 3:'end_radius', 4:'start_height', 5:'end_height', 6:'preload'}
 
     def __init__(self, data, header=None):
         super().__init__()
         self._data = data
         self.header=['ID','R(mm)','Rs(mm)','Re(mm)','Ss(mm)','Se(mm)','Fp(kN)','Delete']
+        # selection model of the view, an edit is applied to all the selected rows
+        self.selection_model = None
 
     def rowCount(self, parent=QModelIndex()):
         return len(self._data)
@@ -148,11 +154,37 @@ class TableModel(QAbstractTableModel):
             except IndexError:
                 return ''
 
+    def selected_rows(self, index) -> list:
+        """rows to edit: the selected rows if the edited row is part of a multi rows selection"""
+        if self.selection_model is None:
+            return [index.row()]
+        rows = sorted(set(i.row() for i in self.selection_model.selectedIndexes()))
+        if len(rows) > 1 and index.row() in rows:
+            return rows
+        return [index.row()]
+
+    def setDataRows(self, rows:list, column:int, value):
+        """set the same value in a column of several rows, the bolts are updated with one signal"""
+        if value in ('',' ') or column not in self.column_keys:
+            return False
+        for r in rows:
+            self._data[r][column] = value
+        self.dataChanged.emit(self.index(min(rows), column), self.index(max(rows), column))
+
+        ids = [int(self._data[r][0]) for r in rows]
+        self.updateBolts.emit(ids, {self.column_keys[column]: float(value)})
+        return True
+
     def setData(self, index, value, role=Qt.EditRole):		
         if role in (Qt.DisplayRole, Qt.EditRole):
             # if value is blank
             if value in ('',' '):
                 return False
+
+            rows = self.selected_rows(index)
+            if len(rows) > 1:
+                return self.setDataRows(rows, index.column(), value)
+
             self._data[index.row()][index.column()] = value
             self.dataChanged.emit(index, index)
             # get the id from the data model
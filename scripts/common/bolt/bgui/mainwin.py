@@ -23,6 +23,7 @@ class BoltGUI(QWidget):
     select = pyqtSignal()
     parse = pyqtSignal(QVariant,float,float,float,float)
     select_root = pyqtSignal()
+    cancel = pyqtSignal()
     
     closing = pyqtSignal()
     export_bolt = pyqtSignal(str,str)
@@ -169,6 +170,10 @@ class BoltGUI(QWidget):
         #create process button
         self.bt_search = QPushButton("Search", self)
 
+        #create cancel button, enabled while searching
+        self.bt_cancel = QPushButton("Cancel", self)
+        self.bt_cancel.setEnabled(False)
+
         # creater progress bar
         self.pb_search = QProgressBar(self)
         self.pb_search.setMinimum(0)
@@ -179,6 +184,7 @@ class BoltGUI(QWidget):
         #create hbox for progress bar and button
         self.searchbox = QHBoxLayout()
         self.searchbox.addWidget(self.bt_search)
+        self.searchbox.addWidget(self.bt_cancel)
         self.searchbox.addWidget(self.pb_search)
 
         self.vbox_1 = QVBoxLayout()
@@ -204,6 +210,11 @@ class BoltGUI(QWidget):
         self.cb_export_json = QCheckBox("Raw format (*.json)", self)
         self.cb_export_json.setChecked(False)
 
+        # create checkbox for the binary columnar export, with the raw format
+        self.cb_export_binary = QCheckBox("Binary columnar format (*.col)", self)
+        self.cb_export_binary.setChecked(False)
+        self.cb_export_binary.setEnabled(False)
+
         #create groupbox for export ASTER comm
         self.gp_export_comm = QGroupBox("Aster format (*.comm)", self)
         self.gp_export_comm.setCheckable(True)
@@ -221,6 +232,7 @@ class BoltGUI(QWidget):
         #add checkbox in a horizontal layout
         self.hbox_3 = QVBoxLayout()
         self.hbox_3.addWidget(self.cb_export_json)
+        self.hbox_3.addWidget(self.cb_export_binary)
         self.hbox_3.addWidget(self.gp_export_comm)
 
         # put the bouton in a horizontal layout
@@ -250,6 +262,7 @@ class BoltGUI(QWidget):
         # connect signals
         self.bt_input.clicked.connect(self.select.emit)
         self.bt_search.clicked.connect(self.on_search)
+        self.bt_cancel.clicked.connect(self.cancel.emit)
         self.bt_root.clicked.connect(self.select_root.emit)
 
         self.bt_export.clicked.connect(self.select_file)
@@ -278,6 +291,11 @@ class BoltGUI(QWidget):
         self.pb_search.setValue(value)
         self.pb_search.setFormat(f"{value}%")
 
+        # search running between 0 and 100, it can be cancelled
+        running = 0 < value < 100
+        self.bt_search.setEnabled(not running)
+        self.bt_cancel.setEnabled(running)
+
     @pyqtSlot()
     def on_method_change_screw(self):
         if self.cb_screw.isChecked():
@@ -301,11 +319,14 @@ class BoltGUI(QWidget):
     def select_file(self):
         options = QFileDialog.Options()
         options |= QFileDialog.DontUseNativeDialog
-        name, _ = QFileDialog.getSaveFileName(self, "Export file","","Json (*.json);Comm (*.comm)", options=options)
+        name, _ = QFileDialog.getSaveFileName(self, "Export file","","Json (*.json);Comm (*.comm);Columnar (*.col)", options=options)
         if name:
             if self.gp_export_comm.isChecked():
                 export = 'ASTER'
                 format = '.comm'
+            elif self.cb_export_binary.isChecked():
+                export = 'BINARY'
+                format = '.col'
             else:
                 export = 'RAW'
                 format = '.json'
@@ -317,16 +338,12 @@ class BoltGUI(QWidget):
             
             self.le_export.setText(name)
             self.file_name = name
-            
-            if self.gp_export_comm.isChecked():
-                export = 'ASTER'
-            else:
-                export = 'RAW'
-                
+
             self.export_bolt.emit(name,export)
 
     @pyqtSlot(int)
     def on_change_export_json(self):
+        self.cb_export_binary.setEnabled(self.cb_export_json.isChecked())
         if self.cb_export_json.isChecked():
             self.gp_export_comm.setChecked(False)
         else:
@@ -357,6 +374,7 @@ class BoltGUI(QWidget):
         if len(data) > 0:
             self.model = TableModel(data)
             self.table_view.setModel(self.model)  
+            self.model.selection_model = self.table_view.selectionModel()
 
             header = self.table_view.horizontalHeader()
             header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
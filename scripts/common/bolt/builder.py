@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+# vectorized construction of the virtual bolts from paired screw, nut, thread and hole, independent of salome
+# License: LGPL v 3.0
+# Autor: Marc DUBOC
+# Version: 19/10/2026
+
+import os
+import json
+import numpy as np
+from common.geometry import Point
+
+# nominal diameters used to snap the hole diameters when bolt_diameter.json is missing, sorted
+COMMON_BOLT_DIAMETERS = np.array([2,3,3.5,4,5,6,8,10,12,14,16,20,24,30,36,42,48,56,64,72,80,90,100], dtype=np.float64)
+FACTOR_DIAMETER_TO_HEAD = 1.6
+
+BOLT_DIAMETER_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bolt_diameter.json")
+
+BOLT_DTYPE = np.dtype([("start", np.float64, (3,)),
+                       ("end", np.float64, (3,)),
+                       ("radius", np.float64),
+                       ("start_radius", np.float64),
+                       ("start_height", np.float64),
+                       ("end_radius", np.float64),
+                       ("end_height", np.float64),
+                       ("valid", np.bool_)])
+
+
+def load_bolt_diameters(path:str=BOLT_DIAMETER_FILE) -> np.ndarray:
+    """return the sorted nominal diameters (M) of a bolt diameter json file"""
+    with open(path, "r") as f:
+        data = json.load(f)
+    return np.unique(np.array([d["M"] for d in data], dtype=np.float64))
+
+
+_bolt_diameters = None
+
+def bolt_diameters() -> np.ndarray:
+    """return the nominal diameters of bolt_diameter.json, read once, COMMON_BOLT_DIAMETERS if the file is missing"""
+    global _bolt_diameters
+    if _bolt_diameters is None:
+        try:
+            _bolt_diameters = load_bolt_diameters()
+        except FileNotFoundError:
+            _bolt_diameters = COMMON_BOLT_DIAMETERS
+    return _bolt_diameters
+
+
+def snap_diameters(diameters:np.ndarray, table:np.ndarray=None) -> np.ndarray:
+    """return the closest value of the sorted table (default: bolt_diameters) for each diameter, the smallest one on a tie"""
+    if table is None:
+        table = bolt_diameters()
+    diameters = np.asarray(diameters, dtype=np.float64)
+    table = np.asarray(table, dtype=np.float64)
+    right = np.clip(np.searchsorted(table, diameters), 0, len(table)-1)
+    left = np.clip(right-1, 0, len(table)-1)
+    use_left = np.abs(diameters - table[left]) <= np.abs(table[right] - diameters)
+    return np.where(use_left, table[left], table[right])
+
+
+def _closest(origin:np.ndarray, candidates:np.ndarray) -> np.ndarray:
+    """return for each row the candidate closest to origin, candidates of shape (n,k,3), the first one on a tie"""
+    dist = np.linalg.norm(candidates - origin[:, None, :], axis=2)
+    idx = np.argmin(dist, axis=1)
+    return candidates[np.arange(len(candidates)), idx]
+
+
+def bolts_from_screw_nut(screw_origin, screw_radius, screw_contact_radius,
+                         nut_origin, nut_axis, nut_height, nut_contact_radius) -> np.ndarray:
+    """
+    virtual bolts of n screw/nut pairs, batch version of shape.create_virtual_bolt
+
+    the bolt goes from the screw origin to the closest extremity of the nut
+
+    Args:
+        arrays of shape (n,3) for the points and axes, (n,) for the scalars
+
+    Returns:
+        np.ndarray of BOLT_DTYPE
+    """
+    screw_origin = np.asarray(screw_origin, dtype=np.float64).reshape(-1, 3)
+    nut_origin = np.asarray(nut_origin, dtype=np.float64).reshape(-1, 3)
+    nut_axis = np.asarray(nut_axis, dtype=np.float64).reshape(-1, 3)
+    nut_height = np.asarray(nut_height, dtype=np.float64)
+
+    nut_ext = np.stack((nut_origin, nut_origin + nut_axis*nut_height[:, None]), axis=1)
+
+    res = np.zeros(len(screw_origin), dtype=BOLT_DTYPE)
+    res["start"] = screw_origin
+    res["end"] = _closest(screw_origin, nut_ext)
+    res["radius"] = screw_radius
+    res["start_radius"] = screw_contact_radius
+    res["start_height"] = 1.0
+    res["end_radius"] = nut_contact_radius
+    res["end_height"] = -1.0
+    res["valid"] = True
+    return res
+
+
+def bolts_from_screw_thread(screw_origin, screw_height, screw_radius, screw_contact_radius,
+                            thread_origin, thread_end, thread_height, thread_radius) -> np.ndarray:
+    """
+    virtual bolts of n screw/thread pairs, batch version of shape.create_virtual_bolt_from_thread
+
+    the bolt goes from the screw origin to the closest extremity of the thread, the engaged
+    height is the part of the screw beyond this extremity, limited to the thread height.
+    Pairs with the screw origin on the thread extremity or without engagement are not valid.
+    """
+    screw_origin = np.asarray(screw_origin, dtype=np.float64).reshape(-1, 3)
+    screw_height = np.asarray(screw_height, dtype=np.float64)
+    thread_height = np.asarray(thread_height, dtype=np.float64)
+    thread_ext = np.stack((np.asarray(thread_origin, dtype=np.float64).reshape(-1, 3),
+                           np.asarray(thread_end, dtype=np.float64).reshape(-1, 3)), axis=1)
+
+    end = _closest(screw_origin, thread_ext)
+    coincident = np.all(np.isclose(screw_origin, end, atol=0.1), axis=1)
+    remaining = screw_height - np.linalg.norm(screw_origin - end, axis=1)
+
+    res = np.zeros(len(screw_origin), dtype=BOLT_DTYPE)
+    res["start"] = screw_origin
+    res["end"] = end
+    res["radius"] = screw_radius
+    res["start_radius"] = screw_contact_radius
+    res["start_height"] = 1.0
+    res["end_radius"] = thread_radius
+    res["end_height"] = np.where(remaining > thread_height, thread_height, remaining)
+    res["valid"] = ~coincident & (remaining > 0)
+    return res
+
+
+def bolts_from_holes(origin0, end0, height0, radius0,
+                     origin1, end1, height1, radius1,
+                     diameters:np.ndarray=None,
+                     factor:float=FACTOR_DIAMETER_TO_HEAD) -> np.ndarray:
+    """
+    virtual bolts of n hole pairs, batch version of shape.create_virtual_bolt_from_hole
+
+    the bolt joins the two farthest extremities of the holes.
+    Holes of the same radius are a screw and a nut: the radius is snapped on the nominal diameters.
+    Holes of different radius are a screw and a thread, the largest being the screw hole.
+    diameters is the sorted table of the nominal diameters, bolt_diameters by default.
+    """
+    p0 = np.stack((np.asarray(origin0, dtype=np.float64).reshape(-1, 3), np.asarray(end0, dtype=np.float64).reshape(-1, 3)), axis=1)
+    p1 = np.stack((np.asarray(origin1, dtype=np.float64).reshape(-1, 3), np.asarray(end1, dtype=np.float64).reshape(-1, 3)), axis=1)
+    height0 = np.asarray(height0, dtype=np.float64)
+    height1 = np.asarray(height1, dtype=np.float64)
+    radius0 = np.asarray(radius0, dtype=np.float64)
+    radius1 = np.asarray(radius1, dtype=np.float64)
+    n = len(p0)
+    rows = np.arange(n)
+
+    #1. farthest extremities, in the order (s,s), (s,e), (e,s), (e,e)
+    i0 = np.array([0, 0, 1, 1])
+    i1 = np.array([0, 1, 0, 1])
+    dist = np.linalg.norm(p0[:, i0] - p1[:, i1], axis=2)
+    choice = np.argmax(dist, axis=1)
+
+    res = np.zeros(n, dtype=BOLT_DTYPE)
+    res["start"] = p0[rows, i0[choice]]
+    res["end"] = p1[rows, i1[choice]]
+    res["valid"] = True
+
+    #2. screw radius from the nominal diameter closest to the largest hole
+    first_larger = radius0 > radius1
+    screw_ref = np.where(first_larger, radius0, radius1)
+    thread_ref = np.where(first_larger, radius1, radius0)
+    thread_height = np.where(first_larger, height1, height0)
+
+    radius = snap_diameters(screw_ref*2, diameters)/2
+    head = np.where(radius*factor < screw_ref, screw_ref*factor, radius*factor)
+
+    #3. screw and nut: same radius
+    same = radius0 == radius1
+    res["radius"] = np.where(same, radius, head)
+
+    #4. screw and thread, the screw head on the side of the largest hole
+    res["start_radius"] = np.where(same | first_larger, head, thread_ref)
+    res["start_height"] = np.where(same | first_larger, 1.0, thread_height)
+    res["end_radius"] = np.where(same | ~first_larger, head, thread_ref)
+    res["end_height"] = np.where(same | ~first_larger, -1.0, -thread_height)
+    return res
+
+
+def records_to_properties(records:np.ndarray) -> list:
+    """return the bolt properties dict (as create_virtual_bolt*) of the valid records"""
+    records = records[records["valid"]]
+    starts = Point.from_array(records["start"])
+    ends = Point.from_array(records["end"])
+
+    res = []
+    for r, s, e in zip(records.tolist(), starts, ends):
+        res.append(dict(start=s, end=e, radius=r[2], start_radius=r[3], start_height=r[4], end_radius=r[5], end_height=r[6]))
+    return res
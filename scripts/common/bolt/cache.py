@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+# persistent cache of the parts classification
+# License: LGPL v 3.0
+# Autor: Marc DUBOC
+# Version: 19/10/2026
+
+import os
+import copy
+import pickle
+import hashlib
+import tempfile
+import threading
+import contextlib
+import numpy as np
+from salome.geom import geomBuilder
+from common import logging, CACHE_PATH
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+Geompy = geomBuilder.New()
+
+# sources of the classification, relative to the common package: a change of their code invalidates the cache
+CLASSIFICATION_SOURCES = ("bolt/shape.py", "bolt/cache.py", "properties.py", "geometry.py")
+
+
+def code_revision() -> str:
+    """hash of the sources of the classification"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    h = hashlib.sha1()
+    for name in CLASSIFICATION_SOURCES:
+        try:
+            with open(os.path.join(root, name), "rb") as f:
+                h.update(f.read())
+        except OSError:
+            h.update(name.encode())
+    return h.hexdigest()
+
+
+@contextlib.contextmanager
+def file_lock(path:str):
+    """exclusive lock of path between processes, blocking"""
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def part_measures(obj) -> dict:
+    """cheap global measures of a part, shared by the pre-screen and the fingerprint"""
+    return dict(n_faces=Geompy.NumberOfFaces(obj),
+                bbox=np.array(Geompy.BoundingBox(obj), dtype=np.float64),
+                basic=Geompy.BasicProperties(obj))
+
+
+def fingerprint(obj, measures:dict=None, decimals:int=6) -> str:
+    """
+    geometric fingerprint of a part
+
+    shape type, number of faces and edges, bounding box, length, area, volume and inertia matrix.
+    The bounding box and the inertia matrix depend on the position and the orientation of the part,
+    as the cached results hold absolute coordinates.
+    """
+    if measures is None:
+        measures = part_measures(obj)
+
+    counts = (str(obj.GetShapeType()), measures["n_faces"], Geompy.NumberOfEdges(obj))
+    values = list(measures["bbox"]) + list(measures["basic"]) + list(Geompy.Inertia(obj))
+    # +0.0 turns -0.0 into 0.0
+    text = ";".join(map(str, counts)) + ";" + ";".join(f"{round(float(v), decimals) + 0.0:.9g}" for v in values)
+    return hashlib.sha1(text.encode()).hexdigest()
+
+
+class ParseCache():
+    """
+    Persistent cache of the classification of the parts (result of Parse.parse_obj)
+
+    The entries are keyed by the fingerprint of the part, the diameter range and the
+    classification parameters, so only the pairing runs again when the tolerances change.
+    The file is tied to VERSION and to the revision of the classification code (code_revision),
+    and is merged with the entries of the other processes on save.
+
+    attributes:
+        path: str, pickle file of the cache
+        entries: dict {key: result}
+        hits: int
+        misses: int
+
+    methods:
+        key, get, put: access to the entries
+        invalidate: remove the entries of a fingerprint, or all the entries
+        load, save: read and write the cache file
+        stats: hits and misses statistics
+    """
+    VERSION = 1
+
+    def __init__(self, path:str=None, autoload:bool=True):
+        self.path = path if path is not None else os.path.join(CACHE_PATH, "bolt_parse.pkl")
+        self.revision = code_revision()
+        self.entries = dict()
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        # invalidated keys, or all the keys of the file, not merged back on save
+        self._removed = set()
+        self._removed_all = False
+        self._lock = threading.Lock()
+
+        if autoload:
+            self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self) -> str:
+        return f"ParseCache(entries={len(self.entries)}, hits={self.hits}, misses={self.misses})"
+
+    @staticmethod
+    def key(fingerprint:str, min_diameter:float, max_diameter:float, params:tuple=()) -> tuple:
+        return (fingerprint, round(float(min_diameter), 6), round(float(max_diameter), 6), tuple(params))
+
+    def get(self, key:tuple) -> tuple:
+        """return (found, copy of the cached result)"""
+        with self._lock:
+            if key in self.entries:
+                self.hits += 1
+                return True, copy.deepcopy(self.entries[key])
+            self.misses += 1
+            return False, None
+
+    def put(self, key:tuple, result):
+        with self._lock:
+            self.entries[key] = result
+            self._removed.discard(key)
+            self._dirty = True
+
+    def invalidate(self, fingerprint:str=None) -> int:
+        """remove the entries of a part fingerprint, all the entries if None. Return the number of entries removed"""
+        with self._lock:
+            if fingerprint is None:
+                keys = list(self.entries.keys())
+            else:
+                keys = [k for k in self.entries if k[0] == fingerprint]
+            for k in keys:
+                del self.entries[k]
+            if fingerprint is None:
+                self._removed.clear()
+                self._removed_all = True
+            else:
+                self._removed.update(keys)
+            if keys or fingerprint is None:
+                self._dirty = True
+        logging.info(f"parse cache: {len(keys)} entries invalidated")
+        return len(keys)
+
+    def _read(self) -> dict:
+        """entries of the cache file, empty if missing, unreadable or of another version or code revision"""
+        if not os.path.exists(self.path):
+            return dict()
+
+        try:
+            with open(self.path, "rb") as f:
+                data = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) as e:
+            logging.warning(f"cannot read the parse cache {self.path}: {e}")
+            return dict()
+
+        if (not isinstance(data, dict) or data.get("version") != self.VERSION
+                or data.get("revision") != self.revision):
+            logging.info(f"parse cache {self.path} ignored, version or classification code changed")
+            return dict()
+        return data["entries"]
+
+    def load(self):
+        self.entries = self._read()
+        logging.info(f"parse cache loaded: {len(self.entries)} entries")
+
+    def save(self):
+        """
+        write the cache file if it was modified
+
+        the entries of the file, written by other processes since the load, are merged under a file
+        lock and the file is replaced from a temporary file of this process
+        """
+        if not self._dirty:
+            return
+
+        folder = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(folder, exist_ok=True)
+        with self._lock, file_lock(self.path + ".lock"):
+            entries = dict() if self._removed_all else self._read()
+            for k in self._removed:
+                entries.pop(k, None)
+            entries.update(self.entries)
+
+            fd, tmp = tempfile.mkstemp(dir=folder, prefix=os.path.basename(self.path) + ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    pickle.dump(dict(version=self.VERSION, revision=self.revision, entries=entries), f,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, self.path)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+
+            self.entries = entries
+            self._removed.clear()
+            self._removed_all = False
+            self._dirty = False
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return dict(entries=len(self.entries),
+                    hits=self.hits,
+                    misses=self.misses,
+                    hit_rate=self.hits/total if total else 0.0)
@@ -94,37 +94,77 @@ class VirtualBolt():
         return np.linalg.norm(self.end.get_coordinate() - self.start.get_coordinate())
     
 class BoltsManager():
+    """
+    Store of the virtual bolts, indexed by id
+
+    attributes:
+        bolts: list of VirtualBolt, in the order they were added
+
+    methods:
+        add_bolt, get_bolt, remove_bolt, update_bolt: single bolt operations
+        select: bolts matching a list of ids and/or a filter
+        update_bolts: apply the same properties change to several bolts
+    """
     def __init__(self):
-        self.bolts = []
+        self._bolts = dict()
 
     def __del__(self):
-        for b in self.bolts:
-            del b
+        self._bolts.clear()
+
+    def __len__(self):
+        return len(self._bolts)
+
+    def __contains__(self, id:int):
+        return id in self._bolts
+
+    @property
+    def bolts(self) -> list:
+        return list(self._bolts.values())
 
     def add_bolt(self, bolt_prop:dict, id:int=None):
-        self.bolts.append(VirtualBolt(id=id, **bolt_prop))
-        return self.bolts[-1].id_instance
+        bolt = VirtualBolt(id=id, **bolt_prop)
+        self._bolts[bolt.id_instance] = bolt
+        return bolt.id_instance
 
     def get_bolt(self, id:int):
-        for bolt in self.bolts:
-            if bolt.id_instance == id:
-                return bolt
-        return None
+        return self._bolts.get(id)
     
     def remove_bolt(self, id:int):
-        for idx,bolt in enumerate(self.bolts):
-            if bolt.id_instance == id:
-                sid = bolt.sid
-                del self.bolts[idx]
-                return sid
-        return None
+        bolt = self._bolts.pop(id, None)
+        if bolt is None:
+            return None
+        return bolt.sid
     
     def update_bolt(self, id:int, bolt_prop:dict):
-        for bolt in self.bolts:
-            logging.debug(f"checking bolt {bolt.id_instance} against {id}")
-            if bolt.id_instance == id:
-                logging.debug(f"updating bolt from manager {bolt.id_instance} with {bolt_prop}")
-                for key, value in bolt_prop.items():
-                    setattr(bolt, key, value)
-                return bolt.get_detail_name() 
-        return None
+        bolt = self._bolts.get(id)
+        if bolt is None:
+            return None
+        logging.debug(f"updating bolt from manager {bolt.id_instance} with {bolt_prop}")
+        for key, value in bolt_prop.items():
+            setattr(bolt, key, value)
+        return bolt.get_detail_name()
+
+    def select(self, ids:list=None, filter=None) -> list:
+        """return the bolts with an id in ids (all if None) and for which filter(bolt) is True"""
+        if ids is None:
+            bolts = self._bolts.values()
+        else:
+            bolts = [self._bolts[i] for i in ids if i in self._bolts]
+
+        if filter is None:
+            return list(bolts)
+        return [b for b in bolts if filter(b)]
+
+    def update_bolts(self, bolt_prop:dict, ids:list=None, filter=None) -> dict:
+        """apply the same properties to the bolts selected by ids and/or filter
+
+        Returns:
+            dict {id: new detail name} of the updated bolts
+        """
+        names = dict()
+        for bolt in self.select(ids, filter):
+            for key, value in bolt_prop.items():
+                setattr(bolt, key, value)
+            names[bolt.id_instance] = bolt.get_detail_name()
+        logging.debug(f"{len(names)} bolts updated with {bolt_prop}")
+        return names
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# export of the virtual bolts to files
+# License: LGPL v 3.0
+# Autor: Marc DUBOC
+# Version: 19/10/2026
+
+import json
+import numpy as np
+from common.bolt.aster import MakeComm
+from common.columnar import write_columns, read_columns
+
+BOLTS_KIND = "bolts"
+
+
+def bolt_to_json(o):
+    """json default of the virtual bolts and their points"""
+    return o.to_dict() if hasattr(o,'to_dict') else o.__dict__
+
+
+def bolts_to_columns(bolts:list) -> dict:
+    """
+    columns of the virtual bolts
+
+    id: int32 (n,), start, end: float64 (n,3),
+    radius, start_radius, start_height, end_radius, end_height, preload: float64 (n,)
+    """
+    n = len(bolts)
+    columns = dict(id=np.array([b.id_instance for b in bolts], dtype=np.int32),
+                   start=np.array([b.start.get_coordinate() for b in bolts], dtype=np.float64).reshape(n, 3),
+                   end=np.array([b.end.get_coordinate() for b in bolts], dtype=np.float64).reshape(n, 3))
+    for key in ("radius", "start_radius", "start_height", "end_radius", "end_height", "preload"):
+        columns[key] = np.array([getattr(b, key) for b in bolts], dtype=np.float64)
+    return columns
+
+
+def read_binary(path:str, mmap:bool=True) -> tuple:
+    """return (header, columns) of a binary bolts file, the columns are memory mapped by default"""
+    return read_columns(path, kind=BOLTS_KIND, mmap=mmap)
+
+
+def write_files(bolts:list, file:str, export:str):
+    """write the virtual bolts to file
+
+    Args:
+        bolts: list of VirtualBolt
+        file: path of the file
+        export: "ASTER" for a .comm file, "RAW" for a json file, "BINARY" for a columnar file (see common.columnar)
+    """
+    if not bolts:
+        return
+
+    if export=="ASTER":
+        with open(file, 'w') as f:
+            MakeComm().write(f, bolts)
+
+    elif export=="RAW":
+        with open(file, 'w') as f:
+            json.dump(bolts, f, default=bolt_to_json, indent=4)
+
+    elif export=="BINARY":
+        write_columns(file, BOLTS_KIND, bolts_to_columns(bolts))
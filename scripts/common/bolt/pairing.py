@@ -0,0 +1,482 @@
+# -*- coding: utf-8 -*-
+# pairing of the screw, nut, thread and hole and creation of the virtual bolts, independent of salome
+# License: LGPL v 3.0
+# Autor: Marc DUBOC
+# Version: 19/10/2026
+
+import numpy as np
+
+from common.geometry import Point, Vector
+from common.bolt.axis import AxisIndex
+from common.bolt.builder import bolt_diameters, FACTOR_DIAMETER_TO_HEAD, bolts_from_screw_nut, bolts_from_screw_thread, bolts_from_holes, records_to_properties
+from common import logging
+
+
+class Screw():
+    """
+    Screw class to store the screw properties
+
+    attributes:
+        part_id: str
+        origin: Point
+        direction: Vector
+        length: float
+        radius: float
+        contact_radius: float
+    """
+    def __init__(self,  *args, **kwargs) -> None:
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def __repr__(self) -> str:
+        return f"Screw({self.origin}, {self.axis}, {self.height}, {self.radius}, {self.contact_radius})"
+
+class Nut():
+    """
+    Nut class to store the screw properties
+
+    attributes:
+        part_id: str
+        origin: Point
+        direction: Vector
+        length: float
+        radius: float
+        contact_radius: float
+    """
+    def __init__(self,  *args, **kwargs) -> None:
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def __repr__(self) -> str:
+        return f"Nut({self.origin}, {self.axis}, {self.height}, {self.radius}, {self.contact_radius})"
+
+class Thread():
+    """
+     class to store the tread properties
+
+    attributes:
+        part_id: str
+        origin: Point
+        end: Point
+        direction: Vector
+        height: float
+        radius: float
+    """
+    def __init__(self,  *args, **kwargs) -> None:
+        self.part_id = ""
+        self.origin = Point(0,0,0)
+        self.end = Point(0,0,0)
+        self.axis = Vector(0,0,0)
+        self.height = 0
+        self.radius = 0
+
+        for key, value in kwargs.items():
+            if hasattr(self, key):
+                setattr(self, key, value)
+    
+    def __repr__(self) -> str:
+        return f"Thread({self.origin}, {self.end}, {self.axis}, {self.height}, {self.radius})"
+
+class AxisCoincidence():
+    """
+    Class to check if two axes are coincident
+    mainly used to check if the axis of a cylinder is coincident with the axis of a screw or nut
+    """
+
+    def point_to_line_distance(self, point, line_point, line_dir):
+        """
+        Calcule la distance d'un point à une ligne définie par un point et une direction.
+        """
+        point_vec = point - line_point
+        return np.linalg.norm(point_vec - np.dot(point_vec, line_dir) * line_dir)
+
+    def point_to_point_distance(self, point1, point2):
+        """
+        Calcule la distance entre deux points.
+        """
+        return np.linalg.norm(point1 - point2)
+
+    def are_axis_colinear(self, prop1 ,prop2, tol_angle=0.01, tol_dist=0.01):
+        """
+        Vérifie si la norme d'un plan ou l'axer d'un cylindre sont colinear dans l'espace R^3.
+        """
+        shape1 = prop1
+        shape2 = prop2
+
+        # Normaliser les vecteurs de direction
+        dir1 = shape1.axis.get_vector()
+        dir2 = shape2.axis.get_vector()
+        dir1_normalized = dir1 / np.linalg.norm(dir1)
+        dir2_normalized = dir2 / np.linalg.norm(dir2)
+
+        # Vérifier la parralélisme des deux vecteur dans le deux direction vect et -vect
+        dir_diff = np.arccos(np.clip(np.dot(dir1_normalized, dir2_normalized), -1.0, 1.0))
+        if not (np.isclose(dir_diff, 0, atol=tol_angle) or np.isclose(dir_diff, np.pi, atol=tol_angle)):
+            #logging.info(f"dir_diff: {dir_diff}")
+            return False
+        
+        #verifier la distance entre les deux axes
+        dist1 = self.point_to_line_distance(shape1.origin.get_coordinate(), shape2.origin.get_coordinate(), dir1_normalized)
+        dist2 = self.point_to_line_distance(shape2.origin.get_coordinate(), shape1.origin.get_coordinate(), dir2_normalized)
+        if dist1 > tol_dist or dist2 > tol_dist:
+            #logging.info(f"dist1: {dist1} \t dist2: {dist2}")
+            return False
+
+        return True
+
+def pair_screw_nut_threads(screw_list, nut_list, treads_list,tol_angle=0.01, tol_dist=0.01) -> dict:
+    """
+    Pair the screw and nut together
+
+    attributes:
+        screw_list: list of screw
+        nut_list: list of nut
+        treads_list: list of treads
+        tol_angle: tolerance angle to check if the axis are colinear
+        tol_dist: tolerance distance to check if the axis are colinear
+
+    return:
+        dict(bolts=screw_nut_pairs, treads=screw_thread_pairs)
+    """
+
+    # 1. Pair the screw and nut together, only the axes in the same or neighbouring buckets of the axis hash are candidates
+    nut_index = AxisIndex(nut_list, tol_angle, tol_dist, queries=screw_list)
+    screw_nut_pairs = [(screw_list[i], nut_list[j]) for i, j in nut_index.pairs(screw_list)]
+
+    # 2.check if the screw and nut are coincident
+    S = AxisCoincidence()
+    screw_nut_pairs = [p for p in screw_nut_pairs if S.are_axis_colinear(p[0], p[1],tol_angle, tol_dist)]
+
+    # 3. check the distance between the screw and nut, if longer than the screw height, remove the pair
+    screw_nut_pairs = [p for p in screw_nut_pairs if np.linalg.norm(p[0].origin.get_coordinate() - p[1].origin.get_coordinate()) <= p[0].height]
+
+    # 4.get the screw.part_id used for the nuts
+    screw_part_id_used = {s[0].part_id for s in screw_nut_pairs}
+    screw_remaining = [s for s in screw_list if s.part_id not in screw_part_id_used]
+
+    # 5.get the nut.part_id used for the screws
+    thread_index = AxisIndex(treads_list, tol_angle, tol_dist, queries=screw_remaining)
+    screw_thread_pairs = [(screw_remaining[i], treads_list[j]) for i, j in thread_index.pairs(screw_remaining)]
+    screw_thread_pairs = [p for p in screw_thread_pairs if S.are_axis_colinear(p[0], p[1],tol_angle, tol_dist)]
+
+    # 6.remove the pair with the same screw on the screw_tread_pairs: the screws paired with a nut are left out,
+    # a screw colinear with several threads keeps the closest one (the first one on a tie)
+    screw_thread_pairs = [p for p in screw_thread_pairs if p[0].part_id not in screw_part_id_used]
+    closest = dict()
+    for i, p in enumerate(screw_thread_pairs):
+        dist = np.linalg.norm(p[0].origin.get_coordinate() - p[1].origin.get_coordinate())
+        if id(p[0]) not in closest or dist < closest[id(p[0])][0]:
+            closest[id(p[0])] = (dist, i)
+    kept = {i for _, i in closest.values()}
+    screw_thread_pairs = [p for i, p in enumerate(screw_thread_pairs) if i in kept]
+
+    return dict(bolts=screw_nut_pairs, threads=screw_thread_pairs)
+
+def pair_holes(holes_list,tol_angle=0.01, tol_dist=0.01) -> dict:
+    """
+    Pair the holes together
+
+    attributes:
+        holes_list: list of holes
+    Pair the hole together
+
+    attributes:
+        hole_list: list of screw
+        tol_angle: tolerance angle to check if the axis are colinear
+        tol_dist: tolerance distance to check if the axis are colinear
+
+    return:
+        dict(bolts=screw_nut_pairs, treads=screw_thread_pairs)
+    """
+
+    #1. pair the holes together, only the axes in the same or neighbouring buckets of the axis hash are candidates
+    hole_index = AxisIndex(holes_list, tol_angle, tol_dist)
+    hole_pairs = [(holes_list[i], holes_list[j]) for i, j in hole_index.self_pairs()]
+
+    #2. check if the holes are coincident
+    S = AxisCoincidence()
+    hole_pairs = [p for p in hole_pairs if S.are_axis_colinear(p[0], p[1],tol_angle, tol_dist)]
+
+    logging.info(f"hole_pairs: {len(hole_pairs)}")
+
+    #3. check the min and max distance between the pair holes extremities
+    valid_pairs=[]
+    for p in hole_pairs:
+        p0_s = p[0].origin.get_coordinate()
+        p0_e = p[0].end.get_coordinate()
+        p1_s = p[1].origin.get_coordinate()
+        p1_e = p[1].end.get_coordinate()
+
+        dist = [np.linalg.norm(p0_s - p1_s),np.linalg.norm(p0_s - p1_e),np.linalg.norm(p0_e - p1_s),np.linalg.norm(p0_e - p1_e)]
+        max_dist = np.max(dist)
+
+        # valid if the max distance is larger than the sum height of height the hole
+        if max_dist >= p[0].height + p[1].height:
+            valid_pairs.append(p)
+
+    logging.info(f"valid_pairs: {len(valid_pairs)}")
+    return dict(holes=valid_pairs)
+ 
+def create_virtual_bolt(pair:list):
+
+    if isinstance(pair[0],Nut) and isinstance(pair[1],Screw):
+        nut = pair[0]
+        screw = pair[1]
+
+    elif isinstance(pair[0],Screw) and isinstance(pair[1],Nut):
+        screw = pair[0]
+        nut = pair[1]
+
+    else:
+        return None
+    
+    #1.get the origin of the screw
+    origin = screw.origin.get_coordinate()
+
+    #2.get the nut extremity points
+    nut_ext = [nut.origin.get_coordinate(),nut.origin.get_coordinate() + nut.axis.get_vector() * nut.height]
+
+    #3.get the closest point from the screw origin
+    nut_ext_dist = [np.linalg.norm(origin - n) for n in nut_ext]
+    nut_ext = nut_ext[np.argmin(nut_ext_dist)]
+    
+    # create the virtual bolt
+    bolt_properties = {
+        'start': Point(*origin),
+        'end': Point(*nut_ext),
+        'radius': screw.radius,
+        'start_radius': screw.contact_radius,
+        'start_height': 1.0,
+        'end_radius': nut.contact_radius,
+        'end_height': -1.0,
+    }
+
+    return bolt_properties
+
+def create_virtual_bolt_from_thread(pair:list):
+    
+    if isinstance(pair[0],Thread) and isinstance(pair[1],Screw):
+        thread = pair[0]
+        screw = pair[1]
+
+    elif isinstance(pair[0],Screw) and isinstance(pair[1],Thread):
+        screw = pair[0]
+        thread = pair[1]
+
+    else:
+        return None
+    
+    #1.get the origin of the screw
+    origin = screw.origin.get_coordinate()
+
+    #2.get the thread extremity points
+    thread_ext = [thread.origin.get_coordinate(),thread.end.get_coordinate()]
+
+    #3.get the closest point from the screw origin
+    thread_ext_dist = [np.linalg.norm(origin - n) for n in thread_ext]
+    thread_ext = thread_ext[np.argmin(thread_ext_dist)]
+
+    if np.isclose(origin, thread_ext, atol=0.1).all():
+        return None
+
+    o_dist = np.linalg.norm(origin - thread_ext)
+    screw_remaining = screw.height - o_dist
+    
+    end_height = 0
+
+    if screw_remaining <= 0:
+        return None
+    
+    elif screw_remaining > thread.height:
+        end_height = thread.height
+        
+    else:
+        end_height = screw_remaining
+
+    # create the virtual bolt
+    bolt_properties = {
+        'start': Point(*origin),
+        'end': Point(*thread_ext),
+        'radius': screw.radius,
+        'start_radius': screw.contact_radius,
+        'start_height': 1.0,
+        'end_radius': thread.radius,
+        'end_height': end_height,
+    }
+
+    return bolt_properties
+
+def create_virtual_bolt_from_hole(pair:list):
+
+    commom_bolt_diameter = bolt_diameters()
+    factor_diamter_to_head = FACTOR_DIAMETER_TO_HEAD
+
+    # 1 from the list of points get the farthest points form each other
+    p0_s = pair[0].origin.get_coordinate()
+    p0_e = pair[0].end.get_coordinate()
+    p1_s = pair[1].origin.get_coordinate()
+    p1_e = pair[1].end.get_coordinate()
+    dist = [np.linalg.norm(p0_s - p1_s),np.linalg.norm(p0_s - p1_e),np.linalg.norm(p0_e - p1_s),np.linalg.norm(p0_e - p1_e)]
+    max_dist = np.max(dist)
+
+    extremity = None
+    if max_dist == np.linalg.norm(p0_s - p1_s):
+        extremity= dict(start=Point(*p0_s),end=Point(*p1_s))
+    elif max_dist == np.linalg.norm(p0_s - p1_e):
+        extremity= dict(start=Point(*p0_s),end=Point(*p1_e))
+    elif max_dist == np.linalg.norm(p0_e - p1_s):
+        extremity= dict(start=Point(*p0_e),end=Point(*p1_s))
+    elif max_dist == np.linalg.norm(p0_e - p1_e):
+        extremity= dict(start=Point(*p0_e),end=Point(*p1_e))
+
+    # 2 get the diameter of the hole
+    radius1 = pair[0].radius
+    radius2 = pair[1].radius
+
+    if radius1 != radius2:
+        screw_radius= 0.0
+        extremity_start = 0
+
+        # suppose junction screw and threads, the largest diameter been the screw
+        if radius1 > radius2:
+            screw_radius_ref = radius1
+            thread_radius_ref = radius2
+            thread_height = pair[1].height
+            extremity_start = 0
+
+        elif radius2 > radius1:
+            screw_radius_ref = radius2
+            thread_radius_ref = radius1
+            thread_height = pair[0].height
+            extremity_start = 1
+
+        # get the diamter of the screw by searching the closed value in the list commom_bolt_diameter
+        d_idx = np.argmin([np.abs(np.array(commom_bolt_diameter) - screw_radius_ref*2)])
+        diameter = commom_bolt_diameter[d_idx]
+        radius = diameter/2
+
+        if radius*factor_diamter_to_head < screw_radius_ref:
+            screw_radius = screw_radius_ref*factor_diamter_to_head
+
+        else:
+            screw_radius = radius*factor_diamter_to_head
+
+        # create the virtual bolt
+        bolt_properties = {
+            'start': extremity['start'],
+            'end': extremity['end'],
+            'radius': screw_radius,
+            'start_radius': 0.0,
+            'start_height': 0.0,
+            'end_radius': 0.0,
+            'end_height': 0.0,
+        }
+
+        if extremity_start == 0:
+            bolt_properties['start_radius'] = screw_radius
+            bolt_properties['start_height'] = 1.0
+            bolt_properties['end_radius'] = thread_radius_ref
+            bolt_properties['end_height'] = -thread_height
+
+        elif extremity_start == 1:
+            bolt_properties['start_radius'] = thread_radius_ref
+            bolt_properties['start_height'] = thread_height
+            bolt_properties['end_radius'] = screw_radius
+            bolt_properties['end_height'] = -1.0
+
+
+    elif radius2 == radius1:
+        contact_radius = 0.0
+        # suppose junction screw and nut
+        # get the diamter of the screw by searching the closed value in the list commom_bolt_diameter
+        d_idx = np.argmin([np.abs(np.array(commom_bolt_diameter) - radius1*2)])
+        diameter = commom_bolt_diameter[d_idx]
+        radius = diameter/2
+
+        if radius*factor_diamter_to_head < radius1:
+            contact_radius = radius1*factor_diamter_to_head
+        
+        else:
+            contact_radius = radius*factor_diamter_to_head
+
+        # create the virtual bolt
+        bolt_properties = {
+            'start': extremity['start'],
+            'end': extremity['end'],
+            'radius': radius,
+            'start_radius': contact_radius,
+            'start_height': 1.0,
+            'end_radius': contact_radius,
+            'end_height': -1.0,
+        }
+
+    return bolt_properties
+
+
+def _ordered_pairs(pairs:list, first_class, second_class) -> list:
+    """return the pairs as (first_class, second_class) instances, None for the other pairs"""
+    res = []
+    for p in pairs:
+        if isinstance(p[0],first_class) and isinstance(p[1],second_class):
+            res.append((p[0],p[1]))
+        elif isinstance(p[0],second_class) and isinstance(p[1],first_class):
+            res.append((p[1],p[0]))
+        else:
+            res.append(None)
+    return res
+
+def _records_of(pairs:list, func, getters:list) -> np.ndarray:
+    """run a batch builder on the attributes of the pairs, getters: (pair index, attribute name or callable)"""
+    args = []
+    for i, attr in getters:
+        if callable(attr):
+            args.append(np.array([attr(p[i]) for p in pairs], dtype=np.float64))
+        else:
+            args.append(np.array([getattr(p[i], attr) for p in pairs], dtype=np.float64))
+    return func(*args)
+
+def create_virtual_bolts(connections:dict) -> list:
+    """
+    batch version of create_virtual_bolt, create_virtual_bolt_from_thread and create_virtual_bolt_from_hole
+
+    attributes:
+        connections: dict of pairs as returned by pair_screw_nut_threads or pair_holes
+
+    return:
+        list of (kind, pair, bolt properties) in the order of the connections (bolts, threads then holes)
+    """
+    origin = lambda s: s.origin.get_coordinate()
+    axis = lambda s: s.axis.get_vector()
+    end = lambda s: s.end.get_coordinate()
+
+    res = []
+    builders = (("bolts", Screw, Nut, bolts_from_screw_nut,
+                 [(0,origin), (0,'radius'), (0,'contact_radius'), (1,origin), (1,axis), (1,'height'), (1,'contact_radius')]),
+                ("threads", Screw, Thread, bolts_from_screw_thread,
+                 [(0,origin), (0,'height'), (0,'radius'), (0,'contact_radius'), (1,origin), (1,end), (1,'height'), (1,'radius')]))
+
+    for kind, first_class, second_class, func, getters in builders:
+        pairs = connections.get(kind, [])
+        ordered = _ordered_pairs(pairs, first_class, second_class)
+        valid = [(p, o) for p, o in zip(pairs, ordered) if o is not None]
+        if not valid:
+            continue
+        records = _records_of([o for _, o in valid], func, getters)
+        for (p, _), prop in zip(valid, _properties_by_record(records)):
+            if prop is not None:
+                res.append((kind, p, prop))
+
+    pairs = connections.get("holes", [])
+    if pairs:
+        records = _records_of(pairs, bolts_from_holes,
+                              [(0,origin), (0,end), (0,'height'), (0,'radius'), (1,origin), (1,end), (1,'height'), (1,'radius')])
+        for p, prop in zip(pairs, _properties_by_record(records)):
+            if prop is not None:
+                res.append(("holes", p, prop))
+
+    return res
+
+def _properties_by_record(records:np.ndarray) -> list:
+    """bolt properties of each record, None for the invalid ones"""
+    props = iter(records_to_properties(records))
+    return [next(props) if v else None for v in records["valid"]]
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+# detection of circular and linear patterns of identical parts, independent of salome
+# License: LGPL v 3.0
+# Autor: Marc DUBOC
+# Version: 19/10/2026
+
+import numpy as np
+from collections import defaultdict
+
+
+class Transform():
+    """
+    Rigid transform p -> R.p + t
+
+    attributes:
+        rotation: np.ndarray (3,3)
+        translation: np.ndarray (3,)
+
+    methods:
+        translation_of: transform of a translation
+        rotation_about: transform of a rotation about an axis line
+        apply_point: transform a point
+        apply_vector: transform a vector (rotation only)
+    """
+
+    def __init__(self, rotation:np.ndarray=None, translation:np.ndarray=None):
+        self.rotation = np.eye(3) if rotation is None else np.asarray(rotation, dtype=np.float64)
+        self.translation = np.zeros(3) if translation is None else np.asarray(translation, dtype=np.float64)
+
+    def __repr__(self) -> str:
+        return f"Transform(rotation={self.rotation.tolist()}, translation={self.translation.tolist()})"
+
+    @classmethod
+    def translation_of(cls, vector):
+        return cls(translation=vector)
+
+    @classmethod
+    def rotation_about(cls, center, axis, angle:float):
+        """rotation of angle (rad) about the line (center, axis), right hand rule"""
+        axis = np.asarray(axis, dtype=np.float64)
+        axis = axis/np.linalg.norm(axis)
+        center = np.asarray(center, dtype=np.float64)
+
+        # Rodrigues formula
+        k = np.array([[0, -axis[2], axis[1]],
+                      [axis[2], 0, -axis[0]],
+                      [-axis[1], axis[0], 0]])
+        r = np.eye(3) + np.sin(angle)*k + (1 - np.cos(angle))*(k @ k)
+        return cls(rotation=r, translation=center - r @ center)
+
+    def apply_point(self, point) -> np.ndarray:
+        return self.rotation @ np.asarray(point, dtype=np.float64) + self.translation
+
+    def apply_vector(self, vector) -> np.ndarray:
+        return self.rotation @ np.asarray(vector, dtype=np.float64)
+
+
+class Pattern():
+    """
+    Pattern of identical parts
+
+    attributes:
+        kind: str, "circular" or "linear"
+        members: list of the item indices, the first one is the representative
+        transforms: list of Transform from the representative to each member
+        center: np.ndarray, center of the circle or first point of the line
+        axis: np.ndarray, axis of the circle or direction of the line
+    """
+
+    def __init__(self, kind:str, members:list, transforms:list, center, axis):
+        self.kind = kind
+        self.members = members
+        self.transforms = transforms
+        self.center = np.asarray(center, dtype=np.float64)
+        self.axis = np.asarray(axis, dtype=np.float64)
+
+    @property
+    def representative(self) -> int:
+        return self.members[0]
+
+    def __len__(self):
+        return len(self.members)
+
+    def __repr__(self) -> str:
+        return f"Pattern({self.kind}, members={len(self.members)}, center={self.center.tolist()}, axis={self.axis.tolist()})"
+
+
+def plane_basis(axis:np.ndarray) -> tuple:
+    """return two unit vectors (u, v) such that (u, v, axis) is orthonormal"""
+    axis = axis/np.linalg.norm(axis)
+    ref = np.array([1.0, 0.0, 0.0]) if abs(axis[0]) < 0.9 else np.array([0.0, 1.0, 0.0])
+    u = np.cross(axis, ref)
+    u /= np.linalg.norm(u)
+    v = np.cross(axis, u)
+    return u, v
+
+
+def fit_circle(points:np.ndarray) -> tuple:
+    """least square circle of 2d points of shape (n,2), return (center, radius, max radial deviation)"""
+    a = np.hstack((2*points, np.ones((len(points), 1))))
+    b = np.sum(points**2, axis=1)
+    sol, *_ = np.linalg.lstsq(a, b, rcond=None)
+    center = sol[:2]
+    radius = np.sqrt(max(sol[2] + center @ center, 0.0))
+    deviation = np.max(np.abs(np.linalg.norm(points - center, axis=1) - radius))
+    return center, radius, deviation
+
+
+def _circular(idx:list, origins:np.ndarray, axis:np.ndarray, tol_dist:float):
+    """circular pattern of the items idx about an axis parallel to their own axis, None if not on a circle"""
+    pts = origins[idx]
+    u, v = plane_basis(axis)
+    levels = pts @ axis
+    if np.ptp(levels) > tol_dist:
+        return None
+
+    flat = np.column_stack((pts @ u, pts @ v))
+    center2d, radius, deviation = fit_circle(flat)
+    if radius <= tol_dist or deviation > tol_dist:
+        return None
+
+    center = center2d[0]*u + center2d[1]*v + np.mean(levels)*axis
+    angles = np.arctan2(flat[:, 1] - center2d[1], flat[:, 0] - center2d[0])
+    # (u, v, axis) is direct: a positive angle in the plane is a right hand rotation about axis
+    transforms = [Transform.rotation_about(center, axis, a - angles[0]) for a in angles]
+    return Pattern("circular", list(idx), transforms, center, axis)
+
+
+def _linear(idx:list, origins:np.ndarray, axis:np.ndarray, tol_dist:float):
+    """linear pattern of the items idx, None if they are not aligned"""
+    pts = origins[idx]
+    mean = pts.mean(axis=0)
+    _, _, vt = np.linalg.svd(pts - mean)
+    direction = vt[0]
+    offsets = (pts - mean) - np.outer((pts - mean) @ direction, direction)
+    if np.max(np.linalg.norm(offsets, axis=1)) > tol_dist:
+        return None
+
+    transforms = [Transform.translation_of(p - pts[0]) for p in pts]
+    return Pattern("linear", list(idx), transforms, pts[0], direction)
+
+
+def find_patterns(keys:list, origins, axes, tol_angle:float=0.01, tol_dist:float=0.01, min_members:int=3) -> list:
+    """
+    detect the circular and linear patterns of identical items with parallel axes
+
+    Args:
+        keys: signature of each item, items with the same signature are identical up to a rigid transform.
+              None for the items that cannot be in a pattern
+        origins, axes: reference point and axis of each item, arrays of shape (n,3)
+        tol_angle: tolerance to regroup the parallel axes
+        tol_dist: tolerance on the positions
+        min_members: minimum number of items of a pattern
+
+    Returns:
+        list of Pattern, the representative of each pattern is its item with the smallest index
+    """
+    origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+    axes = np.asarray(axes, dtype=np.float64).reshape(-1, 3)
+    norm = np.linalg.norm(axes, axis=1)
+
+    #1. regroup the identical items with the same axis direction
+    decimals = max(0, int(np.ceil(-np.log10(tol_angle))))
+    groups = defaultdict(list)
+    for i, k in enumerate(keys):
+        if k is None or norm[i] == 0:
+            continue
+        direction = tuple(np.round(axes[i]/norm[i], decimals) + 0.0)
+        groups[(k, direction)].append(i)
+
+    #2. fit a circle or a line on each group, split by level along the axis for the circles
+    patterns = []
+    for (_, direction), idx in groups.items():
+        if len(idx) < min_members:
+            continue
+        axis = axes[idx[0]]/norm[idx[0]]
+
+        levels = defaultdict(list)
+        for i in idx:
+            levels[int(np.round(origins[i] @ axis/max(tol_dist, 1e-9)))].append(i)
+        # neighbouring levels are merged, the rounding can split items at the same level
+        merged = []
+        for level in sorted(levels):
+            if merged and level - merged[-1][0] <= 1:
+                merged[-1][1].extend(levels[level])
+                merged[-1][0] = level
+            else:
+                merged.append([level, list(levels[level])])
+
+        found = set()
+        for _, members in merged:
+            if len(members) < min_members:
+                continue
+            p = _circular(sorted(members), origins, axis, tol_dist)
+            if p is not None:
+                patterns.append(p)
+                found.update(members)
+
+        remaining = sorted(set(idx) - found)
+        if len(remaining) >= min_members:
+            p = _linear(remaining, origins, axis, tol_dist)
+            if p is not None:
+                patterns.append(p)
+
+    patterns.sort(key=lambda p: p.representative)
+    return patterns
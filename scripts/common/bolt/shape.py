@@ -4,9 +4,16 @@
 # Autor: Marc DUBOC
 # Version: 28/08/2023
 
+import os
+import copy
+import tempfile
+import threading
+import multiprocessing
 import numpy as np
-from itertools import product,combinations
 from enum import Enum
+from itertools import product
+from collections import defaultdict, Counter
+from concurrent.futures import ProcessPoolExecutor
 
 import GEOM
 import salome
@@ -17,10 +24,19 @@ from salome.geom import geomBuilder
 Geompy = geomBuilder.New()
 salome.salome_init()
    
-from common.properties import get_properties, Point, Vector, Cylinder, Plane, DiskCircle, DiskAnnular
+from common.properties import get_properties, get_areas, type_to_class, EdgeCache, Point, Vector, Cylinder, Plane, DiskCircle, DiskAnnular
 from common.bolt.data import VirtualBolt
+from common.bolt.pattern import Transform, find_patterns
+from common.bolt.cache import part_measures, fingerprint
+from common.facetable import FaceTable
+# the pairing does not need salome, it is re-exported here for the existing imports
+from common.bolt.pairing import Screw, Nut, Thread, AxisCoincidence, pair_screw_nut_threads, pair_holes, create_virtual_bolt, create_virtual_bolt_from_thread, create_virtual_bolt_from_hole, create_virtual_bolts
+from common.pool import bounded_map, BoundedPool
 from common import logging
 
+# offsets of the 27 neighbouring cells of a grid
+NEIGHBOUR_OFFSETS = np.array(list(product((0,-1,1), repeat=3)), dtype=np.int64)
+
 class Method(Enum):
     """
     Enum class to store the method used to create the bolt
@@ -31,116 +47,12 @@ class Method(Enum):
     SCREW = 1
     HOLE = 2
 
-class Screw():
-    """
-    Screw class to store the screw properties
-
-    attributes:
-        part_id: str
-        origin: Point
-        direction: Vector
-        length: float
-        radius: float
-        contact_radius: float
-    """
-    def __init__(self,  *args, **kwargs) -> None:
-        for key, value in kwargs.items():
-            setattr(self, key, value)
-
-    def __repr__(self) -> str:
-        return f"Screw({self.origin}, {self.axis}, {self.height}, {self.radius}, {self.contact_radius})"
-
-class Nut():
-    """
-    Nut class to store the screw properties
-
-    attributes:
-        part_id: str
-        origin: Point
-        direction: Vector
-        length: float
-        radius: float
-        contact_radius: float
-    """
-    def __init__(self,  *args, **kwargs) -> None:
-        for key, value in kwargs.items():
-            setattr(self, key, value)
-
-    def __repr__(self) -> str:
-        return f"Nut({self.origin}, {self.axis}, {self.height}, {self.radius}, {self.contact_radius})"
-
-class Thread():
-    """
-     class to store the tread properties
-
-    attributes:
-        part_id: str
-        origin: Point
-        end: Point
-        direction: Vector
-        height: float
-        radius: float
-    """
-    def __init__(self,  *args, **kwargs) -> None:
-        self.part_id = ""
-        self.origin = Point(0,0,0)
-        self.end = Point(0,0,0)
-        self.axis = Vector(0,0,0)
-        self.height = 0
-        self.radius = 0
-
-        for key, value in kwargs.items():
-            if hasattr(self, key):
-                setattr(self, key, value)
-    
-    def __repr__(self) -> str:
-        return f"Thread({self.origin}, {self.end}, {self.axis}, {self.height}, {self.radius})"
-
-class ShapeCoincidence():
+class ShapeCoincidence(AxisCoincidence):
     """
     Class to check if two shapes are coincident
-    mainly used to check if the axis of a cylinder is coincident with the axis of a screw or nut
+    adds to AxisCoincidence the search of the faces at the extremities of a cylinder
     """
 
-    def point_to_line_distance(self, point, line_point, line_dir):
-        """
-        Calcule la distance d'un point à une ligne définie par un point et une direction.
-        """
-        point_vec = point - line_point
-        return np.linalg.norm(point_vec - np.dot(point_vec, line_dir) * line_dir)
-
-    def point_to_point_distance(self, point1, point2):
-        """
-        Calcule la distance entre deux points.
-        """
-        return np.linalg.norm(point1 - point2)
-
-    def are_axis_colinear(self, prop1 ,prop2, tol_angle=0.01, tol_dist=0.01):
-        """
-        Vérifie si la norme d'un plan ou l'axer d'un cylindre sont colinear dans l'espace R^3.
-        """
-        shape1 = prop1
-        shape2 = prop2
-
-        # Normaliser les vecteurs de direction
-        dir1_normalized = np.array(shape1.axis.get_vector()) / np.linalg.norm(shape1.axis.get_vector())
-        dir2_normalized = np.array(shape2.axis.get_vector()) / np.linalg.norm(shape2.axis.get_vector())
-
-        # Vérifier la parralélisme des deux vecteur dans le deux direction vect et -vect
-        dir_diff = np.arccos(np.clip(np.dot(dir1_normalized, dir2_normalized), -1.0, 1.0))
-        if not (np.isclose(dir_diff, 0, atol=tol_angle) or np.isclose(dir_diff, np.pi, atol=tol_angle)):
-            #logging.info(f"dir_diff: {dir_diff}")
-            return False
-        
-        #verifier la distance entre les deux axes
-        dist1 = self.point_to_line_distance(shape1.origin.get_coordinate(), shape2.origin.get_coordinate(), dir1_normalized)
-        dist2 = self.point_to_line_distance(shape2.origin.get_coordinate(), shape1.origin.get_coordinate(), dir2_normalized)
-        if dist1 > tol_dist or dist2 > tol_dist:
-            #logging.info(f"dist1: {dist1} \t dist2: {dist2}")
-            return False
-
-        return True
-    
     def closests_surfaces_from_cylinder_extremity(self, cylinder, candidates):
         """
         Retourne les surfaces les plus proche des extrémités d'un cylindre
@@ -226,22 +138,46 @@ class Parse():
         NUT_RATIO_MINIMUM: float
         NUT_RATIO_MAXIMUM: float
         SCREW_RATIO_MINIMUM: float
+        FASTENER_FACES_MAXIMUM: int, parts with more faces are only parsed for threads
+        FASTENER_LENGTH_RATIO_MAXIMUM: float, parts longer than this ratio of max_diameter are only parsed for threads
         allow_type: list
+        rejected: Counter, number of parts rejected per reason by the screening
+        housings: int, number of parts kept by the screening but only parsed for threads
+        cache: ParseCache or None, persistent cache of the parts classification
     
     methods:
         _check_part_kind: helper function to determine if nut or screw
+        screen: cheap pre-screen of a part from its bounding box, volume and number of faces
+        invalidate_cache: remove parts from the classification cache
         is_nut_or_bolt: function to check if the shape is a nut or a screw
         is_tread: function to check if the shape is a tread
         parse_obj: function to extract kind of object
+        parse_objs: function to extract kind of several objects in a thread pool
+        parse_parts: parse several parts in a worker pool and merge nuts, screws and threads
     """
 
     NUT_RATIO_MINIMUM = 0.4
     NUT_RATIO_MAXIMUM = 2.0
     SCREW_RATIO_MINIMUM = 2.0
     THREAD_RATIO_MINIMUM = 0.5
+    FASTENER_FACES_MAXIMUM = 500
+    FASTENER_LENGTH_RATIO_MAXIMUM = 20.0
+    SCREEN_TOLERANCE = 1e-3
 
     allow_type = [Cylinder,DiskCircle,Plane,DiskAnnular]
 
+    # callable(brep_file, part_id, min_diameter, max_diameter) used by parse_parts in a process pool,
+    # it must be picklable (module level function), ex: parse_brep
+    backend = None
+
+    # ParseCache used by parse_obj and parse_objs, None to disable
+    cache = None
+
+    def __init__(self):
+        self.rejected = Counter()
+        self.housings = 0
+        self._lock = threading.Lock()
+
     def _check_part_kind(self,cylinder_prop,top_prop,bot_prop):
         """function to determine if nut or screw
             -check againt radius
@@ -356,75 +292,88 @@ class Parse():
         else:
             return None
 
-    def _filter_candidate_treads(self,cylinders:list):
-        """function to filter the candidate treads
-        only the full cylinder will be retained
+    def _group_cylinders(self, cylinders:list, atol:float=0.1, rtol:float=1e-5, tol_axis:float=1e-3, tol_radius:float=1e-3):
+        """function to group the split faces of the same cylinder in linear time
+
+        the cylinders are hashed on a grid keyed by the quantized origin, the cells are at least as large
+        as the tolerance of np.isclose(atol, rtol) so the faces of a group are in the same or in the
+        neighbouring cells. A cylinder joins the first group of these cells with an origin close
+        (np.isclose per component), a colinear axis (either direction, tol_axis) and the same radius (tol_radius).
+
+        Returns:
+            groups: list of list of cylinders
+            full: boolean array, True if the sum of the group areas is egal to 2*pi*radius*height
         """
-        #1. group cylinder by comparing their origin, if similar they are grouped
-        candidate_treads = []
+        if not cylinders:
+            return [], np.zeros(0, dtype=bool)
+
+        all_origins = np.array([c.origin.get_coordinate() for c in cylinders], dtype=np.float64).reshape(-1, 3)
+        # np.isclose(a, b) is |a - b| <= atol + rtol*|b|
+        cell_size = atol + rtol*np.max(np.abs(all_origins)) + 1e-12
+        cells = np.floor(all_origins/cell_size).astype(np.int64)
+
+        grid = defaultdict(list) # {origin cell: [group index,...]}
+        groups = []
         origins = []
-        for t in cylinders:
-            if origins == []:
-                candidate_treads.append([t])
-                origins.append(t.origin.get_coordinate())
-            else:
-                for i,origin in enumerate(origins):
-                    if np.isclose(origin, t.origin.get_coordinate(), atol=0.1).all():
-                        candidate_treads[i].append(t)
-                        break
-                    else:
-                        candidate_treads.append([t])
-                        origins.append(t.origin.get_coordinate())
+        axes = []
+        radii = []
+        group_of = np.zeros(len(cylinders), dtype=np.int64)
+
+        for i, c in enumerate(cylinders):
+            origin = all_origins[i]
+            axis = np.asarray(c.axis.get_vector(), dtype=np.float64)
+            axis = axis/np.linalg.norm(axis)
+            cell = cells[i]
+
+            found = None
+            for offset in NEIGHBOUR_OFFSETS:
+                for g in grid.get(tuple(cell + offset), ()):
+                    if (np.isclose(origin, origins[g], atol=atol, rtol=rtol).all()
+                            and abs(abs(np.dot(axis, axes[g])) - 1) <= tol_axis
+                            and abs(c.radius1 - radii[g]) <= tol_radius):
+                        found = g
                         break
+                if found is not None:
+                    break
 
-        #2. filter the candidate for each group, check the if the sum of the area is egal to np.pi*radius^2*height
-        threads = []
-        for i,group in enumerate(candidate_treads):
-            area = 0
-            for t in group:
-                area += t.area
+            if found is None:
+                found = len(groups)
+                groups.append([])
+                origins.append(origin)
+                axes.append(axis)
+                radii.append(c.radius1)
+                grid[tuple(cell)].append(found)
 
-            area_calculated = 2*group[0].radius1*np.pi * group[0].height
+            groups[found].append(c)
+            group_of[i] = found
 
-            if np.isclose(area,area_calculated, atol=0.01):
-                threads.append(group[0])
+        # one vectorized check of the full cylinder area for all the groups
+        area = np.bincount(group_of, weights=get_areas(cylinders), minlength=len(groups))
+        radius = np.array([g[0].radius1 for g in groups], dtype=np.float64)
+        height = np.array([g[0].height for g in groups], dtype=np.float64)
+        full = np.isclose(area, 2*radius*np.pi*height, atol=0.01)
 
-        return threads
+        return groups, full
+
+    def _filter_candidate_treads(self,cylinders:list):
+        """function to filter the candidate treads
+        only the full cylinder will be retained
+        """
+        groups, full = self._group_cylinders(cylinders)
+        return [g[0] for g, f in zip(groups, full) if f]
 
     def _filter_cylinders(self,cylinders:list):
         """function to filter the cylinder:
 
            return a list of full cylinders
         """
-        #1. group cylinder by comparing their origin, if similar they are grouped
-        candidate_cylinder = []
-        origins = []
-        for t in cylinders:
-            if origins == []:
-                candidate_cylinder.append([t])
-                origins.append(t.origin.get_coordinate())
-            else:
-                for i,origin in enumerate(origins):
-                    if np.isclose(origin, t.origin.get_coordinate(), atol=0.1).all():
-                        candidate_cylinder[i].append(t)
-                        break
-                    else:
-                        candidate_cylinder.append([t])
-                        origins.append(t.origin.get_coordinate())
-                        break
+        groups, full = self._group_cylinders(cylinders)
 
-        #2. filter the candidate for each group, check the if the sum of the area is egal to np.pi*radius^2*height
         full_cylinders = []
-        for i,group in enumerate(candidate_cylinder):
-            area = 0
-            for t in group:
-                area += t.area
-
-            area_calculated = 2*group[0].radius1*np.pi * group[0].height
-
-            if np.isclose(area,area_calculated, atol=0.01):
-                fc = group[0]
-                fc.area = area_calculated
+        for g, f in zip(groups, full):
+            if f:
+                fc = g[0]
+                fc.area = 2*fc.radius1*np.pi * fc.height
                 full_cylinders.append(fc)
 
         return full_cylinders
@@ -461,11 +410,8 @@ class Parse():
 
         return threads
 
-    def parse_obj(self,obj_id:str, min_diameter:float=3, max_diameter:float=20, ):
-        """function to extract kind of object"""
-
-        #logging.info(f"obj_id: {obj_id}")
-
+    def _get_part(self, obj_id:str):
+        """return the GEOM object of the part if it is a solid or a shell, otherwise None"""
         obj = salome.IDToObject(obj_id)
 
         if obj is None:
@@ -473,331 +419,606 @@ class Parse():
 
         if obj.GetShapeType() not in (GEOM.SOLID,GEOM.SHELL):
             return None
+
+        return obj
+
+    def classify(self, obj_id:str, subshapes_prop:list, min_diameter:float=3, max_diameter:float=20, fastener:bool=True):
+        """function to extract kind of object from the properties of its faces
+
+        Args:
+            fastener: False if the part cannot be a nut or a screw, only the threads are searched
+
+        Returns:
+            Nut, Screw, list of Thread or None
+        """
+        unfiltred_cyl = list()
+        other = list()
+
+        is_candidate = False
+        for p in subshapes_prop:
+                if isinstance(p, Cylinder):
+                    if (p.radius1*2)>=min_diameter and (p.radius1*2)<=max_diameter:
+                        is_candidate = True
+                        unfiltred_cyl.append(p)
+
+                elif isinstance(p,tuple(self.allow_type)) and isinstance(p,Cylinder) == False:
+                    other.append(p)
+
+        if not is_candidate:
+            return None
         
         else:
-            # get the subshapes of the object
-            subshapes= Geompy.SubShapeAll(obj,GEOM.FACE)
-
-            # get the basic properties from geompy
-            unfiltred_cyl = list()
-            other = list()
-
-            is_candidate = False
-            for s in subshapes:
-                    p = get_properties(s)
-                    
-                    if isinstance(p, Cylinder):
-                        if (p.radius1*2)>=min_diameter and (p.radius1*2)<=max_diameter:
-                            is_candidate = True
-                            unfiltred_cyl.append(p)
-
-                    elif isinstance(p,tuple(self.allow_type)) and isinstance(p,Cylinder) == False:
-                        other.append(p)
-
-            if not is_candidate:
-                return None
+            # regroup cylinder by comparing their origin, if similar and represent a full cylinder they are grouped
+            filtred_cyl =self._filter_cylinders(unfiltred_cyl)
+            props = filtred_cyl + other
             
-            else:
-                # regroup cylinder by comparing their origin, if similar and represent a full cylinder they are grouped
-                filtred_cyl =self._filter_cylinders(unfiltred_cyl)
-                props = filtred_cyl + other
+            screw_nut = self.is_nut_or_bolt(props) if fastener else None
+            if screw_nut is not None:
+                screw_nut.part_id = obj_id
+                return screw_nut
                 
-                screw_nut = self.is_nut_or_bolt(props)
-                if screw_nut is not None:
-                    screw_nut.part_id = obj_id
-                    return screw_nut
-                    
+            else:
+                is_tread = self.is_tread(props)
+                if is_tread is not None:
+                    for t in is_tread:
+                        t.part_id = obj_id
+                    return is_tread
                 else:
-                    is_tread = self.is_tread(props)
-                    if is_tread is not None:
-                        for t in is_tread:
-                            t.part_id = obj_id
-                        return is_tread
-                    else:
-                        return None
-
-def pair_screw_nut_threads(screw_list, nut_list, treads_list,tol_angle=0.01, tol_dist=0.01) -> dict:
-    """
-    Pair the screw and nut together
+                    return None
 
-    attributes:
-        screw_list: list of screw
-        nut_list: list of nut
-        treads_list: list of treads
-        tol_angle: tolerance angle to check if the axis are colinear
-        tol_dist: tolerance distance to check if the axis are colinear
-
-    return:
-        dict(bolts=screw_nut_pairs, treads=screw_thread_pairs)
-    """
+    def _reject(self, reason:str):
+        with self._lock:
+            self.rejected[reason] += 1
 
-    # 1. Pair the screw and nut together using itertools product
-    screw_nut_pairs = list(product(screw_list, nut_list))
+    def _housing(self):
+        with self._lock:
+            self.housings += 1
 
-    # 2.check if the screw and nut are coincident
-    S = ShapeCoincidence()
-    screw_nut_pairs = [p for p in screw_nut_pairs if S.are_axis_colinear(p[0], p[1],tol_angle, tol_dist)]
+    def report_rejected(self):
+        """log the number of parts rejected per reason and the number of housings"""
+        for reason, count in sorted(self.rejected.items()):
+            logging.info(f"parts rejected ({reason}): {count}")
+        logging.info(f"parts parsed for threads only (housing): {self.housings}")
 
-    # 3. check the distance between the screw and nut, if longer than the screw height, remove the pair
-    screw_nut_pairs = [p for p in screw_nut_pairs if np.linalg.norm(p[0].origin.get_coordinate() - p[1].origin.get_coordinate()) <= p[0].height]
+    def screen(self, obj, min_diameter:float=3, max_diameter:float=20, measures:dict=None):
+        """cheap pre-screen of a part from its bounding box, volume and number of faces
 
-    # 4.get the screw.part_id used for the nuts
-    screw_part_id_used = [s[0].part_id for s in screw_nut_pairs]
-    screw_remaining = [s for s in screw_list if s.part_id not in screw_part_id_used]
+        Only the parts that cannot hold any cylinder within the diameter range are rejected:
+        housings are kept as they hold the threads and the holes.
 
-    # 5.get the nut.part_id used for the screws
-    screw_thread_pairs = list(product(screw_remaining, treads_list))
-    screw_thread_pairs = [p for p in screw_thread_pairs if S.are_axis_colinear(p[0], p[1],tol_angle, tol_dist)]
+        Returns:
+            reason: reason of the rejection or None
+            fastener: False if the part is too large or too detailed to be a nut or a screw
+        """
+        if measures is None:
+            measures = part_measures(obj)
 
-    # TODO 6.remove the pair with the same screw on the screw_tread_pairs
+        n_faces = measures["n_faces"]
+        if n_faces == 0:
+            return "no_face", False
 
-    return dict(bolts=screw_nut_pairs, threads=screw_thread_pairs)
+        # a cylinder of diameter d has at least two bounding box extents larger than d/sqrt(2)
+        bbox = measures["bbox"]
+        extents = np.sort(bbox[1::2] - bbox[0::2])
+        if extents[1] < min_diameter/np.sqrt(2) - self.SCREEN_TOLERANCE:
+            return "bbox", False
 
-def pair_holes(holes_list,tol_angle=0.01, tol_dist=0.01) -> dict:
-    """
-    Pair the holes together
+        if obj.GetShapeType() == GEOM.SOLID and abs(measures["basic"][2]) <= self.SCREEN_TOLERANCE:
+            return "volume", False
 
-    attributes:
-        holes_list: list of holes
-    Pair the hole together
+        fastener = n_faces <= self.FASTENER_FACES_MAXIMUM and extents[2] <= self.FASTENER_LENGTH_RATIO_MAXIMUM*max_diameter
+        return None, fastener
 
-    attributes:
-        hole_list: list of screw
-        tol_angle: tolerance angle to check if the axis are colinear
-        tol_dist: tolerance distance to check if the axis are colinear
+    @staticmethod
+    def _candidate_cylinders(table:FaceTable, min_diameter:float=3, max_diameter:float=20) -> np.ndarray:
+        """return the cylinders of the face table with a diameter within the range
 
-    return:
-        dict(bolts=screw_nut_pairs, treads=screw_thread_pairs)
-    """
+        Returns:
+            array of shape (n,8): origin, axis, radius, height
+        """
+        rows = table[table.cylinders(min_diameter, max_diameter)]
+        return np.hstack((rows["origin"], rows["axis"], rows["radius1"][:, None], rows["height"][:, None])).astype(np.float64)
 
-    #1. pair the holes together using itertools
+    def _screen_part(self, obj, min_diameter:float=3, max_diameter:float=20, measures:dict=None, pattern:bool=False):
+        """pre-screen a part then run a KindOfShape only pass on its faces
 
-    hole_pairs = list(combinations(holes_list, 2))
+        Args:
+            pattern: also return the pattern item of the part (see pattern_item) from the same pass
 
-    #2. check if the holes are coincident
-    S = ShapeCoincidence()
-    hole_pairs = [p for p in hole_pairs if S.are_axis_colinear(p[0], p[1],tol_angle, tol_dist)]
+        Returns:
+            None if rejected, otherwise (faces, kind of shape of the faces, fastener, pattern item or None)
+            faces not handled by classify have a None kind of shape
+        """
+        if measures is None:
+            measures = part_measures(obj)
+        reason, fastener = self.screen(obj, min_diameter, max_diameter, measures)
+        if reason is not None:
+            self._reject(reason)
+            return None
 
-    logging.info(f"hole_pairs: {hole_pairs}")
+        subshapes = Geompy.SubShapeAll(obj,GEOM.FACE)
+        kos = [Geompy.KindOfShape(s) for s in subshapes]
+        table = FaceTable.from_kos(kos)
 
-    #3. check the min and max distance between the pair holes extremities
-    valid_pairs=[]
-    for p in hole_pairs:
-        p0_s = p[0].origin.get_coordinate()
-        p0_e = p[0].end.get_coordinate()
-        p1_s = p[1].origin.get_coordinate()
-        p1_e = p[1].end.get_coordinate()
+        # BasicProperties and edge exploration are only needed once a candidate cylinder is found
+        if not table.cylinders(min_diameter, max_diameter).any():
+            self._reject("no_cylinder")
+            return None
 
-        dist = [np.linalg.norm(p0_s - p1_s),np.linalg.norm(p0_s - p1_e),np.linalg.norm(p0_e - p1_s),np.linalg.norm(p0_e - p1_e)]
-        min_dist = np.min(dist)
-        max_dist = np.max(dist)
-        logging.info(f"min_dist: {min_dist} \t max_dist: {max_dist}")
+        if not fastener:
+            self._housing()
+
+        item = None
+        if pattern and fastener:
+            try:
+                item = self._pattern_item_of(measures, table, min_diameter, max_diameter)
+            except Exception as e:
+                logging.warning(f"Cannot get the pattern item of {obj.GetName()}: {e}")
+
+        allow_kinds = [k for k, c in type_to_class.items() if c in self.allow_type]
+        kos = [k if str(k[0]) in allow_kinds else None for k in kos]
+        return subshapes, kos, fastener, item
+
+    def _cache_key(self, obj, measures:dict, min_diameter:float, max_diameter:float):
+        """key of a part in the cache: fingerprint, diameter range and classification parameters"""
+        params = (self.NUT_RATIO_MINIMUM, self.NUT_RATIO_MAXIMUM, self.SCREW_RATIO_MINIMUM, self.THREAD_RATIO_MINIMUM,
+                  self.FASTENER_FACES_MAXIMUM, self.FASTENER_LENGTH_RATIO_MAXIMUM)
+        return self.cache.key(fingerprint(obj, measures), min_diameter, max_diameter, params)
+
+    @staticmethod
+    def _assign_part(result, obj_id:str):
+        """set the part id of a cached result, the same geometry can be found under another study entry"""
+        if isinstance(result, list):
+            for t in result:
+                t.part_id = obj_id
+        elif result is not None:
+            result.part_id = obj_id
+        return result
+
+    def invalidate_cache(self, obj_ids:list=None) -> int:
+        """remove the parts from the classification cache, all the entries if obj_ids is None"""
+        if self.cache is None:
+            return 0
+        if obj_ids is None:
+            return self.cache.invalidate()
+
+        count = 0
+        for obj_id in obj_ids:
+            obj = self._get_part(obj_id)
+            if obj is not None:
+                count += self.cache.invalidate(fingerprint(obj))
+        return count
+
+    def parse_shape(self, obj, obj_id:str, min_diameter:float=3, max_diameter:float=20):
+        """function to extract kind of a solid or shell GEOM object, obj_id is stored as part_id"""
+        measures = part_measures(obj)
+
+        key = None
+        if self.cache is not None:
+            key = self._cache_key(obj, measures, min_diameter, max_diameter)
+            found, result = self.cache.get(key)
+            if found:
+                return self._assign_part(result, obj_id)
+
+        result = None
+        screened = self._screen_part(obj, min_diameter, max_diameter, measures)
+        if screened is not None:
+            subshapes, kos, fastener, _ = screened
+
+            # edges are shared between faces, analyze them once for the part
+            edge_cache = EdgeCache(obj)
+
+            # get the properties from geompy
+            props = [get_properties(s, edge_cache=edge_cache, kos=k) for s, k in zip(subshapes, kos) if k is not None]
+            result = self.classify(obj_id, props, min_diameter, max_diameter, fastener)
+
+        if key is not None:
+            self.cache.put(key, result)
+        return result
+
+    def pattern_item(self, obj, min_diameter:float=3, max_diameter:float=20, decimals:int=3):
+        """signature and reference axis of a part for the pattern detection, from a KindOfShape only pass
+
+        The signature gathers the number of faces, the area, the volume and the candidate cylinders
+        (radius, height and level along the reference axis): two parts with the same signature are
+        copies of each other. The reference is the largest candidate cylinder.
 
-        # valid if the max distance is larger than the sum height of height the hole
-        if max_dist >= p[0].height + p[1].height:
-            valid_pairs.append(p)
+        Returns:
+            (signature, origin, axis) or None if the part cannot be replicated (rejected, housing, ambiguous reference)
+        """
+        measures = part_measures(obj)
+        reason, fastener = self.screen(obj, min_diameter, max_diameter, measures)
+        if reason is not None or not fastener:
+            return None
 
-    logging.info(f"valid_pairs: {valid_pairs}")
-    return dict(holes=valid_pairs)
- 
-def create_virtual_bolt(pair:list):
+        table = FaceTable.from_kos([Geompy.KindOfShape(f) for f in Geompy.SubShapeAll(obj,GEOM.FACE)])
+        return self._pattern_item_of(measures, table, min_diameter, max_diameter, decimals)
 
-    if isinstance(pair[0],Nut) and isinstance(pair[1],Screw):
-        nut = pair[0]
-        screw = pair[1]
+    def _pattern_item_of(self, measures:dict, table:FaceTable, min_diameter:float=3, max_diameter:float=20, decimals:int=3):
+        """pattern item of a fastener from its measures and the face table of its KindOfShape, see pattern_item"""
+        cyl = self._candidate_cylinders(table, min_diameter, max_diameter)
+        if len(cyl) == 0:
+            return None
 
-    elif isinstance(pair[0],Screw) and isinstance(pair[1],Nut):
-        screw = pair[0]
-        nut = pair[1]
+        # reference: largest radius then largest height, split faces of the same cylinder share it
+        order = np.lexsort((-cyl[:, 7], -cyl[:, 6]))
+        cyl = cyl[order]
+        ref = cyl[0]
+        same = np.isclose(cyl[:, 6], ref[6]) & np.isclose(cyl[:, 7], ref[7])
+        if np.any(np.linalg.norm(cyl[same, 0:3] - ref[0:3], axis=1) > 10**-decimals):
+            return None
 
-    else:
-        return None
-    
-    #1.get the origin of the screw
-    origin = screw.origin.get_coordinate()
+        axis = ref[3:6]/np.linalg.norm(ref[3:6])
+        levels = (cyl[:, 0:3] - ref[0:3]) @ axis
+        rows = sorted(zip(np.round(cyl[:, 6], decimals), np.round(cyl[:, 7], decimals), np.round(levels, decimals) + 0.0))
+        signature = (measures["n_faces"],
+                     round(float(measures["basic"][1]), decimals),
+                     round(float(measures["basic"][2]), decimals),
+                     tuple((float(r), float(h), float(l)) for r, h, l in rows))
+        return signature, ref[0:3], axis
 
-    #2.get the nut extremity points
-    nut_ext = [nut.origin.get_coordinate(),nut.origin.get_coordinate() + nut.axis.get_vector() * nut.height]
+    def find_patterns(self, obj_ids:list, min_diameter:float=3, max_diameter:float=20, max_workers:int=4, max_in_flight:int=None,
+                      tol_angle:float=0.01, tol_dist:float=0.01, min_members:int=3, prepared:list=None) -> list:
+        """detect the circular and linear patterns of identical fasteners from a KindOfShape only pass
 
-    #3.get the closest point from the screw origin
-    nut_ext_dist = [np.linalg.norm(origin - n) for n in nut_ext]
-    nut_ext = nut_ext[np.argmin(nut_ext_dist)]
-    
-    # create the virtual bolt
-    bolt_properties = {
-        'start': Point(*origin),
-        'end': Point(*nut_ext),
-        'radius': screw.radius,
-        'start_radius': screw.contact_radius,
-        'start_height': 1.0,
-        'end_radius': nut.contact_radius,
-        'end_height': -1.0,
-    }
-
-    return bolt_properties
-
-def create_virtual_bolt_from_thread(pair:list):
-    
-    if isinstance(pair[0],Thread) and isinstance(pair[1],Screw):
-        thread = pair[0]
-        screw = pair[1]
+        Args:
+            prepared: result of prepare_part for each part, the parts are not read again (see parse_parts)
 
-    elif isinstance(pair[0],Screw) and isinstance(pair[1],Thread):
-        screw = pair[0]
-        thread = pair[1]
+        Returns:
+            list of Pattern (common.bolt.pattern), the members are indices in obj_ids
+        """
+        if prepared is None:
+            with BoundedPool(max_workers, max_in_flight) as pool:
+                prepared = list(pool.map(lambda obj_id: self.prepare_part(obj_id, min_diameter, max_diameter, pattern=True), obj_ids))
+
+        keys = []
+        origins = np.zeros((len(obj_ids), 3))
+        axes = np.zeros((len(obj_ids), 3))
+        for i, part in enumerate(prepared):
+            item = part["pattern"]
+            if item is None:
+                keys.append(None)
+                continue
+            keys.append(item[0])
+            origins[i] = item[1]
+            axes[i] = item[2]
+
+        patterns = find_patterns(keys, origins, axes, tol_angle, tol_dist, min_members)
+        logging.info(f"{len(patterns)} patterns found: {patterns}")
+        return patterns
+
+    @staticmethod
+    def replicate(result, transform:Transform, obj_id:str):
+        """return a copy of a parse result (Nut, Screw, list of Thread or None) moved by transform, for the part obj_id"""
+        if result is None:
+            return None
 
-    else:
-        return None
-    
-    #1.get the origin of the screw
-    origin = screw.origin.get_coordinate()
+        items = result if isinstance(result, list) else [result]
+        res = []
+        for it in items:
+            c = copy.copy(it)
+            c.part_id = obj_id
+            c.origin = Point(*transform.apply_point(it.origin.get_coordinate()))
+            if hasattr(it, 'axis'):
+                c.axis = Vector(*transform.apply_vector(it.axis.get_vector()))
+            if hasattr(it, 'end'):
+                c.end = Point(*transform.apply_point(it.end.get_coordinate()))
+            res.append(c)
 
-    #2.get the thread extremity points
-    thread_ext = [thread.origin.get_coordinate(),thread.end.get_coordinate()]
+        return res if isinstance(result, list) else res[0]
 
-    #3.get the closest point from the screw origin
-    thread_ext_dist = [np.linalg.norm(origin - n) for n in thread_ext]
-    thread_ext = thread_ext[np.argmin(thread_ext_dist)]
+    def parse_obj(self,obj_id:str, min_diameter:float=3, max_diameter:float=20, ):
+        """function to extract kind of object"""
 
-    if np.isclose(origin, thread_ext, atol=0.1).all():
-        return None
+        #logging.info(f"obj_id: {obj_id}")
 
-    o_dist = np.linalg.norm(origin - thread_ext)
-    screw_remaining = screw.height - o_dist
-    
-    end_height = 0
+        obj = self._get_part(obj_id)
+        if obj is None:
+            return None
 
-    if screw_remaining <= 0:
-        return None
-    
-    elif screw_remaining > thread.height:
-        end_height = thread.height
-        
-    else:
-        end_height = screw_remaining
-
-    # create the virtual bolt
-    bolt_properties = {
-        'start': Point(*origin),
-        'end': Point(*thread_ext),
-        'radius': screw.radius,
-        'start_radius': screw.contact_radius,
-        'start_height': 1.0,
-        'end_radius': thread.radius,
-        'end_height': end_height,
-    }
-
-    return bolt_properties
-
-def create_virtual_bolt_from_hole(pair:list):
-
-    commom_bolt_diameter = [2,3,3.5,4,5,6,8,10,12,14,16,20,24,30,36,42,48,56,64,72,80,90,100]
-    factor_diamter_to_head = 1.6
-
-    # 1 from the list of points get the farthest points form each other
-    p0_s = pair[0].origin.get_coordinate()
-    p0_e = pair[0].end.get_coordinate()
-    p1_s = pair[1].origin.get_coordinate()
-    p1_e = pair[1].end.get_coordinate()
-    dist = [np.linalg.norm(p0_s - p1_s),np.linalg.norm(p0_s - p1_e),np.linalg.norm(p0_e - p1_s),np.linalg.norm(p0_e - p1_e)]
-    max_dist = np.max(dist)
-
-    extremity = None
-    if max_dist == np.linalg.norm(p0_s - p1_s):
-        extremity= dict(start=Point(*p0_s),end=Point(*p1_s))
-    elif max_dist == np.linalg.norm(p0_s - p1_e):
-        extremity= dict(start=Point(*p0_s),end=Point(*p1_e))
-    elif max_dist == np.linalg.norm(p0_e - p1_s):
-        extremity= dict(start=Point(*p0_e),end=Point(*p1_s))
-    elif max_dist == np.linalg.norm(p0_e - p1_e):
-        extremity= dict(start=Point(*p0_e),end=Point(*p1_e))
-
-    # 2 get the diameter of the hole
-    radius1 = pair[0].radius
-    radius2 = pair[1].radius
-
-    if radius1 != radius2:
-        screw_radius= 0.0
-        extremity_start = 0
-
-        # suppose junction screw and threads, the largest diameter been the screw
-        if radius1 > radius2:
-            screw_radius_ref = radius1
-            thread_radius_ref = radius2
-            thread_height = pair[1].height
-            extremity_start = 0
-
-        elif radius2 > radius1:
-            screw_radius_ref = radius2
-            thread_radius_ref = radius1
-            thread_height = pair[0].height
-            extremity_start = 1
-
-        # get the diamter of the screw by searching the closed value in the list commom_bolt_diameter
-        d_idx = np.argmin([np.abs(np.array(commom_bolt_diameter) - screw_radius_ref*2)])
-        diameter = commom_bolt_diameter[d_idx]
-        radius = diameter/2
-
-        if radius*factor_diamter_to_head < screw_radius_ref:
-            screw_radius = screw_radius_ref*factor_diamter_to_head
+        return self.parse_shape(obj, obj_id, min_diameter, max_diameter)
 
-        else:
-            screw_radius = radius*factor_diamter_to_head
-
-        # create the virtual bolt
-        bolt_properties = {
-            'start': extremity['start'],
-            'end': extremity['end'],
-            'radius': screw_radius,
-            'start_radius': 0.0,
-            'start_height': 0.0,
-            'end_radius': 0.0,
-            'end_height': 0.0,
-        }
-
-        if extremity_start == 0:
-            bolt_properties['start_radius'] = screw_radius
-            bolt_properties['start_height'] = 1.0
-            bolt_properties['end_radius'] = thread_radius_ref
-            bolt_properties['end_height'] = -thread_height
-
-        elif extremity_start == 1:
-            bolt_properties['start_radius'] = thread_radius_ref
-            bolt_properties['start_height'] = thread_height
-            bolt_properties['end_radius'] = screw_radius
-            bolt_properties['end_height'] = -1.0
-
-
-    elif radius2 == radius1:
-        contact_radius = 0.0
-        # suppose junction screw and nut
-        # get the diamter of the screw by searching the closed value in the list commom_bolt_diameter
-        d_idx = np.argmin([np.abs(np.array(commom_bolt_diameter) - radius1*2)])
-        diameter = commom_bolt_diameter[d_idx]
-        radius = diameter/2
-
-        if radius*factor_diamter_to_head < radius1:
-            contact_radius = radius1*factor_diamter_to_head
-        
-        else:
-            contact_radius = radius*factor_diamter_to_head
+    def prepare_part(self, obj_id:str, min_diameter:float=3, max_diameter:float=20, pattern:bool=False) -> dict:
+        """
+        read a part once before its classification: measures, cache lookup, then screening and
+        KindOfShape pass of the parts not found in the cache
+
+        Args:
+            pattern: compute the pattern item of the screened parts from the same pass
+
+        Returns:
+            dict(obj, found: bool, result: cached result, key: cache key or None,
+                 screened: see _screen_part or None, pattern: pattern item or None)
+            obj is None if the part is not found
+        """
+        res = dict(obj=None, found=False, result=None, key=None, screened=None, pattern=None)
+        obj = self._get_part(obj_id)
+        if obj is None:
+            return res
+        res["obj"] = obj
+        try:
+            measures = part_measures(obj)
+            if self.cache is not None:
+                key = self._cache_key(obj, measures, min_diameter, max_diameter)
+                found, result = self.cache.get(key)
+                if found:
+                    res.update(found=True, result=self._assign_part(result, obj_id))
+                    return res
+                res["key"] = key
+            screened = self._screen_part(obj, min_diameter, max_diameter, measures, pattern)
+            if screened is not None:
+                res.update(screened=screened[:3], pattern=screened[3])
+        except Exception as e:
+            logging.warning(f"Cannot screen {obj_id}: {e}")
+            res.update(key=None, screened=None, pattern=None)
+        return res
+
+    def parse_objs(self, obj_ids:list, min_diameter:float=3, max_diameter:float=20, max_workers:int=4, max_in_flight:int=None,
+                   prepared:list=None):
+        """function to extract kind of several objects, the faces of all parts are classified in a bounded thread pool
+
+        Args:
+            obj_ids: list of part study entries
+            max_workers: number of threads, 1 runs sequentially
+            max_in_flight: maximum number of concurrent requests to the GEOM server (default: 2*max_workers),
+                shared by the screening of the parts and the classification of their faces
 
-        # create the virtual bolt
-        bolt_properties = {
-            'start': extremity['start'],
-            'end': extremity['end'],
-            'radius': radius,
-            'start_radius': contact_radius,
-            'start_height': 1.0,
-            'end_radius': contact_radius,
-            'end_height': -1.0,
-        }
+            prepared: result of prepare_part for each part, these parts are not read again
 
-    return bolt_properties
+        Yields:
+            result of parse_obj for each part, in the order of obj_ids
+            the parts found in the cache are not screened nor classified
+        """
+        # results found in the cache and cache keys of the other parts, by part index
+        cached = dict()
+        keys = dict()
+
+        def screen(item):
+            i, obj_id = item
+            part = prepared[i] if prepared is not None else self.prepare_part(obj_id, min_diameter, max_diameter)
+            if part["found"]:
+                cached[i] = part["result"]
+            elif part["key"] is not None:
+                keys[i] = part["key"]
+            return i, part["obj"], part["screened"]
+
+        def result(i, props, fastener):
+            if i in cached:
+                return cached.pop(i)
+            res = self.classify(obj_ids[i], props, min_diameter, max_diameter, fastener)
+            if i in keys:
+                self.cache.put(keys.pop(i), res)
+            return res
+
+        def tasks(pool):
+            # the parts are screened first, only the candidate faces are classified, in the same pool
+            for i, obj, screened in pool.map(screen, enumerate(obj_ids)):
+                if screened is None:
+                    # keep a task for the part, it will be classified as nothing
+                    yield (i, None, None, None, False)
+                    continue
+                subshapes, kos, fastener = screened
+                edge_cache = EdgeCache(obj)
+                for s, k in zip(subshapes, kos):
+                    if k is not None:
+                        yield (i, s, k, edge_cache, fastener)
+
+        def work(task):
+            i, face, kos, edge_cache, fastener = task
+            if face is None:
+                return i, None, fastener
+            try:
+                return i, get_properties(face, edge_cache=edge_cache, kos=kos), fastener
+            except Exception as e:
+                logging.warning(f"Cannot get properties of a face of {obj_ids[i]}: {e}")
+                return i, None, fastener
+
+        # results are in the order of the tasks: the faces of each part are consecutive
+        current = 0
+        props = []
+        fastener = True
+        with BoundedPool(max_workers, max_in_flight) as pool:
+            for i, p, f in pool.map(work, tasks(pool)):
+                if i != current:
+                    yield result(current, props, fastener)
+                    current = i
+                    props = []
+                props.append(p)
+                fastener = f
+
+        if obj_ids:
+            yield result(current, props, fastener)
+
+    def _parse_objs_backend(self, obj_ids:list, min_diameter:float=3, max_diameter:float=20, max_workers:int=4, max_in_flight:int=None):
+        """function to extract kind of several objects with the backend, in a process pool
+
+        The parts are exported as BREP files in a temporary directory, the backend parse them in spawned
+        processes (a forked process would share the CORBA connection of the GUI).
+
+        Yields:
+            result of the backend for each part, in the order of obj_ids
+        """
+        with tempfile.TemporaryDirectory(prefix="virtual_bolt_") as tmp:
+            def tasks():
+                for i, obj_id in enumerate(obj_ids):
+                    obj = self._get_part(obj_id)
+                    if obj is None:
+                        yield None
+                        continue
+                    brep = os.path.join(tmp, f"part_{i}.brep")
+                    Geompy.ExportBREP(obj, brep)
+                    yield (self.backend, brep, obj_id, min_diameter, max_diameter)
+
+            yield from bounded_map(_run_backend, tasks(), max_workers, max_in_flight,
+                                   executor_class=ProcessPoolExecutor,
+                                   mp_context=multiprocessing.get_context("spawn"))
+
+    @staticmethod
+    def merge(results:list) -> tuple:
+        """split the results of parse_obj in nuts, screws and threads, in the order of the results"""
+        nuts=[]
+        screws=[]
+        threads=[]
+        for o in results:
+            if isinstance(o,Nut):
+                nuts.append(o)
+
+            elif isinstance(o,Screw):
+                screws.append(o)
+
+            elif isinstance(o,list):
+                for e in o:
+                    if isinstance(e,Thread):
+                        threads.append(e)
 
+        return nuts, screws, threads
 
+    def _parse_objs_patterns(self, obj_ids:list, patterns:list, min_diameter:float=3, max_diameter:float=20, max_workers:int=4, max_in_flight:int=None,
+                             prepared:list=None):
+        """function to extract kind of several objects, the members of the patterns are replicated from their representative
+
+        Args:
+            prepared: result of prepare_part for each part (see parse_objs)
+
+        Yields:
+            result for each part, in the order of obj_ids
+        """
+        replicas = dict()
+        for p in patterns:
+            for m, t in zip(p.members[1:], p.transforms[1:]):
+                replicas[m] = (p.representative, t)
+
+        parsed_ids = [o for i, o in enumerate(obj_ids) if i not in replicas]
+        parsed_prepared = None
+        if prepared is not None:
+            parsed_prepared = [p for i, p in enumerate(prepared) if i not in replicas]
+        parsed = self.parse_objs(parsed_ids, min_diameter, max_diameter, max_workers, max_in_flight, parsed_prepared)
+
+        # the representative is the first member: its result is known before the other members
+        representatives = set(p.representative for p in patterns)
+        results = dict()
+        try:
+            for i, obj_id in enumerate(obj_ids):
+                if i in replicas:
+                    rep, transform = replicas[i]
+                    o = self.replicate(results[rep], transform, obj_id)
+                    # the replicas are cached as well, an unchanged assembly is not read again
+                    if prepared is not None and prepared[i]["key"] is not None:
+                        self.cache.put(prepared[i]["key"], o)
+                    yield o
+                    continue
+                o = next(parsed)
+                if i in representatives:
+                    results[i] = o
+                yield o
+        finally:
+            parsed.close()
+
+    def parse_parts(self, obj_ids:list, min_diameter:float=3, max_diameter:float=20, max_workers:int=4, max_in_flight:int=None, progress=None, cancel=None, patterns:bool=False) -> dict:
+        """parse several parts in a worker pool and merge the nuts, screws and threads
+
+        The results are merged in the order of obj_ids whatever the order the workers complete,
+        so the pairing and the ids of the bolts do not depend on the number of workers.
+        If backend is set, the parts are parsed in a process pool from exported BREP files,
+        otherwise the faces are classified in a thread pool (parse_objs).
 
+        Args:
+            obj_ids: list of part study entries
+            max_workers: number of workers, 1 runs sequentially
+            max_in_flight: maximum number of parts or faces submitted at the same time
+            progress: callable(done, total) called after each part, twice per part with patterns
+                (pattern pass then classification)
+            cancel: threading.Event, the parsing stops once it is set
+            patterns: detect the patterns of identical fasteners, only one part per pattern is classified.
+                The parts are read once: the parts found in the cache are not in a pattern, the measures
+                and the KindOfShape pass of the pattern detection are reused by the classification
 
+        Returns:
+            dict {nuts: list, screws: list, threads: list, parsed: int, cancelled: bool,
+                  rejected: dict of the reject counts, housings: int, cache: cache statistics or None,
+                  patterns: list of Pattern}
+        """
+        self.rejected.clear()
+        self.housings = 0
+        results = []
+        cancelled = cancel is not None and cancel.is_set()
+        total = len(obj_ids)
+
+        found = []
+        prepared = None
+        if self.backend is None and patterns and not cancelled:
+            total = 2*len(obj_ids)
+            prepared = []
+            with BoundedPool(max_workers, max_in_flight) as pool:
+                reader = pool.map(lambda obj_id: self.prepare_part(obj_id, min_diameter, max_diameter, pattern=True), obj_ids)
+                try:
+                    for part in reader:
+                        prepared.append(part)
+                        if progress is not None:
+                            progress(len(prepared), total)
+                        if cancel is not None and cancel.is_set():
+                            cancelled = True
+                            break
+                finally:
+                    reader.close()
+            if not cancelled:
+                found = self.find_patterns(obj_ids, min_diameter, max_diameter, prepared=prepared)
+
+        if found:
+            parsed = self._parse_objs_patterns(obj_ids, found, min_diameter, max_diameter, max_workers, max_in_flight, prepared)
+        elif self.backend is None:
+            parsed = self.parse_objs(obj_ids, min_diameter, max_diameter, max_workers, max_in_flight, prepared)
+        else:
+            parsed = self._parse_objs_backend(obj_ids, min_diameter, max_diameter, max_workers, max_in_flight)
+
+        done = total - len(obj_ids)
+        try:
+            if not cancelled:
+                for o in parsed:
+                    results.append(o)
+                    if progress is not None:
+                        progress(done + len(results), total)
+                    if cancel is not None and cancel.is_set():
+                        cancelled = True
+                        break
+        finally:
+            # stop the workers, the parts not started are cancelled
+            parsed.close()
+
+        if cancelled:
+            logging.info(f"parsing cancelled after {len(results)}/{len(obj_ids)} parts")
+        self.report_rejected()
+
+        cache_stats = None
+        if self.cache is not None:
+            cache_stats = self.cache.stats()
+            logging.info(f"parse cache: {cache_stats}")
+            self.cache.save()
+
+        nuts, screws, threads = self.merge(results)
+        return dict(nuts=nuts, screws=screws, threads=threads, parsed=len(results), cancelled=cancelled, rejected=dict(self.rejected), housings=self.housings, cache=cache_stats, patterns=found)
+
+def _run_backend(task):
+    """run a backend task of Parse._parse_objs_backend, in a worker process"""
+    if task is None:
+        return None
+    backend, *args = task
+    try:
+        return backend(*args)
+    except Exception as e:
+        logging.warning(f"Cannot parse {args[1]}: {e}")
+        return None
 
+def parse_brep(brep_file:str, part_id:str, min_diameter:float=3, max_diameter:float=20):
+    """extract kind of a part exported as BREP, stand-in backend of Parse using the GEOM server"""
+    obj = Geompy.ImportBREP(brep_file)
+    if obj is None:
+        return None
 
+    if obj.GetShapeType() not in (GEOM.SOLID,GEOM.SHELL):
+        parts = Geompy.SubShapeAll(obj,GEOM.SOLID) or Geompy.SubShapeAll(obj,GEOM.SHELL)
+        if not parts:
+            return None
+        obj = parts[0]
 
+    return Parse().parse_shape(obj, part_id, min_diameter, max_diameter)
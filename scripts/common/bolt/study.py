@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+# bulk creation of the virtual bolts geometry in the study
+# License: LGPL v 3.0
+# Autor: Marc DUBOC
+# Version: 19/10/2026
+
+import json
+import numpy as np
+import salome
+import SALOMEDS
+from salome.geom import geomBuilder
+from common import logging
+
+Geompy = geomBuilder.New()
+
+# sub-shape ids of a line made of two points: the edge itself then its two vertices
+LINE_EDGE_ID = 1
+LINE_START_ID = 2
+LINE_END_ID = 3
+
+BOLT_COLOR = SALOMEDS.Color(0.0, 1.0, 0.0)
+
+# version of the bolt manifest stored on the virtual bolts folder
+MANIFEST_VERSION = 1
+
+
+def bolt_endpoints(bolts:list) -> tuple:
+    """return the start and end points of a list of VirtualBolt as two arrays of shape (n,3)"""
+    starts = np.array([b.start.get_coordinate() for b in bolts], dtype=np.float64).reshape(-1, 3)
+    ends = np.array([b.end.get_coordinate() for b in bolts], dtype=np.float64).reshape(-1, 3)
+    return starts, ends
+
+
+def make_vertices(starts:np.ndarray, ends:np.ndarray) -> tuple:
+    """create one vertex per distinct point of the endpoints arrays
+
+    Returns:
+        vertices: list of GEOM vertices
+        start_idx, end_idx: index in vertices of the start and end point of each line
+    """
+    n = len(starts)
+    points, inverse = np.unique(np.vstack((starts, ends)), axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    vertices = [Geompy.MakeVertex(*p) for p in points.tolist()]
+    return vertices, inverse[:n], inverse[n:]
+
+
+def create_bolt_lines(bolts:list, folder=None, folder_name:str="Virtual Bolts", refresh:bool=True) -> tuple:
+    """create and publish the lines of a list of VirtualBolt
+
+    Each line is published with its three groups (bolt, start and end) whose sub-shape ids
+    are known without exploring the line. All lines are moved to the folder in one call
+    and the object browser is refreshed once.
+
+    Args:
+        bolts: list of VirtualBolt
+        folder: SObject of the virtual bolts folder, created if None
+        folder_name: name of the folder to create
+        refresh: refresh the object browser at the end
+
+    Returns:
+        entries: study entry of the line of each bolt
+        folder: SObject of the folder
+    """
+    if not bolts:
+        return [], folder
+
+    #1. points shared by several bolts are created once
+    starts, ends = bolt_endpoints(bolts)
+    vertices, start_idx, end_idx = make_vertices(starts, ends)
+    logging.info(f"{len(bolts)} bolts, {len(vertices)} vertices")
+
+    #2. lines and groups
+    lines = []
+    entries = []
+    for b, i0, i1 in zip(bolts, start_idx, end_idx):
+        l = Geompy.MakeLineTwoPnt(vertices[i0], vertices[i1])
+        l.SetColor(BOLT_COLOR)
+        entries.append(Geompy.addToStudy(l, b.get_detail_name()))
+        lines.append(l)
+
+        for name, shape_type, sub_id in ((b.get_bolt_name(), "EDGE", LINE_EDGE_ID),
+                                         (b.get_start_name(), "VERTEX", LINE_START_ID),
+                                         (b.get_end_name(), "VERTEX", LINE_END_ID)):
+            grp = Geompy.CreateGroup(l, Geompy.ShapeType[shape_type])
+            Geompy.AddObject(grp, sub_id)
+            Geompy.addToStudyInFather(l, grp, name)
+
+    #3. publication in the folder
+    if folder is None:
+        folder = Geompy.NewFolder(folder_name)
+    Geompy.PutListToFolder(lines, folder)
+
+    if refresh and salome.sg.hasDesktop():
+        salome.sg.updateObjBrowser()
+
+    return entries, folder
+
+
+def rename_objects(names:dict, refresh:bool=True) -> int:
+    """rename several study objects in one study transaction
+
+    Args:
+        names: dict {study entry: new name}
+        refresh: refresh the object browser at the end
+
+    Returns:
+        number of objects renamed
+    """
+    builder = salome.myStudy.NewBuilder()
+    count = 0
+
+    builder.NewCommand()
+    try:
+        for sid, name in names.items():
+            sobj = salome.IDToSObject(sid)
+            if sobj is None:
+                logging.warning(f"study object {sid} not found")
+                continue
+
+            sobj.GetObject().SetName(name)
+            attr = builder.FindOrCreateAttribute(sobj, "AttributeName")
+            attr.SetValue(name)
+            count += 1
+    except Exception:
+        builder.AbortCommand()
+        raise
+    builder.CommitCommand()
+
+    if refresh and salome.sg.hasDesktop():
+        salome.sg.updateObjBrowser()
+
+    return count
+
+
+def write_manifest(folder_sid:str, bolts:list):
+    """store the endpoints of the virtual bolts as a json comment of the virtual bolts folder
+
+    The manifest is keyed by the study entry of the lines, with their name so that a
+    renamed or replaced line is detected when it is read back.
+    """
+    sobj = salome.IDToSObject(folder_sid)
+    if sobj is None:
+        logging.warning(f"bolt folder {folder_sid} not found, manifest not saved")
+        return
+
+    manifest = dict(version=MANIFEST_VERSION, bolts=dict())
+    for b in bolts:
+        if b.sid is None:
+            continue
+        manifest["bolts"][b.sid] = dict(name=b.get_detail_name(),
+                                        start=b.start.get_coordinate().tolist(),
+                                        end=b.end.get_coordinate().tolist())
+
+    builder = salome.myStudy.NewBuilder()
+    attr = builder.FindOrCreateAttribute(sobj, "AttributeComment")
+    attr.SetValue(json.dumps(manifest))
+
+
+def read_manifest(folder_sid:str) -> dict:
+    """return the bolt manifest of the virtual bolts folder {line entry: {name, start, end}}, empty if none"""
+    if folder_sid is None:
+        return dict()
+
+    sobj = salome.IDToSObject(folder_sid)
+    if sobj is None:
+        return dict()
+
+    found, attr = sobj.FindAttribute("AttributeComment")
+    if not found:
+        return dict()
+
+    try:
+        manifest = json.loads(attr.Value())
+    except ValueError:
+        logging.warning(f"invalid bolt manifest on {folder_sid}")
+        return dict()
+
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return dict()
+    return manifest.get("bolts", dict())
@@ -7,12 +7,29 @@
 import re
 import salome
 import GEOM
+from salome.geom import geomBuilder
 
 from common import logging
 from common.tree import Tree, ObjectType
-from common.properties import get_properties
+from common.geometry import Point
 from common.bolt.shape import VirtualBolt
 
+Geompy = geomBuilder.New()
+
+# name of a virtual bolt line: _B{id}_{radius}_{start_radius}_{end_radius}_{start_height}_{end_height}_{preload}
+_NUMBER = r'(-?\d+(?:\.\d+)?)'
+BOLT_NAME_PARSER = re.compile(r'^_B(\d{1,3})' + 6*('_' + _NUMBER) + r'$')
+BOLT_NAME_KEYS = ('radius', 'start_radius', 'end_radius', 'start_height', 'end_height', 'preload')
+
+
+def parse_bolt_name(name:str):
+    """return (id, dict of the bolt parameters) decoded from the name of a virtual bolt line, None if not a bolt name"""
+    m = BOLT_NAME_PARSER.match(name)
+    if m is None:
+        return None
+    values = m.groups()
+    return int(values[0]), dict(zip(BOLT_NAME_KEYS, map(float, values[1:])))
+
 
 class TreeBolt(Tree):
     bolt_pattern = re.compile(r'_B\d{1,3}(_-?\d+(\.\d+)?)+')
@@ -30,46 +47,58 @@ class TreeBolt(Tree):
                 return obj.get_sid()
             
         return None
+
+    def get_endpoints(self, sid:str):
+        """
+        return the start and end points of a line with a single KindOfShape query, None if not a segment
+        """
+        kos = Geompy.KindOfShape(salome.IDToObject(sid))
+        if str(kos[0]) not in ("SEGMENT", "LINE"):
+            return None
+        return Point(*kos[1:4]), Point(*kos[4:7])
     
-    def parse_for_bolt(self,root):
+    def parse_for_bolt(self,root, manifest:dict=None):
         """
         return a list of virtual bolt
+
+        the parameters are decoded from the name, the endpoints are read from the manifest
+        (see common.bolt.study.read_manifest) or from the line if it is not in the manifest
         """
         self.root=root
         bolts = []
         if self.objects is None:
             self.parse_tree_objects(self.root)
 
-        for obj in self.objects:
-            
-            if self.bolt_pattern.search(obj.name):
-                name = obj.name
-                sid = obj.get_sid()
-
-                isValid, gtype = self._check_type(sid)
-                
-                if isValid and gtype == GEOM.EDGE:
-                    prop = get_properties(salome.IDToObject(sid))
-                    data= name.split('_')
-                    data= data[1:]
-                    id = int(data[0][1:])
-                    bolt_properties = { 
-                                        'sid': sid,
-                                        'start': prop.p1,
-                                        'end': prop.p2,
-                                        'radius': float(data[1]),
-                                        'start_radius': float(data[2]),
-                                        'end_radius': float(data[3]),
-                                        'start_height': float(data[4]),
-                                        'end_height': float(data[5]),
-                                        'preload': float(data[6]),
-                                    }
-                    bolts.append(dict(id=id, prop=bolt_properties))
+        if manifest is None:
+            manifest = dict()
 
+        from_manifest = 0
+        for obj in self.objects:
+            # the type is known from the tree parsing, groups are not bolts
+            if obj.type != GEOM.EDGE or obj.is_group:
+                continue
 
-        return bolts
-                    
+            parsed = parse_bolt_name(obj.name)
+            if parsed is None:
+                if self.bolt_pattern.search(obj.name):
+                    logging.warning(f"cannot decode bolt name {obj.name}")
+                continue
 
+            id, bolt_properties = parsed
+            sid = obj.get_sid()
 
+            entry = manifest.get(sid)
+            if entry is not None and entry.get('name') == obj.name:
+                endpoints = Point(*entry['start']), Point(*entry['end'])
+                from_manifest += 1
+            else:
+                endpoints = self.get_endpoints(sid)
+                if endpoints is None:
+                    continue
 
+            bolt_properties['sid'] = sid
+            bolt_properties['start'], bolt_properties['end'] = endpoints
+            bolts.append(dict(id=id, prop=bolt_properties))
 
+        logging.info(f"{len(bolts)} virtual bolts found, {from_manifest} from the manifest")
+        return bolts
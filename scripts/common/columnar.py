@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# binary columnar files: typed arrays behind a small json header, readable with a memory map
+# License: LGPL v 3.0
+# Autor: Marc DUBOC
+# Version: 19/10/2026
+
+"""
+layout of a file:
+    MAGIC (8 bytes)
+    header length (uint64, little endian)
+    header (json, utf-8):
+        {"version": 1, "kind": "contacts", "count": n, "meta": {...},
+         "columns": [{"name": "id", "dtype": "<i4", "shape": [n], "offset": 0, "nbytes": 4*n}, ...]}
+    padding to ALIGNMENT
+    columns, each one starting at a multiple of ALIGNMENT, offsets relative to the end of the header padding
+
+the columns are C-contiguous arrays with an explicit byte order, strings are fixed width utf-8 bytes (|S<n>)
+"""
+
+import json
+import struct
+import numpy as np
+
+MAGIC = b"SUCOLS\x00\x01"
+VERSION = 1
+ALIGNMENT = 64
+
+
+def _align(n:int) -> int:
+    return -(-n//ALIGNMENT)*ALIGNMENT
+
+
+def string_column(values, shape:tuple=None) -> np.ndarray:
+    """fixed width utf-8 array of a list of str (or nested lists of str)"""
+    flat = np.asarray(values, dtype=object)
+    encoded = np.array([str(v).encode("utf-8") for v in flat.ravel()], dtype=bytes)
+    if encoded.size == 0:
+        encoded = encoded.astype("S1")
+    return encoded.reshape(shape if shape is not None else flat.shape)
+
+
+def write_columns(path:str, kind:str, columns:dict, meta:dict=None):
+    """
+    write arrays with the same first dimension as a columnar file
+
+    Args:
+        path: file path
+        kind: kind of the rows, checked by the reader (ex: "contacts", "bolts")
+        columns: {name: array}
+        meta: json serializable data stored in the header (ex: the type codes)
+    """
+    arrays = {name: np.ascontiguousarray(a) for name, a in columns.items()}
+    counts = {len(a) for a in arrays.values()}
+    if len(counts) > 1:
+        raise ValueError(f"columns of different lengths: {counts}")
+
+    descr = []
+    offset = 0
+    for name, a in arrays.items():
+        offset = _align(offset)
+        dtype = a.dtype.newbyteorder("<") if a.dtype.byteorder == ">" else a.dtype
+        descr.append(dict(name=name, dtype=dtype.str, shape=list(a.shape), offset=offset, nbytes=a.nbytes))
+        offset += a.nbytes
+
+    header = dict(version=VERSION, kind=kind, count=counts.pop() if counts else 0, meta=meta or dict(), columns=descr)
+    header_bytes = json.dumps(header).encode("utf-8")
+    start = _align(len(MAGIC) + 8 + len(header_bytes))
+
+    with open(path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header_bytes)))
+        f.write(header_bytes)
+        for d, a in zip(descr, arrays.values()):
+            f.write(b"\x00"*(start + d["offset"] - f.tell()))
+            a.astype(d["dtype"], copy=False).tofile(f)
+        # an empty last column can start after the last byte written
+        f.write(b"\x00"*(start + _align(offset) - f.tell()))
+
+
+def read_header(path:str) -> tuple:
+    """return (header, start of the columns) of a columnar file"""
+    with open(path, "rb") as f:
+        magic = f.read(len(MAGIC))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a columnar file")
+        size, = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(size).decode("utf-8"))
+
+    if header.get("version") != VERSION:
+        raise ValueError(f"{path}: unsupported version {header.get('version')}")
+    return header, _align(len(MAGIC) + 8 + size)
+
+
+def read_columns(path:str, kind:str=None, mmap:bool=True) -> tuple:
+    """
+    read a columnar file without parsing its data
+
+    Args:
+        path: file path
+        kind: expected kind, not checked if None
+        mmap: the columns are read-only views of a memory map of the file, otherwise they are loaded
+
+    Returns:
+        header: dict, see write_columns
+        columns: {name: np.ndarray}
+    """
+    header, start = read_header(path)
+    if kind is not None and header["kind"] != kind:
+        raise ValueError(f"{path} holds {header['kind']}, not {kind}")
+
+    columns = dict()
+    if mmap:
+        end = start + max((d["offset"] + d["nbytes"] for d in header["columns"]), default=0)
+        buffer = np.memmap(path, dtype=np.uint8, mode="r", shape=(end,))
+        for d in header["columns"]:
+            begin = start + d["offset"]
+            columns[d["name"]] = buffer[begin:begin + d["nbytes"]].view(np.dtype(d["dtype"])).reshape(d["shape"])
+    else:
+        with open(path, "rb") as f:
+            for d in header["columns"]:
+                f.seek(start + d["offset"])
+                dtype = np.dtype(d["dtype"])
+                columns[d["name"]] = np.fromfile(f, dtype=dtype, count=d["nbytes"]//dtype.itemsize).reshape(d["shape"])
+
+    return header, columns
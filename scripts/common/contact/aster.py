@@ -7,9 +7,17 @@
 import sys
 import json
 import re
+import math
 import itertools
+import tempfile
 from collections import defaultdict
 
+# logging of the package, standard logging when run from Code Aster
+try:
+    from common import logging
+except ImportError:
+    import logging
+
 # check if the script is run from Code Aster or from python
 ASTER=False
 try:
@@ -17,8 +25,11 @@ try:
 except:
     ASTER=True
 
+# size of the in memory buffer of each contact type when streaming records, larger buffers go to disk
+SPOOL_SIZE = 1 << 20
+
 """
-input json file as list of dict:
+input json file as list of dict (or json lines file, one dict per line):
 [
     {
         "id": 1,
@@ -50,7 +61,10 @@ input json file as list of dict:
 # ________________________________________________________________
 
 class ContactItem:
-    """Class to store contact information"""
+    """Class to store contact information
+    
+    the master/slave indices and the (master, slave) tuples are computed once
+    """
     def __init__(self,data) -> None:
         #print(data)
         self.type = data["type"]
@@ -60,120 +74,348 @@ class ContactItem:
         self.subshapes = data["subshapes"]
         self.subshapes_id = data["subshapes_id"]
         self.master_id = data["master_id"]
+        # boxes [xmin,ymin,zmin,xmax,ymax,zmax] of the subshapes, not in the exports of older versions
+        self.subshapes_bbox = data.get("subshapes_bbox")
         #self.gap = data["gap"]
 
+        self.master_index = self.master_id
+        self.slave_index = 1 if self.master_id == 0 else 0
+        m, s = self.master_index, self.slave_index
+
+        # (master, slave) of the contact, the master is the parent shape for BONDED and SLIDING
+        if self.type in ["BONDED","SLIDING"]:
+            self.master_slave_name = (self.shapes[m], self.subshapes[s])
+            self.master_slave_id = (self.shapes_id[m], self.subshapes_id[s])
+        elif self.type in ["FRICTION","FRICTIONLESS"]:
+            self.master_slave_name = (self.subshapes[m], self.subshapes[s])
+            self.master_slave_id = (self.subshapes_id[m], self.subshapes_id[s])
+        else:
+            self.master_slave_name = None
+            self.master_slave_id = None
+
+        self.parent_name = (self.shapes[m], self.shapes[s])
+        self.parent_id = (self.shapes_id[m], self.shapes_id[s])
+
     def getSlaveName(self):
         if self.type in ["BONDED","SLIDING"]:
-            return self.subshapes[1 if self.master_id == 0 else 0]
+            return self.subshapes[self.slave_index]
     
     def getMasterName(self):
-        if self.type in ["BONDED","SLIDING"]:
-            return self.shapes[self.master_id]
-        
-        elif self.type in ["FRICTION","FRICTIONLESS"]:
-            return self.subshapes[self.master_id]
+        if self.type in ["BONDED","SLIDING","FRICTION","FRICTIONLESS"]:
+            return self.master_slave_name[0]
 
 class Contacts:
-    """Class to store and access all contact"""
+    """Class to store and access all contact
+    
+    the contacts are stored by id and by type, the indexes by shape, subshape, shape id
+    and subshape id are built on their first query. Each query is then a dict lookup
+    """
     def __init__(self,data) -> None:
         self.ids = [item["id"] for item in data]
+        self.items = dict()
+        self.by_type = defaultdict(list)
+        self._indexes = dict()
+        self._shape_names = None
+        self._subshape_names = None
+
         for item in data:
-            setattr(self,item["id"],ContactItem(item))
+            c = ContactItem(item)
+            self.items[c.id] = c
+            self.by_type[c.type].append(c)
+
+    def _index(self, attr:str) -> dict:
+        """return the index {key: [contact,...]} of a list attribute of the contacts (shapes, subshapes...)"""
+        index = self._indexes.get(attr)
+        if index is None:
+            index = defaultdict(list)
+            for c in self.getAllContact():
+                # a contact is listed once per key, even if both shapes share it
+                for k in dict.fromkeys(getattr(c, attr)):
+                    index[k].append(c)
+            self._indexes[attr] = index
+        return index
   
     def getAllContact(self):
-        return [getattr(self,id) for id in self.ids]
+        return [self.items[id] for id in self.ids]
 
     def getContact(self,id):
-        return getattr(self,id)
+        return self.items[id]
     
     def getContactByType(self,type):
-        return [item for item in self.getAllContact() if item.type == type]
+        return list(self.by_type.get(type, []))
     
     def getContactByShape(self,shape):
-        return [item for item in self.getAllContact() if shape in item.shapes]
+        return list(self._index("shapes").get(shape, []))
     
     def getContactBySubShape(self,subshape):
-        return [item for item in self.getAllContact() if subshape in item.subshapes]
+        return list(self._index("subshapes").get(subshape, []))
     
     def getContactByShapeId(self,shape_id):
-        return [item for item in self.getAllContact() if shape_id in item.shapes_id]
+        return list(self._index("shapes_id").get(shape_id, []))
     
     def getContactBySubShapeId(self,subshape_id):
-        return [item for item in self.getAllContact() if subshape_id in item.subshapes_id]
+        return list(self._index("subshapes_id").get(subshape_id, []))
     
     def getMasterSlave(self,id):
-        contact = getattr(self,id)
-
-        if contact.type in ["BONDED","SLIDING"]:
-            master_index= contact.master_id
-            slave_index = 1 if master_index == 0 else 0
-            return {"id":id,"master":contact.shapes[master_index],"slave":contact.subshapes[slave_index]}
-        
-        elif contact.type in ["FRICTION","FRICTIONLESS"]:
-            master_index= contact.master_id
-            slave_index = 1 if master_index == 0 else 0
-            return {"id":id,"master":contact.subshapes[master_index],"slave":contact.subshapes[slave_index]}
+        return self.getMasterSlaveName(id)
         
     def getMasterSlaveID(self,id):
-        contact = getattr(self,id)
-        if contact.type in ["BONDED","SLIDING"]:
-            master_index= contact.master_id
-            slave_index = 1 if master_index == 0 else 0
-            return {"id":id,"master":contact.shapes_id[master_index],"slave":contact.subshapes_id[slave_index]}
-        
-        elif contact.type in ["FRICTION","FRICTIONLESS"]:
-            master_index= contact.master_id
-            slave_index = 1 if master_index == 0 else 0
-            return {"id":id,"master":contact.subshapes_id[master_index],"slave":contact.subshapes_id[slave_index]}
+        contact = self.items[id]
+        if contact.master_slave_id is not None:
+            return {"id":id,"master":contact.master_slave_id[0],"slave":contact.master_slave_id[1]}
 
     def getMasterSlaveName(self,id):
-        contact = getattr(self,id)
-        if contact.type in ["BONDED","SLIDING"]:
-            master_index= contact.master_id
-            slave_index = 1 if master_index == 0 else 0
-            return {"id":id,"master":contact.shapes[master_index],"slave":contact.subshapes[slave_index]}
-        
-        elif contact.type in ["FRICTION","FRICTIONLESS"]:
-            master_index= contact.master_id
-            slave_index = 1 if master_index == 0 else 0
-            return {"id":id,"master":contact.subshapes[master_index],"slave":contact.subshapes[slave_index]}
+        contact = self.items[id]
+        if contact.master_slave_name is not None:
+            return {"id":id,"master":contact.master_slave_name[0],"slave":contact.master_slave_name[1]}
 
     def getParentName(self,id):
-        contact = getattr(self,id)
-        master_index= contact.master_id
-        slave_index = 1 if master_index == 0 else 0
-        return {"id":id,"master":contact.shapes[master_index],"slave":contact.shapes[slave_index]}
+        contact = self.items[id]
+        return {"id":id,"master":contact.parent_name[0],"slave":contact.parent_name[1]}
     
     def getParentID(self,id):
-        contact = getattr(self,id)
-        master_index= contact.master_id
-        slave_index = 1 if master_index == 0 else 0
-        return {"id":id,"master":contact.shapes_id[master_index],"slave":contact.shapes_id[slave_index]}
+        contact = self.items[id]
+        return {"id":id,"master":contact.parent_id[0],"slave":contact.parent_id[1]}
+
+    @staticmethod
+    def _nameFromId(contacts:list, ids:str, names:str) -> dict:
+        """return a dict {id: name}, the first name found for each id"""
+        d = dict()
+        for item in contacts:
+            for i in (0,1):
+                d.setdefault(getattr(item,ids)[i], getattr(item,names)[i])
+        return d
         
     def shapeNameFromShapeID(self):
         """return a dict of shape name from shape id"""
-        d= defaultdict(list)
-        for item in self.getAllContact():
-                for i in (0,1):
-                    d[item.shapes_id[i]].append(item.shapes[i])
-        #remove duplicate
-        for k,v in d.items():
-            d[k] = list(set(v))[0]
-        return d
+        if self._shape_names is None:
+            self._shape_names = self._nameFromId(self.getAllContact(), "shapes_id", "shapes")
+        return self._shape_names
     
     def subshapeNameFromSubshapeID(self):
         """return a dict of subshape name from subshape id"""
-        d= defaultdict(list)
-        for item in self.getAllContact():
-                for i in (0,1):
-                    d[item.subshapes_id[i]].append(item.subshapes[i])
-        #remove duplicate
-        for k,v in d.items():
-            d[k] = list(set(v))[0]
-        return d
+        if self._subshape_names is None:
+            self._subshape_names = self._nameFromId(self.getAllContact(), "subshapes_id", "subshapes")
+        return self._subshape_names
+
+def iterJsonLines(f):
+    """yield the contacts of a json lines file object, one record at a time"""
+    for line in f:
+        if line.strip():
+            yield json.loads(line)
+
+def consolidateZones(zones:list) -> list:
+    """
+    merge the bonded LIAISON_MAIL zones into the minimal set of zones
+
+    the zones are the nodes of a graph, two zones are merged (edge) if:
+        - they tie the same slave face, by (slave subshape id, slave parent id): the masters are
+          united, so the nodes of the face are tied once, even if each contact has its own group.
+          Not merged if a slave face would be tied to its own part, both zones are kept.
+        - they have the same set of masters (shape ids): the slave nodes are projected on the same
+          master elements, the linear relations are the same as with separate zones
+
+    Args:
+        zones: list of (slave names, slave keys (subshape id, parent id), master names, master ids)
+
+    Returns:
+        merged zones in the same format, in the order of their first zone
+    """
+    n = len(zones)
+    root = list(range(n))
+    merged = [[dict.fromkeys(x) for x in z] for z in zones]
+
+    def find(i):
+        while root[i] != i:
+            root[i] = root[root[i]]
+            i = root[i]
+        return i
+
+    def union(i, j) -> bool:
+        i, j = sorted((find(i), find(j)))
+        if i == j:
+            return True
+        masters = merged[i][3].keys() | merged[j][3].keys()
+        if any(key[1] in masters for key in itertools.chain(merged[i][1], merged[j][1])):
+            return False
+        root[j] = i
+        for a, b in zip(merged[i], merged[j]):
+            a.update(b)
+        return True
+
+    # 1. zones tying the same slave face
+    first = dict()
+    conflicts = 0
+    for i, z in enumerate(zones):
+        for key in z[1]:
+            if key in first:
+                conflicts += not union(first[key], i)
+            else:
+                first[key] = i
+    if conflicts:
+        logging.warning(f"consolidateZones: {conflicts} slave faces tied to their own part are kept in several zones")
+
+    # 2. zones with the same masters
+    same_masters = dict()
+    for i in range(n):
+        if find(i) != i:
+            continue
+        key = frozenset(merged[i][3])
+        if key in same_masters:
+            union(same_masters[key], i)
+        else:
+            same_masters[key] = i
+
+    return [tuple(list(x) for x in merged[i]) for i in range(n) if find(i) == i]
+
+def _boxGap(a:list, b:list) -> float:
+    """distance between two boxes [xmin,ymin,zmin,xmax,ymax,zmax], 0 if they overlap"""
+    return math.sqrt(sum(max(0., a[i] - b[i+3], b[i] - a[i+3])**2 for i in range(3)))
+
+def _boxDiag(a:list) -> float:
+    return math.sqrt(sum((a[i+3] - a[i])**2 for i in range(3)))
+
+def _boxUnion(a:list, b:list):
+    """box of two boxes, None if one is unknown"""
+    if a is None or b is None:
+        return None
+    return [min(a[i], b[i]) for i in range(3)] + [max(a[i+3], b[i+3]) for i in range(3)]
+
+def cannotInteract(a:list, b:list) -> bool:
+    """
+    True if no slave node of the zone of box a can be paired with a master of the zone of box b, and
+    the opposite: a slave node is nearer than the diagonal of its zone box to a master of its zone,
+    and farther than the gap between the boxes to any element of the other zone.
+    False if a box is unknown (None).
+    """
+    if a is None or b is None:
+        return False
+    return _boxGap(a, b) > max(_boxDiag(a), _boxDiag(b))
+
+def _validZone(a:dict, b:dict) -> bool:
+    """no surface or part holds both a slave and a master surface of the zone a + b"""
+    slave_keys = itertools.chain(a["slave_keys"], b["slave_keys"])
+    master_keys = a["master_keys"].keys() | b["master_keys"].keys()
+    master_parts = {k[1] for k in master_keys}
+    return not any(k in master_keys or k[1] in master_parts for k in slave_keys)
+
+def mergeContactZones(zones:list) -> list:
+    """
+    merge the DEFI_CONTACT zones of one type (same parameters) into zones with several groups
+
+    the surfaces are identified by their (subshape id, parent id) key, not their group names which
+    are unique to each contact.
+
+        1. the zones of a slave surface are merged, so each slave surface is in exactly one zone
+        2. the zones with the same master surfaces are merged: no new slave/master pair
+        3. the zones that cannot interact (see cannotInteract) are merged first fit: a slave node can
+           only be paired with a master of its own zone. Skipped for the zones without a box.
+
+    no surface or part holds both a slave and a master surface of a merged zone. The result is
+    checked with checkContactZones.
+
+    Args:
+        zones: list of dict(slaves, slave_keys, masters, master_keys, box), see MakeComm.contactZone
+
+    Returns:
+        merged zones, same format, in the order of their first zone
+
+    Raises:
+        ValueError: a slave surface is in zones which cannot be merged
+    """
+    def merge(a:dict, b:dict):
+        for k in ("slaves", "slave_keys", "masters", "master_keys"):
+            a[k].update(b[k])
+        a["box"] = _boxUnion(a["box"], b["box"])
+
+    # ordered sets as dict keys, for a stable output
+    groups = [dict({k: dict.fromkeys(z[k]) for k in ("slaves", "slave_keys", "masters", "master_keys")}, box=z["box"]) for z in zones]
+
+    # 1. zones of a slave surface
+    by_slave = dict()
+    step_1 = []
+    for g in groups:
+        target = None
+        for key in g["slave_keys"]:
+            target = by_slave.get(key)
+            if target is not None:
+                break
+        if target is None:
+            step_1.append(g)
+            target = g
+        elif _validZone(target, g):
+            merge(target, g)
+        else:
+            raise ValueError(f"mergeContactZones: the slave surface {key} is in zones that cannot be merged")
+        for key in g["slave_keys"]:
+            by_slave[key] = target
+
+    # 2. same master surfaces
+    by_master = dict()
+    step_2 = []
+    for g in step_1:
+        key = frozenset(g["master_keys"])
+        target = by_master.get(key)
+        if target is not None and _validZone(target, g):
+            merge(target, g)
+        else:
+            by_master[key] = g
+            step_2.append(g)
+
+    # 3. zones that cannot interact, checked against each zone of the bin
+    bins = []
+    for g in step_2:
+        for b in bins:
+            if g["box"] is None or b["box"] is None or not _validZone(b, g):
+                continue
+            if all(cannotInteract(box, g["box"]) for box in b["boxes"]):
+                b["boxes"].append(g["box"])
+                merge(b, g)
+                break
+        else:
+            bins.append(dict(g, boxes=[g["box"]]))
+
+    merged = [{k: (list(b[k]) if k != "box" else b[k]) for k in ("slaves", "slave_keys", "masters", "master_keys", "box")} for b in bins]
+    checkContactZones(zones, merged)
+    return merged
+
+def checkContactZones(zones:list, merged:list):
+    """
+    check the merge of the DEFI_CONTACT zones (see mergeContactZones)
+
+        - each slave surface is in exactly one merged zone
+        - no surface or part holds both a slave and a master surface of a merged zone
+        - a slave surface is with a master surface it was not in contact with only if their zones
+          cannot interact
+
+    Raises:
+        ValueError: the first rule broken
+    """
+    pairs = set()
+    boxes = defaultdict(list)
+    for z in zones:
+        for s in z["slave_keys"]:
+            boxes[s].append(z["box"])
+            for m in z["master_keys"]:
+                pairs.add((s, m))
+        for m in z["master_keys"]:
+            boxes[m].append(z["box"])
+
+    seen = dict()
+    for i, z in enumerate(merged):
+        master_parts = {m[1] for m in z["master_keys"]}
+        for s in z["slave_keys"]:
+            if seen.setdefault(s, i) != i:
+                raise ValueError(f"checkContactZones: the slave surface {s} is in the zones {seen[s]} and {i}")
+            if s in z["master_keys"] or s[1] in master_parts:
+                raise ValueError(f"checkContactZones: the slave surface {s} and a master surface of zone {i} share a part")
+            for m in z["master_keys"]:
+                if (s, m) not in pairs and not all(cannotInteract(a, b) for a in boxes[s] for b in boxes[m]):
+                    raise ValueError(f"checkContactZones: the slave surface {s} can be paired with the master surface {m} in zone {i}")
 
 class MakeComm:
     types = ["BONDED","SLIDING","FRICTION","FRICTIONLESS"]
+    names = {"BONDED":"bonded","SLIDING":"sliding","FRICTION":"friction","FRICTIONLESS":"frictionless"}
 
     def __init__(self,data:list) -> None:
         self.Contacts = Contacts(data)
@@ -182,6 +424,8 @@ class MakeComm:
         self.friction_start =[]
         self.frictionless_start =[]
         self.end_F = "),\n"
+        # {type: dict(before, after)} zones count of the consolidated or merged types of the last export
+        self.zones = dict()
         
     @staticmethod
     def _listNameToStrTuple(names:list) -> str:
@@ -195,6 +439,13 @@ class MakeComm:
         str_names += chr(41)
         return str_names
 
+    @staticmethod
+    def _groupsToStr(names) -> str:
+        """('name') for one group, ('n1','n2',) for a list of groups"""
+        if type(names) is list:
+            return MakeComm._listNameToStrTuple(names)
+        return "('{}')".format(names)
+
     def strFBonded(self,master,slave):
         # master as [m1,m2,...] to m as ('m1','m1',...)
         m = MakeComm._listNameToStrTuple(master)
@@ -208,36 +459,91 @@ class MakeComm:
         return "_F(GROUP_MA_ESCL=('{}'),\n\t\t GROUP_MA_MAIT=('{}'),\n\t\t DDL_MAIT = 'DNOR',\n\t\t DDL_ESCL = 'DNOR'),".format(s,m)          
 
     def strFFrictionless(self,master,slave):
-        # master as [m1,m2,...] to m as ('m1','m1',...)
-        m = MakeComm._listNameToStrTuple(master)
-        s = MakeComm._listNameToStrTuple(slave)
-        return f"_F(ALGO_CONT='STANDARD',\n\t\t APPARIEMENT='MAIT_ESCL',\n\t\t NORMALE='MAIT',\n\t\t CONTACT_INIT='OUI',\n\t\t GROUP_MA_ESCL=('{slave}'),\n\t\t GROUP_MA_MAIT=('{master}')),"
+        # master as m or [m1,m2,...] to ('m') or ('m1','m2',...)
+        m = MakeComm._groupsToStr(master)
+        s = MakeComm._groupsToStr(slave)
+        return f"_F(ALGO_CONT='STANDARD',\n\t\t APPARIEMENT='MAIT_ESCL',\n\t\t NORMALE='MAIT',\n\t\t CONTACT_INIT='OUI',\n\t\t GROUP_MA_ESCL={s},\n\t\t GROUP_MA_MAIT={m}),"
     
     def strFFriction(self,master,slave):
-        # master as [m1,m2,...] to m as ('m1','m1',...)
-        m = MakeComm._listNameToStrTuple(master)
-        s = MakeComm._listNameToStrTuple(slave)
-        return f"_F(ALGO_CONT='STANDARD',\n\t\t APPARIEMENT='MAIT_ESCL',\n\t\t NORMALE='MAIT',\n\t\t CONTACT_INIT='OUI',\n\t\t GROUP_MA_ESCL=('{slave}'),\n\t\t GROUP_MA_MAIT=('{master}')),"  
+        # master as m or [m1,m2,...] to ('m') or ('m1','m2',...)
+        m = MakeComm._groupsToStr(master)
+        s = MakeComm._groupsToStr(slave)
+        return f"_F(ALGO_CONT='STANDARD',\n\t\t APPARIEMENT='MAIT_ESCL',\n\t\t NORMALE='MAIT',\n\t\t CONTACT_INIT='OUI',\n\t\t GROUP_MA_ESCL={s},\n\t\t GROUP_MA_MAIT={m}),"  
     
     def regroupMasterbySlave(self, contacts:list):
-        masterSalveId = defaultdict(list)
+        # masters of each key in insertion order, a dict is used as an ordered set
+        masterSalveId = defaultdict(dict)
         contactID = defaultdict(list)
         for item in contacts:
                 # add salve parent indice of the salve to the key => indice of subshape are the same for each instance of the same part
                 key = (item["slave"],item["parent_id"])
                 contactID[key]=item["id"]
-                if item["master"] not in masterSalveId[key]:
-                    masterSalveId[key].append(item["master"])
+                masterSalveId[key][item["master"]] = None
 
         # remove salve parent_id from the key
         regrouped = dict()
         for k,v in masterSalveId.items():
             key = contactID[k]
-            regrouped[key] = v
+            regrouped[key] = list(v)
         return regrouped
     
-    def makeBonded(self,reGroup=True):
-        str_bonded = 'bonded = (\n'
+    def strItem(self,item:ContactItem) -> str:
+        """definition block of one contact, not regrouped"""
+        master, slave = item.master_slave_name
+        if item.type == "BONDED":
+            return '\t  ' + self.strFBonded(master,slave)+"\n"
+        elif item.type == "SLIDING":
+            return '\t  ' + self.strFSliding(master,slave)
+        elif item.type == "FRICTION":
+            return '\t  ' + self.strFFriction(master,slave)
+        elif item.type == "FRICTIONLESS":
+            return '\t  ' + self.strFFrictionless(master,slave)
+        return ''
+
+    def reportZones(self,type:str,before:int,after:int):
+        """keep and log the zones count of a type before and after consolidation or merge"""
+        self.zones[type] = dict(before=before, after=after)
+        reduction = 100.*(before - after)/before if before else 0.
+        logging.info(f"{self.names[type]} zones: {before} -> {after} (-{reduction:.0f}%)")
+
+    def iterBondedZones(self,zones:list,consolidate=False):
+        """yield the LIAISON_MAIL blocks of the zones [(slave names, slave keys, master names, master ids)]"""
+        if consolidate:
+            before = len(zones)
+            zones = consolidateZones(zones)
+            self.reportZones("BONDED",before,len(zones))
+
+        for slave_name, _, master_name, _ in zones:
+            yield '\t  ' + self.strFBonded(master_name,slave_name)+"\n"
+
+    @staticmethod
+    def contactZone(item:ContactItem) -> dict:
+        """DEFI_CONTACT zone of a FRICTION or FRICTIONLESS contact, see mergeContactZones"""
+        box = None
+        if item.subshapes_bbox is not None:
+            box = _boxUnion(item.subshapes_bbox[item.master_index], item.subshapes_bbox[item.slave_index])
+        return dict(slaves=[item.master_slave_name[1]],
+                    slave_keys=[(item.master_slave_id[1], item.parent_id[1])],
+                    masters=[item.master_slave_name[0]],
+                    master_keys=[(item.master_slave_id[0], item.parent_id[0])],
+                    box=box)
+
+    def iterContactZones(self,type:str,zones:list):
+        """yield the merged DEFI_CONTACT blocks of the FRICTION or FRICTIONLESS zones"""
+        before = len(zones)
+        zones = mergeContactZones(zones)
+        self.reportZones(type,before,len(zones))
+
+        strF = self.strFFriction if type == "FRICTION" else self.strFFrictionless
+        for z in zones:
+            yield '\t  ' + strF(z["masters"],z["slaves"])
+
+    def iterBonded(self,reGroup=True,consolidate=False):
+        """yield the bonded definition block by block
+
+        consolidate: merge the compatible zones, see consolidateZones
+        """
+        yield 'bonded = (\n'
         bonded = self.Contacts.getContactByType("BONDED")
         bonded_id = [item.id for item in bonded]
         msIdList = [self.Contacts.getMasterSlaveID(i) for i in bonded_id]
@@ -249,57 +555,163 @@ class MakeComm:
         
         shapeName = self.Contacts.shapeNameFromShapeID()
 
+        zones = []
         if reGroup:
             regrouped = self.regroupMasterbySlave(data_for_regroup)
             for k, v in regrouped.items():
                 slave_name = self.Contacts.getMasterSlaveName(k)['slave']
                 master_name = [shapeName[m] for m in v]
-                str_bonded += '\t  ' + self.strFBonded(master_name,slave_name)+"\n"
+                slave_key = (self.Contacts.getMasterSlaveID(k)['slave'], self.Contacts.getParentID(k)['slave'])
+                zones.append(([slave_name], [slave_key], master_name, v))
         else:
             for item in bonded:
-                c = self.Contacts.getMasterSlave(item.id)
-                slave_name = c['slave']
-                master_name = c['master']
-                str_bonded += '\t  ' + self.strFBonded(master_name,slave_name)+"\n"
+                slave_key = (item.master_slave_id[1], item.parent_id[1])
+                zones.append(([item.master_slave_name[1]], [slave_key], [item.master_slave_name[0]], [item.master_slave_id[0]]))
 
-        return str_bonded + '\t  ' + ')\n'
-    
-    def makeSliding(self):
-        str_slide = 'sliding = (\n'
+        yield from self.iterBondedZones(zones,consolidate)
+
+        yield '\t  ' + ')\n'
+
+    def iterSliding(self):
+        """yield the sliding definition block by block"""
+        yield 'sliding = (\n'
         sliding = self.Contacts.getContactByType("SLIDING")
 
         for item in sliding:
-            c = self.Contacts.getMasterSlave(item.id)
-            str_slide += '\t  ' +(self.strFSliding(c['master'],c['slave']))
+            yield self.strItem(item)
+
+        yield '\t  ' + ')\n'
 
-        return str_slide + '\t  ' + ')\n'
+    def iterFriction(self,merge=False):
+        """yield the friction definition block by block
 
-    def makeFriction(self):
-        str_friction = 'friction = (\n'
+        merge: merge the zones, see mergeContactZones
+        """
+        yield 'friction = (\n'
         friction = self.Contacts.getContactByType("FRICTION")
 
-        for item in friction:
-            c = self.Contacts.getMasterSlave(item.id)
-            str_friction += '\t  ' +(self.strFFriction(c['master'],c['slave']))
+        if merge:
+            yield from self.iterContactZones("FRICTION",[self.contactZone(item) for item in friction])
+        else:
+            for item in friction:
+                yield self.strItem(item)
 
-        return str_friction + '\t  ' + ')\n'
-    
-    def makeFrictionless(self):
-        str_frictionless = 'frictionless = (\n'
+        yield '\t  ' + ')\n'
+
+    def iterFrictionless(self,merge=False):
+        """yield the frictionless definition block by block
+
+        merge: merge the zones, see mergeContactZones
+        """
+        yield 'frictionless = (\n'
         frictionless = self.Contacts.getContactByType("FRICTIONLESS")
 
-        for item in frictionless:
-            c = self.Contacts.getMasterSlave(item.id)
-            str_frictionless += '\t  ' +(self.strFFrictionless(c['master'],c['slave']))
+        if merge:
+            yield from self.iterContactZones("FRICTIONLESS",[self.contactZone(item) for item in frictionless])
+        else:
+            for item in frictionless:
+                yield self.strItem(item)
+
+        yield '\t  ' + ')\n'
+
+    def iterProcess(self,bonded_regroup_master=True,bonded_consolidate=False,contact_merge=False):
+        """yield the whole comm definition block by block, in the order of process"""
+        yield from self.iterBonded(bonded_regroup_master,bonded_consolidate)
+        yield from self.iterSliding()
+        yield from self.iterFriction(contact_merge)
+        yield from self.iterFrictionless(contact_merge)
 
-        return str_frictionless + '\t  ' + ')\n'
+    def makeBonded(self,reGroup=True,consolidate=False):
+        return ''.join(self.iterBonded(reGroup,consolidate))
     
-    def process(self,bonded_regroup_master=True):
-        bonded = self.makeBonded(bonded_regroup_master)
-        sliding = self.makeSliding()
-        friction = self.makeFriction()
-        frictionless = self.makeFrictionless()
-        return bonded + sliding + friction + frictionless
+    def makeSliding(self):
+        return ''.join(self.iterSliding())
+
+    def makeFriction(self,merge=False):
+        return ''.join(self.iterFriction(merge))
+    
+    def makeFrictionless(self,merge=False):
+        return ''.join(self.iterFrictionless(merge))
+    
+    def process(self,bonded_regroup_master=True,bonded_consolidate=False,contact_merge=False):
+        return ''.join(self.iterProcess(bonded_regroup_master,bonded_consolidate,contact_merge))
+
+    def write(self,f,bonded_regroup_master=True,bonded_consolidate=False,contact_merge=False):
+        """write the comm definition in the file object f, block by block without building the whole document
+
+        return the zones count {type: dict(before, after)} of the consolidated or merged types
+        """
+        for block in self.iterProcess(bonded_regroup_master,bonded_consolidate,contact_merge):
+            f.write(block)
+        return self.zones
+
+    @classmethod
+    def iterRecords(cls,records,bonded_regroup_master=True,bonded_consolidate=False,contact_merge=False):
+        """
+        yield the comm definition of an iterable of contacts (ex: iterJsonLines) block by block,
+        with the same output as process but without keeping the records.
+
+        The blocks of each type are buffered in a spooled temporary file until all the records are
+        read, the regrouped bonded contacts and the merged contact zones keep only their names.
+        """
+        yield from cls([]).iterFromRecords(records,bonded_regroup_master,bonded_consolidate,contact_merge)
+
+    def iterFromRecords(self,records,bonded_regroup_master=True,bonded_consolidate=False,contact_merge=False):
+        """see iterRecords, self.Contacts is not used"""
+        spools = {t: tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE, mode="w+") for t in self.types}
+        shapeName = dict()
+        # (slave subshape id, slave parent id) -> [slave name of the last contact, slave key, {master id: None}]
+        # or contact index -> [slave name, slave key, {master id: None}] if not regrouped
+        bonded = dict()
+        # type -> zones of the FRICTION and FRICTIONLESS contacts to merge
+        contact_zones = {"FRICTION": [], "FRICTIONLESS": []}
+        try:
+            for data in records:
+                if data is None:
+                    continue
+                item = ContactItem(data)
+                for i in (0,1):
+                    shapeName.setdefault(item.shapes_id[i], item.shapes[i])
+
+                if item.type == "BONDED" and bonded_regroup_master:
+                    key = (item.master_slave_id[1], item.parent_id[1])
+                    group = bonded.setdefault(key, [None, key, dict()])
+                    group[0] = item.master_slave_name[1]
+                    group[2][item.master_slave_id[0]] = None
+                elif item.type == "BONDED" and bonded_consolidate:
+                    key = (item.master_slave_id[1], item.parent_id[1])
+                    bonded[len(bonded)] = [item.master_slave_name[1], key, {item.master_slave_id[0]: None}]
+                elif item.type in contact_zones and contact_merge:
+                    contact_zones[item.type].append(self.contactZone(item))
+                elif item.type in spools:
+                    spools[item.type].write(self.strItem(item))
+
+            for t in self.types:
+                yield f'{self.names[t]} = (\n'
+                if t == "BONDED" and (bonded_regroup_master or bonded_consolidate):
+                    zones = [([slave_name], [key], [shapeName[m] for m in masters], list(masters))
+                             for slave_name, key, masters in bonded.values()]
+                    yield from self.iterBondedZones(zones,bonded_consolidate)
+                elif t in contact_zones and contact_merge:
+                    yield from self.iterContactZones(t,contact_zones[t])
+                else:
+                    spools[t].seek(0)
+                    yield from iter(lambda: spools[t].read(SPOOL_SIZE), '')
+                yield '\t  ' + ')\n'
+        finally:
+            for spool in spools.values():
+                spool.close()
+
+    @classmethod
+    def writeRecords(cls,f,records,bonded_regroup_master=True,bonded_consolidate=False,contact_merge=False):
+        """write the comm definition of an iterable of contacts in the file object f
+
+        return the zones count {type: dict(before, after)} of the consolidated or merged types
+        """
+        mk = cls([])
+        for block in mk.iterFromRecords(records,bonded_regroup_master,bonded_consolidate,contact_merge):
+            f.write(block)
+        return mk.zones
 
 if __name__ == '__main__' :
     # load the json file with respect of the platform (windows or linux). Input path as argument
@@ -307,7 +719,10 @@ if __name__ == '__main__' :
         if sys.platform == "win32":
             path = path.replace("/", "\\")
         with open(path, 'r') as f:
-            data = json.load(f)
+            if path.endswith(".jsonl"):
+                data = list(iterJsonLines(f))
+            else:
+                data = json.load(f)
         return data
 
     # ________________________________________________________________
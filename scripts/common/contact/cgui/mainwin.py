@@ -24,7 +24,7 @@ class ContactGUI(QWidget):
     # define custom signals
     load_compound = pyqtSignal()
     closing = pyqtSignal()
-    export_contact = pyqtSignal(str,str,bool)
+    export_contact = pyqtSignal(str,str,bool,bool,bool,bool)
 
     def __init__(self):
         super(ContactGUI, self).__init__()
@@ -114,6 +114,20 @@ class ContactGUI(QWidget):
         self.cb_export_json = QCheckBox("Raw format (*.json)", self)
         self.cb_export_json.setChecked(False)
 
+        # create checkbox for the binary columnar export, with the raw format
+        self.cb_export_binary = QCheckBox("Binary columnar format (*.col)", self)
+        self.cb_export_binary.setChecked(False)
+        self.cb_export_binary.setEnabled(False)
+
+        # create checkbox for the json lines export, one contact per line
+        self.cb_export_jsonl = QCheckBox("Json lines format (*.jsonl)", self)
+        self.cb_export_jsonl.setChecked(False)
+        self.cb_export_jsonl.setEnabled(False)
+
+        # create checkbox for incremental export
+        self.cb_export_incremental = QCheckBox("Incremental (diff with the previous export)", self)
+        self.cb_export_incremental.setChecked(False)
+
         #create groupbox for export ASTER comm
         self.gp_export_comm = QGroupBox("Aster format (*.comm)", self)
         self.gp_export_comm.setCheckable(True)
@@ -123,15 +137,26 @@ class ContactGUI(QWidget):
         self.cb_export_aster_regroup= QCheckBox("Regroup masters on same slave (LIAISON_MAIL)", self)
         self.cb_export_aster_regroup.setChecked(True)
 
+        self.cb_export_aster_consolidate= QCheckBox("Consolidate bonded zones (LIAISON_MAIL)", self)
+        self.cb_export_aster_consolidate.setChecked(False)
+
+        self.cb_export_aster_merge= QCheckBox("Merge friction zones (DEFI_CONTACT)", self)
+        self.cb_export_aster_merge.setChecked(False)
+
         #create hbox for aster options
         self.hbox_1 = QHBoxLayout()
         self.hbox_1.addWidget(self.cb_export_aster_regroup)
+        self.hbox_1.addWidget(self.cb_export_aster_consolidate)
+        self.hbox_1.addWidget(self.cb_export_aster_merge)
         self.gp_export_comm.setLayout(self.hbox_1)
 
         #add checkbox in a horizontal layout
         self.hbox_0 = QVBoxLayout()
         self.hbox_0.addWidget(self.cb_export_json)
+        self.hbox_0.addWidget(self.cb_export_binary)
+        self.hbox_0.addWidget(self.cb_export_jsonl)
         self.hbox_0.addWidget(self.gp_export_comm)
+        self.hbox_0.addWidget(self.cb_export_incremental)
 
         # put the bouton in a horizontal layout
         self.hbox = QHBoxLayout()
@@ -165,6 +190,8 @@ class ContactGUI(QWidget):
         self.sl_transparency.valueChanged.connect(self.set_compound_part_transparency)
         self.bt_export.clicked.connect(self.select_file)
         self.cb_export_json.stateChanged.connect(self.on_change_export_json)
+        self.cb_export_binary.stateChanged.connect(self.on_change_export_binary)
+        self.cb_export_jsonl.stateChanged.connect(self.on_change_export_jsonl)
         self.gp_export_comm.toggled.connect(self.on_change_export_comm)
         #self.gp_export_comm.stateChanged.connect(self.on_change_export_comm)
         
@@ -199,11 +226,17 @@ class ContactGUI(QWidget):
     def select_file(self):
         options = QFileDialog.Options()
         options |= QFileDialog.DontUseNativeDialog
-        name, _ = QFileDialog.getSaveFileName(self, "Export file","","Json (*.json);Comm (*.comm)", options=options)
+        name, _ = QFileDialog.getSaveFileName(self, "Export file","","Json (*.json);Json lines (*.jsonl);Comm (*.comm);Columnar (*.col)", options=options)
         if name:
             if self.gp_export_comm.isChecked():
                 export = 'ASTER'
                 format = '.comm'
+            elif self.cb_export_binary.isChecked():
+                export = 'BINARY'
+                format = '.col'
+            elif self.cb_export_jsonl.isChecked():
+                export = 'JSONL'
+                format = '.jsonl'
             else:
                 export = 'RAW'
                 format = '.json'
@@ -215,21 +248,28 @@ class ContactGUI(QWidget):
             
             self.le_export.setText(name)
             self.file_name = name
-            
-            if self.gp_export_comm.isChecked():
-                export = 'ASTER'
-            else:
-                export = 'RAW'
-                
-            self.export_contact.emit(name,export,self.cb_export_aster_regroup.isChecked())
+
+            self.export_contact.emit(name,export,self.cb_export_aster_regroup.isChecked(),self.cb_export_incremental.isChecked(),self.cb_export_aster_consolidate.isChecked(),self.cb_export_aster_merge.isChecked())
 
     @pyqtSlot(int)
     def on_change_export_json(self):
+        self.cb_export_binary.setEnabled(self.cb_export_json.isChecked())
+        self.cb_export_jsonl.setEnabled(self.cb_export_json.isChecked())
         if self.cb_export_json.isChecked():
             self.gp_export_comm.setChecked(False)
         else:
             self.gp_export_comm.setChecked(True)
 
+    @pyqtSlot(int)
+    def on_change_export_binary(self):
+        if self.cb_export_binary.isChecked():
+            self.cb_export_jsonl.setChecked(False)
+
+    @pyqtSlot(int)
+    def on_change_export_jsonl(self):
+        if self.cb_export_jsonl.isChecked():
+            self.cb_export_binary.setChecked(False)
+
     @pyqtSlot(bool)
     def on_change_export_comm(self):
         if self.gp_export_comm.isChecked():
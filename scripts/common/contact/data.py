@@ -13,6 +13,7 @@ import GEOM
 from salome.geom import geomBuilder, geomtools
 from salome.kernel.studyedit import getStudyEditor
 from common import logging
+from common.contact.export import write_jsonl
 
 Geompy = geomBuilder.New()
 StudyEditor = getStudyEditor()
@@ -147,7 +148,11 @@ class ContactPair():
             "completed": self.completed
         }
     
-    def to_dict_for_export(self):
+    def to_dict_for_export(self, with_bbox:bool=False):
+        """
+        with_bbox: add the boxes of the surfaces (subshapes_bbox), used to merge the contact zones
+        of the ASTER export (see common.contact.aster.mergeContactZones)
+        """
         if self.completed:
             cont = dict()
             cont['id'] = str(self.id_instance)
@@ -161,6 +166,11 @@ class ContactPair():
 
             cont['shapes_id'] = shapes_indices
             cont['subshapes_id'] = subshapes_indices
+
+            if with_bbox:
+                # boxes [xmin,ymin,zmin,xmax,ymax,zmax] of the surfaces, to merge the contact zones that cannot interact
+                boxes = [Geompy.BoundingBox(salome.IDToObject(x)) for x in self.get_groups_sid()]
+                cont['subshapes_bbox'] = [[b[0], b[2], b[4], b[1], b[3], b[5]] for b in boxes]
             
             return cont
 
@@ -490,11 +500,25 @@ class ContactManagement():
                 break
 
     # export contact pairs to list
-    def export(self,file:str):
-        pairs_list = [pairs.to_dict_for_export() for pairs in self._contacts]
+    def export(self,file:str, pairs_list:list=None):
+        if pairs_list is None:
+            pairs_list = [pairs.to_dict_for_export() for pairs in self._contacts]
 
         with open(file, 'w') as file:
             json.dump(pairs_list, file, indent=4)
+
+    def iter_export(self, with_bbox:bool=False):
+        """yield the completed pairs as ContactPair.to_dict_for_export, one at a time"""
+        for pairs in self._contacts:
+            data = pairs.to_dict_for_export(with_bbox)
+            if data is not None:
+                yield data
+
+    def export_jsonl(self, file:str, pairs_list=None) -> int:
+        """write the pairs as json lines, each pair is written as soon as it is serialized"""
+        if pairs_list is None:
+            pairs_list = self.iter_export()
+        return write_jsonl(file, pairs_list)
         
     # swap master and slave
     def swap_master_slave_by_id(self,id:int):
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+# difference between two contact exports, independent of salome
+# License: LGPL v 3.0
+# Autor: Marc DUBOC
+# Version: 19/10/2026
+
+import os
+import json
+
+# version of the delta and state files
+DELTA_VERSION = 2
+
+# the contacts of an ASTER export are kept next to the .comm file to diff the next export
+STATE_SUFFIX = ".state.json"
+DELTA_SUFFIX = ".delta.json"
+
+
+def _normalize(record:dict) -> dict:
+    """record as read back from a json file (tuples as lists, keys as str)"""
+    return json.loads(json.dumps(record))
+
+
+def contact_key(record:dict) -> tuple:
+    """
+    stable key of an exported contact: the two (shape index, subshape index) of its surfaces, sorted
+
+    the key does not depend on the contact id, its type or the master side, which can all be edited
+    """
+    return tuple(sorted((record["shapes_id"][i], record["subshapes_id"][i]) for i in (0,1)))
+
+
+def canonical(record:dict) -> dict:
+    """
+    content of an exported contact independent of the order of its two surfaces
+
+    the id is left out: it is regenerated by the contact management and does not change the export,
+    as well as the boxes of the surfaces, only exported to merge the ASTER contact zones
+    """
+    sides = []
+    for i in (0,1):
+        sides.append((record["shapes_id"][i], record["subshapes_id"][i], record["shapes"][i], record["subshapes"][i]))
+    master = sides[record["master_id"]][:2]
+    return dict(type=record["type"], master=list(master), sides=sorted((list(s) for s in sides), key=lambda s: s[:4]))
+
+
+def index_contacts(records:list) -> dict:
+    """
+    return the completed contacts {(key, occurrence): record}, in the order of records
+
+    the contacts sharing a key are all kept, by their occurrence 0, 1... of the key
+    """
+    res = dict()
+    count = dict()
+    for r in records:
+        if r is None:
+            continue
+        r = _normalize(r)
+        key = contact_key(r)
+        n = count.get(key, 0)
+        count[key] = n + 1
+        res[(key, n)] = r
+    return res
+
+
+def diff_contacts(previous:list, current:list) -> dict:
+    """
+    compare two lists of exported contacts (ContactPair.to_dict_for_export) by their contact_key
+
+    Returns:
+        dict(added=[record], removed=[record], modified=[dict(key, previous, current)], unchanged=int)
+    """
+    old = index_contacts(previous)
+    new = index_contacts(current)
+
+    added = [r for k, r in new.items() if k not in old]
+    removed = [r for k, r in old.items() if k not in new]
+    modified = []
+    unchanged = 0
+    for k, r in new.items():
+        if k not in old:
+            continue
+        if canonical(old[k]) != canonical(r):
+            modified.append(dict(key=list(map(list, k[0])), occurrence=k[1], previous=old[k], current=r))
+        else:
+            unchanged += 1
+
+    return dict(added=added, removed=removed, modified=modified, unchanged=unchanged)
+
+
+def has_changes(delta:dict) -> bool:
+    return bool(delta["added"] or delta["removed"] or delta["modified"])
+
+
+def report(delta:dict) -> str:
+    """one line summary of a delta"""
+    return (f"{len(delta['added'])} added, {len(delta['removed'])} removed, "
+            f"{len(delta['modified'])} modified, {delta['unchanged']} unchanged contacts")
+
+
+def merge_in_place(previous:list, current:list) -> list:
+    """
+    current contacts in the order of the previous export: the unchanged and modified contacts keep
+    their position, the removed ones are dropped and the added ones are appended
+    """
+    new = index_contacts(current)
+    res = []
+    seen = set()
+    for k in index_contacts(previous):
+        if k in new:
+            res.append(new[k])
+            seen.add(k)
+    res.extend(r for k, r in new.items() if k not in seen)
+    return res
+
+
+def state_path(filename:str, export:str) -> str:
+    """file holding the contacts of the previous export: the json itself for RAW"""
+    return filename if export == "RAW" else filename + STATE_SUFFIX
+
+
+def delta_path(filename:str) -> str:
+    return os.path.splitext(filename)[0] + DELTA_SUFFIX
+
+
+def load_state(filename:str, export:str, options:dict=None):
+    """
+    return the contacts of the previous export of filename, None if there is none or if it is stale:
+    the exported file is missing, or it was written to another path, in another format or with
+    other options
+    """
+    path = state_path(filename, export)
+    if not os.path.isfile(path) or not os.path.isfile(filename):
+        return None
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except ValueError:
+        return None
+
+    if export == "RAW":
+        return data if isinstance(data, list) else None
+
+    if not isinstance(data, dict) or data.get("version") != DELTA_VERSION:
+        return None
+    if (data.get("export") != export or data.get("path") != os.path.abspath(filename)
+            or data.get("options") != _normalize(options or dict())):
+        return None
+    return data.get("contacts")
+
+
+def save_state(filename:str, export:str, records:list, options:dict=None):
+    """
+    keep the exported contacts, the output path and the export options for the next diff,
+    the RAW export is its own state
+    """
+    if export == "RAW":
+        return
+    state = dict(version=DELTA_VERSION, export=export, path=os.path.abspath(filename),
+                 options=options or dict(), contacts=records)
+    with open(state_path(filename, export), "w") as f:
+        json.dump(state, f)
+
+
+def write_delta(path:str, delta:dict):
+    with open(path, "w") as f:
+        json.dump(dict(version=DELTA_VERSION, **delta), f, indent=4)
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# export of the contacts to files, independent of salome
+# License: LGPL v 3.0
+# Autor: Marc DUBOC
+# Version: 19/10/2026
+
+import json
+import numpy as np
+from common.columnar import write_columns, read_columns, string_column
+
+# extension of the json lines export, one contact per line
+JSONL_SUFFIX = ".jsonl"
+
+# type codes of the binary export
+CONTACT_TYPES = ("BONDED", "SLIDING", "FRICTIONLESS", "FRICTION")
+CONTACTS_KIND = "contacts"
+
+
+def write_jsonl(path:str, records) -> int:
+    """
+    write the completed contacts as json lines, each record is written as soon as it is produced
+
+    Args:
+        path: file path
+        records: iterable of ContactPair.to_dict_for_export, can be a generator
+
+    Returns:
+        number of contacts written
+    """
+    count = 0
+    with open(path, "w") as f:
+        for r in records:
+            if r is None:
+                continue
+            f.write(json.dumps(r))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def read_jsonl(path:str):
+    """yield the contacts of a json lines file one record at a time"""
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def contacts_to_columns(records:list) -> dict:
+    """
+    columns of the completed contacts (ContactPair.to_dict_for_export)
+
+    id: int32 (n,), type: uint8 (n,) index in CONTACT_TYPES, master: uint8 (n,),
+    shape_index, subshape_index: int32 (n,2), shape_name, subshape_name: utf-8 bytes (n,2)
+    """
+    records = [r for r in records if r is not None]
+    n = len(records)
+    return dict(id=np.array([int(r["id"]) for r in records], dtype=np.int32),
+                type=np.array([CONTACT_TYPES.index(r["type"]) for r in records], dtype=np.uint8),
+                master=np.array([r["master_id"] for r in records], dtype=np.uint8),
+                shape_index=np.array([r["shapes_id"] for r in records], dtype=np.int32).reshape(n, 2),
+                subshape_index=np.array([r["subshapes_id"] for r in records], dtype=np.int32).reshape(n, 2),
+                shape_name=string_column([list(r["shapes"]) for r in records], (n, 2)),
+                subshape_name=string_column([list(r["subshapes"]) for r in records], (n, 2)))
+
+
+def write_binary(path:str, records:list) -> int:
+    """write the contacts as a columnar file (see common.columnar), return the number of contacts"""
+    columns = contacts_to_columns(records)
+    write_columns(path, CONTACTS_KIND, columns, meta=dict(types=list(CONTACT_TYPES)))
+    return len(columns["id"])
+
+
+def read_binary(path:str, mmap:bool=True) -> tuple:
+    """return (header, columns) of a binary contacts file, the columns are memory mapped by default"""
+    return read_columns(path, kind=CONTACTS_KIND, mmap=mmap)
+
+
+def iter_records(header:dict, columns:dict):
+    """yield the contacts of a binary file as the dict of ContactPair.to_dict_for_export"""
+    types = header["meta"]["types"]
+    decode = lambda row: [v.decode("utf-8") for v in row]
+    for i in range(header["count"]):
+        yield dict(id=str(int(columns["id"][i])),
+                   type=types[columns["type"][i]],
+                   master_id=int(columns["master"][i]),
+                   shapes=decode(columns["shape_name"][i]),
+                   subshapes=decode(columns["subshape_name"][i]),
+                   shapes_id=columns["shape_index"][i].tolist(),
+                   subshapes_id=columns["subshape_index"][i].tolist())
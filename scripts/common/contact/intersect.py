@@ -7,6 +7,8 @@ import GEOM
 import salome
 from salome.geom import geomBuilder
 from common.properties import get_properties,Cylinder
+from common.facetable import FaceTable
+from common.pool import bounded_map
 from common import logging
 
 try:
@@ -109,24 +111,56 @@ class ParseShapesIntersection():
     Class to parse the intersection between two shapes
     """
 
+    # thread pool used for the faces classification
+    max_workers = 4
+    max_in_flight = 8
+
     Shape_allowed = ['FACE','TORUS2D','PLANE','PLANAR','POLYGON','DISK_CIRCLE','DISK_ELLIPSE' ,'CYLINDER', 'CYLINDER2D', 'SPHERE','SHERE2D', 'CONE','CONE2D', 'TORUS']
 
     def __init__(self):
         self.Coincidence = ShapeCoincidence()
         
     def _parse_for_allow_subshapes(self, subshape_list):
+        return self._allowed_subshapes_table(subshape_list)[0]
+
+    def _allowed_subshapes_table(self, subshape_list):
+        """return the allowed subshapes and the FaceTable of their KindOfShape"""
         subshapes=list()
-        for i in range(len(subshape_list)):
-            kos = str(geompy.KindOfShape(subshape_list[i])[0])
-            if kos in ParseShapesIntersection.Shape_allowed:
+        allowed_kos=list()
+        # KindOfShape requests run in a bounded thread pool, results keep the order of subshape_list
+        all_kos = bounded_map(geompy.KindOfShape, subshape_list, self.max_workers, self.max_in_flight)
+        for i, kos in enumerate(all_kos):
+            kind = str(kos[0])
+            if kind in ParseShapesIntersection.Shape_allowed:
                 subshapes.append(subshape_list[i])
+                allowed_kos.append(kos)
 
             else:
-                print(f"Shape {kos} is not allowed")
-                logging.info(f"Shape {kos} is not allowed")
-    
+                print(f"Shape {kind} is not allowed")
+                logging.info(f"Shape {kind} is not allowed")
+
+        return subshapes, FaceTable.from_kos(allowed_kos)
+
+    def _candidate_pairs(self, contact_1:list, table_1:FaceTable, contact_2:list, table_2:FaceTable, tol_angle:float=0.01, tol_dist:float=0.01):
+        """return the pairs of subshapes which may share a contact area, in the order of itertools.product
+
+        two planar faces share an area only if they are coplanar: the other pairs of planar faces
+        are dropped at once from the face tables, before any FastIntersect or MakeCommon request
+        """
+        planes_1 = table_1.planes()
+        not_planes_2 = ~table_2.planes()
+
+        pairs = list()
+        for i, c1 in enumerate(contact_1):
+            if planes_1[i]:
+                row = table_1[i]
+                keep = not_planes_2 | table_2.coplanar(row["origin"], row["axis"], tol_angle, tol_dist)
+                pairs.extend((c1, contact_2[j]) for j in np.flatnonzero(keep))
+            else:
+                pairs.extend((c1, c2) for c2 in contact_2)
 
-        return subshapes
+        logging.info(f"{len(pairs)} candidate pairs out of {len(contact_1)*len(contact_2)}")
+        return pairs
  
     def _get_contact_area(self, subobj1, subobj2):
         common_area = geompy.MakeCommon(subobj1, subobj2)
@@ -309,9 +343,9 @@ class ParseShapesIntersection():
             if isconnect:
                 uncheck_1 = geompy.SubShapes(obj1, res1)
                 uncheck_2 = geompy.SubShapes(obj2, res2)
-                contact_1 = self._parse_for_allow_subshapes(uncheck_1)
-                contact_2 = self._parse_for_allow_subshapes(uncheck_2)
-                combinaison = list(itertools.product(contact_1, contact_2))
+                contact_1, table_1 = self._allowed_subshapes_table(uncheck_1)
+                contact_2, table_2 = self._allowed_subshapes_table(uncheck_2)
+                combinaison = self._candidate_pairs(contact_1, table_1, contact_2, table_2, tol_angle=tol, tol_dist=gap + 0.01)
 
                 # check if subshapes intersect
                 for c in combinaison:
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+# columnar store of the face descriptors of a compound
+# License: LGPL v 3.0
+# Autor: Marc DUBOC
+# Version: 19/10/2026
+
+import numpy as np
+import GEOM
+import salome
+from salome.geom import geomBuilder
+from common.properties import get_properties_many, type_to_class, EdgeCache
+from common import logging
+
+Geompy = geomBuilder.New()
+
+# kind code of each face type, 0 is kept for unknown kinds
+KIND_CODES = {kind: i+1 for i, kind in enumerate(type_to_class.keys())}
+KIND_CODES["UNKNOWN"] = 0
+CODE_KINDS = {v: k for k, v in KIND_CODES.items()}
+
+# kind of the Shape classes, first kind declared in type_to_class
+CLASS_KINDS = {}
+for k, v in type_to_class.items():
+    CLASS_KINDS.setdefault(v, k)
+
+# kinds regrouped by family, used by the queries
+CYLINDER_KINDS = ("CYLINDER", "CYLINDER2D")
+PLANE_KINDS = ("PLANE", "PLANAR", "POLYGON", "DISK_CIRCLE", "DISK_ELLIPSE", "DISK_ANNULAR")
+DISK_KINDS = ("DISK_CIRCLE", "DISK_ANNULAR")
+
+# position of radius1, radius2 and height in the KindOfShape list (kind removed)
+KOS_LAYOUT = {
+    "PLANE": (None, None, None),
+    "PLANAR": (None, None, None),
+    "POLYGON": (None, None, None),
+    "CYLINDER": (6, None, 7),
+    "CYLINDER2D": (6, None, 7),
+    "CONE": (6, 7, 8),
+    "CONE2D": (6, 7, 8),
+    "TORUS": (6, 7, None),
+    "TORUS2D": (6, 7, None),
+    "DISK_CIRCLE": (6, None, None),
+    "DISK_ELLIPSE": (6, 7, None),
+    "SPHERE": (3, None, None),
+    "SPHERE2D": (3, None, None),
+}
+
+
+def make_dtype(float_type=np.float64):
+    """return the structured dtype of the face table, float_type is used for all the geometric fields"""
+    return np.dtype([("kind", np.int8),
+                     ("part", np.int32),
+                     ("subshape", np.int32),
+                     ("origin", float_type, (3,)),
+                     ("axis", float_type, (3,)),
+                     ("radius1", float_type),
+                     ("radius2", float_type),
+                     ("height", float_type),
+                     ("area", float_type)])
+
+
+class FaceTable():
+    """
+    Columnar store of the faces of a compound: one row per face as a numpy structured array
+
+    attributes:
+        data: np.ndarray with the fields kind, part, subshape, origin, axis, radius1, radius2, height, area
+        parts: list of the part study entries, indexed by the field part
+        float_type: np.float64 or np.float32 for very large models
+
+    methods:
+        from_compound: build the table from the solids and shells of a compound
+        from_parts: build the table from a list of parts study entries
+        from_properties: build the table from already extracted properties
+        from_kos: build the table from already requested KindOfShape lists
+        kind_mask: mask of the rows matching the kinds
+        select: rows filtered by kind and part
+        cylinders: mask of the cylinders within a diameter range
+        coaxial: mask of the rows with an axis colinear to a given axis
+        planes: mask of the planar rows with a known normal
+        coplanar: mask of the planar rows lying in a given plane
+    """
+
+    def __init__(self, size:int=0, float_type=np.float64):
+        self.float_type = float_type
+        self.data = np.zeros(size, dtype=make_dtype(float_type))
+        self.parts = []
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __repr__(self) -> str:
+        return f"FaceTable(faces={len(self.data)}, parts={len(self.parts)}, float_type={np.dtype(self.float_type).name})"
+
+    @staticmethod
+    def _fill_from_kos(row, kos):
+        """fill one row from a KindOfShape list, without any edge exploration"""
+        kind = str(kos[0])
+        values = kos[1:]
+        row["kind"] = KIND_CODES.get(kind, 0)
+
+        if kind not in KOS_LAYOUT:
+            return
+
+        row["origin"] = values[0:3]
+        if kind not in ("SPHERE", "SPHERE2D"):
+            row["axis"] = values[3:6]
+
+        r1, r2, h = KOS_LAYOUT[kind]
+        if r1 is not None:
+            row["radius1"] = values[r1]
+        if r2 is not None:
+            row["radius2"] = values[r2]
+        if h is not None:
+            row["height"] = values[h]
+
+    @staticmethod
+    def _fill_from_shape(row, shape, with_area:bool=True):
+        """fill one row from a Shape object of common.properties"""
+        row["kind"] = KIND_CODES.get(CLASS_KINDS.get(type(shape), "UNKNOWN"), 0)
+        if hasattr(shape, "origin"):
+            row["origin"] = shape.origin.get_coordinate()
+        if hasattr(shape, "axis"):
+            row["axis"] = shape.axis.get_vector()
+        for key in ("radius1", "radius2", "height"):
+            if hasattr(shape, key):
+                row[key] = getattr(shape, key)
+        if with_area:
+            row["area"] = shape.area
+
+    @classmethod
+    def from_compound(cls, compound, float_type=np.float64, refine:bool=False, with_area:bool=True, max_workers:int=1):
+        """build the table from the solids and shells of a compound
+
+        Args:
+            compound: GEOM object or study entry of the compound
+            float_type: np.float64 or np.float32
+            refine: use get_properties to detect disk and orient cylinders (slower, explore the edges)
+            with_area: compute the area of each face
+            max_workers: number of threads used by the refine mode
+        """
+        if isinstance(compound, str):
+            compound = salome.IDToObject(compound)
+
+        parts = []
+        for t in (GEOM.SOLID, GEOM.SHELL):
+            parts.extend(Geompy.SubShapeAll(compound, t))
+
+        return cls.from_parts(parts, float_type=float_type, refine=refine, with_area=with_area, max_workers=max_workers)
+
+    @classmethod
+    def from_parts(cls, parts:list, float_type=np.float64, refine:bool=False, with_area:bool=True, max_workers:int=1):
+        """build the table from a list of parts (GEOM objects or study entries) in one pass"""
+        objs = [salome.IDToObject(p) if isinstance(p, str) else p for p in parts]
+
+        #1. explode the faces of all parts and allocate the table once
+        faces = [Geompy.SubShapeAll(o, GEOM.FACE) for o in objs]
+        faces_id = [Geompy.SubShapeAllIDs(o, GEOM.FACE) for o in objs]
+        table = cls(sum(len(f) for f in faces), float_type)
+        table.parts = [p if isinstance(p, str) else p.GetStudyEntry() for p in parts]
+
+        #2. fill the rows
+        i = 0
+        for p, (part_faces, part_ids) in enumerate(zip(faces, faces_id)):
+            if refine:
+                edge_cache = EdgeCache(objs[p])
+                shapes = get_properties_many(part_faces, edge_cache=edge_cache, max_workers=max_workers)
+            else:
+                shapes = (None for _ in part_faces)
+
+            for face, face_id, shape in zip(part_faces, part_ids, shapes):
+                row = table.data[i]
+                row["part"] = p
+                row["subshape"] = face_id
+
+                if refine:
+                    if shape is not None:
+                        cls._fill_from_shape(row, shape, with_area)
+                else:
+                    cls._fill_from_kos(row, Geompy.KindOfShape(face))
+                    if with_area:
+                        row["area"] = Geompy.BasicProperties(face)[1]
+                i += 1
+
+        logging.info(f"{table}")
+        return table
+
+    @classmethod
+    def from_properties(cls, props:list, part:int=0, subshapes:list=None, float_type=np.float64, with_area:bool=True):
+        """build the table from a list of Shape objects of a single part"""
+        if subshapes is None:
+            subshapes = list(range(len(props)))
+
+        rows = [(s, p) for s, p in zip(subshapes, props) if p is not None]
+        table = cls(len(rows), float_type)
+        for i, (s, p) in enumerate(rows):
+            row = table.data[i]
+            row["part"] = part
+            row["subshape"] = s
+            cls._fill_from_shape(row, p, with_area)
+        return table
+
+    @classmethod
+    def from_kos(cls, kos:list, part:int=0, subshapes:list=None, float_type=np.float64):
+        """build the table from the KindOfShape lists of the faces of a single part, without any GEOM request
+
+        the area is not filled
+        """
+        if subshapes is None:
+            subshapes = list(range(len(kos)))
+
+        table = cls(len(kos), float_type)
+        for i, (s, k) in enumerate(zip(subshapes, kos)):
+            row = table.data[i]
+            row["part"] = part
+            row["subshape"] = s
+            cls._fill_from_kos(row, k)
+        return table
+
+    # vectorized queries ======================================================
+    def kind_mask(self, *kinds) -> np.ndarray:
+        """return the mask of the rows matching one of the kinds"""
+        codes = [KIND_CODES[k] for k in kinds if k in KIND_CODES]
+        return np.isin(self.data["kind"], codes)
+
+    def select(self, kinds:tuple=None, part:int=None) -> np.ndarray:
+        """return the rows filtered by kind and part"""
+        mask = np.ones(len(self.data), dtype=bool)
+        if kinds is not None:
+            mask &= self.kind_mask(*kinds)
+        if part is not None:
+            mask &= self.data["part"] == part
+        return self.data[mask]
+
+    def cylinders(self, min_diameter:float=0.0, max_diameter:float=np.inf) -> np.ndarray:
+        """return the mask of the cylinders with a diameter within [min_diameter, max_diameter]"""
+        diameter = self.data["radius1"]*2
+        return self.kind_mask(*CYLINDER_KINDS) & (diameter >= min_diameter) & (diameter <= max_diameter)
+
+    def parts_with_cylinders(self, min_diameter:float=0.0, max_diameter:float=np.inf) -> np.ndarray:
+        """return the indices of the parts having at least one cylinder within the diameter range"""
+        return np.unique(self.data["part"][self.cylinders(min_diameter, max_diameter)])
+
+    def coaxial(self, origin, axis, tol_angle:float=0.01, tol_dist:float=0.01, mask:np.ndarray=None) -> np.ndarray:
+        """return the mask of the rows with an axis colinear to the line (origin, axis)
+
+        same criteria as ShapeCoincidence.are_axis_colinear, evaluated on all rows at once
+        """
+        origin = np.asarray(origin, dtype=np.float64)
+        axis = np.asarray(axis, dtype=np.float64)
+        axis = axis/np.linalg.norm(axis)
+
+        axes = self.data["axis"].astype(np.float64)
+        norm = np.linalg.norm(axes, axis=1)
+        valid = norm > 0
+        axes[valid] /= norm[valid, None]
+
+        #1. parallelism in both directions
+        angle = np.arccos(np.clip(axes @ axis, -1.0, 1.0))
+        parallel = np.isclose(angle, 0, atol=tol_angle) | np.isclose(angle, np.pi, atol=tol_angle)
+
+        #2. distance between the axes, checked both ways
+        vec = self.data["origin"].astype(np.float64) - origin
+        dist1 = np.linalg.norm(vec - np.outer(vec @ axis, axis), axis=1)
+        dist2 = np.linalg.norm(vec - np.sum(vec*axes, axis=1)[:, None]*axes, axis=1)
+
+        res = valid & parallel & (dist1 <= tol_dist) & (dist2 <= tol_dist)
+        if mask is not None:
+            res &= mask
+        return res
+
+    def planes(self) -> np.ndarray:
+        """return the mask of the planar rows (PLANE_KINDS) with a known normal"""
+        return self.kind_mask(*PLANE_KINDS) & (np.linalg.norm(self.data["axis"], axis=1) > 0)
+
+    def coplanar(self, origin, normal, tol_angle:float=0.01, tol_dist:float=0.01, mask:np.ndarray=None) -> np.ndarray:
+        """return the mask of the planar rows (PLANE_KINDS) lying in the plane (origin, normal)
+
+        the normals are parallel in both directions and the origins are closer than tol_dist from the other plane
+        """
+        origin = np.asarray(origin, dtype=np.float64)
+        normal = np.asarray(normal, dtype=np.float64)
+        normal = normal/np.linalg.norm(normal)
+
+        normals = self.data["axis"].astype(np.float64)
+        valid = self.planes()
+        normals[valid] /= np.linalg.norm(normals[valid], axis=1)[:, None]
+
+        #1. parallelism in both directions
+        angle = np.arccos(np.clip(normals @ normal, -1.0, 1.0))
+        parallel = np.isclose(angle, 0, atol=tol_angle) | np.isclose(angle, np.pi, atol=tol_angle)
+
+        #2. distance between the planes, checked both ways
+        vec = self.data["origin"].astype(np.float64) - origin
+        dist1 = np.abs(vec @ normal)
+        dist2 = np.abs(np.sum(vec*normals, axis=1))
+
+        res = valid & parallel & (dist1 <= tol_dist) & (dist2 <= tol_dist)
+        if mask is not None:
+            res &= mask
+        return res
+
+    def kinds(self) -> list:
+        """return the kind names of all rows"""
+        return [CODE_KINDS[c] for c in self.data["kind"]]
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+# geometry primitives, independent of salome
+# License: LGPL v 3.0
+# Autor: Marc DUBOC
+# Version: 19/10/2026
+
+import numpy as np
+
+
+def _read_only(values) -> np.ndarray:
+    arr = np.array(values, dtype=np.float64)
+    arr.flags.writeable = False
+    return arr
+
+
+class Point():
+    """
+    Immutable point
+
+    The coordinates are stored once in a read-only numpy array. get_coordinate return this array
+    without copy, equality and hash are based on the coordinates values.
+    """
+    __slots__ = ("_array",)
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self._array = _read_only((x, y, z))
+
+    @classmethod
+    def _from_view(cls, view:np.ndarray):
+        p = cls.__new__(cls)
+        p._array = view
+        return p
+
+    @classmethod
+    def from_array(cls, coordinates) -> list:
+        """return a list of Point from an array of coordinates of shape (n,3), the points share the same buffer"""
+        base = _read_only(coordinates).reshape(-1, 3)
+        return [cls._from_view(row) for row in base]
+
+    @property
+    def x(self):
+        return float(self._array[0])
+
+    @property
+    def y(self):
+        return float(self._array[1])
+
+    @property
+    def z(self):
+        return float(self._array[2])
+
+    def get_coordinate(self):
+        return self._array
+
+    def to_dict(self):
+        return dict(x=self.x, y=self.y, z=self.z)
+
+    def __eq__(self, other):
+        if isinstance(other, Point):
+            return bool(np.array_equal(self._array, other._array))
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.x, self.y, self.z))
+
+    def __reduce__(self):
+        return (Point, (self.x, self.y, self.z))
+
+    def __repr__(self) -> str:
+        return f"Point({self.x}, {self.y}, {self.z})"
+
+class Vector():
+    """
+    Immutable vector
+
+    Same storage as Point: a read-only numpy array returned by get_vector without copy.
+    """
+    __slots__ = ("_array",)
+
+    def __init__(self, vx=0.0, vy=0.0, vz=1.0):
+        self._array = _read_only((vx, vy, vz))
+
+    @classmethod
+    def _from_view(cls, view:np.ndarray):
+        v = cls.__new__(cls)
+        v._array = view
+        return v
+
+    @classmethod
+    def from_array(cls, vectors) -> list:
+        """return a list of Vector from an array of shape (n,3), the vectors share the same buffer"""
+        base = _read_only(vectors).reshape(-1, 3)
+        return [cls._from_view(row) for row in base]
+
+    @property
+    def vx(self):
+        return float(self._array[0])
+
+    @property
+    def vy(self):
+        return float(self._array[1])
+
+    @property
+    def vz(self):
+        return float(self._array[2])
+
+    def get_vector(self):
+        return self._array
+
+    def to_dict(self):
+        return dict(vx=self.vx, vy=self.vy, vz=self.vz)
+
+    def __eq__(self, other):
+        if isinstance(other, Vector):
+            return bool(np.array_equal(self._array, other._array))
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.vx, self.vy, self.vz))
+
+    def __reduce__(self):
+        return (Vector, (self.vx, self.vy, self.vz))
+
+    def __repr__(self) -> str:
+        return f"Vector({self.vx}, {self.vy}, {self.vz})"
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# bounded worker pool for blocking calls to the salome servers
+# License: LGPL v 3.0
+# Autor: Marc DUBOC
+# Version: 19/10/2026
+
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BoundedPool():
+    """
+    Worker pool with one in-flight budget shared by all its maps
+
+    Several maps of the same pool, even nested (the items of a map produced by another map), never
+    have more than max_in_flight calls submitted and not completed together, so the server is never
+    flooded. A slot of the budget is released when its call completes, not when its result is consumed,
+    so nested maps cannot block each other.
+
+    attributes:
+        max_workers: int, number of workers, 1 or less run the calls sequentially in the calling thread
+        max_in_flight: int, maximum number of submitted calls not completed (default: 2*max_workers)
+
+    methods:
+        submit: submit one call, wait for a slot of the budget
+        map: yield func(item) for each item, in the order of items
+    """
+    def __init__(self, max_workers:int=4, max_in_flight:int=None, executor_class=ThreadPoolExecutor, **executor_kwargs):
+        self.max_workers = max_workers if max_workers is not None else 1
+        if max_in_flight is None:
+            max_in_flight = 2*self.max_workers
+        self.max_in_flight = max(1, max_in_flight)
+
+        self._executor = None
+        self._budget = threading.BoundedSemaphore(self.max_in_flight)
+        if self.max_workers > 1:
+            self._executor = executor_class(max_workers=self.max_workers, **executor_kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+    def submit(self, func, item):
+        self._budget.acquire()
+        try:
+            future = self._executor.submit(func, item)
+        except BaseException:
+            self._budget.release()
+            raise
+        future.add_done_callback(lambda _: self._budget.release())
+        return future
+
+    def map(self, func, items, max_pending:int=None):
+        """
+        yield func(item) for each item, in the order of items
+
+        items can be a lazy generator, at most max_pending results of this map (default: max_in_flight)
+        wait to be consumed. Closing the generator (consumer cancelled) cancels the calls not started yet.
+        """
+        if self._executor is None:
+            for item in items:
+                yield func(item)
+            return
+
+        if max_pending is None:
+            max_pending = self.max_in_flight
+
+        pending = deque()
+        try:
+            for item in items:
+                pending.append(self.submit(func, item))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for f in pending:
+                f.cancel()
+
+
+def bounded_map(func, items, max_workers:int=4, max_in_flight:int=None, executor_class=ThreadPoolExecutor, **executor_kwargs):
+    """
+    yield func(item) for each item, in the order of items
+
+    The calls run in a thread pool. The CORBA calls to the GEOM server release the GIL
+    while waiting, so several parts or faces can be processed concurrently.
+    At most max_in_flight calls are submitted at the same time, so the server is never flooded
+    and items can be a lazy generator. Closing the generator (consumer cancelled) cancels the calls
+    not started yet. Use a BoundedPool to share the budget between nested maps.
+
+    Args:
+        func: function called with one item
+        items: iterable of items
+        max_workers: number of workers, 1 or less run sequentially in the calling thread
+        max_in_flight: maximum number of submitted calls not yet consumed (default: 2*max_workers)
+        executor_class: ThreadPoolExecutor or ProcessPoolExecutor (func and items must then be picklable)
+        executor_kwargs: extra arguments of the executor (mp_context...)
+    """
+    with BoundedPool(max_workers, max_in_flight, executor_class, **executor_kwargs) as pool:
+        yield from pool.map(func, items)
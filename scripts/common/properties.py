@@ -1,64 +1,89 @@
+import threading
 import numpy as np
 import salome
 import GEOM
 from salome.geom import geomBuilder
 from common import logging
+from common.geometry import Point, Vector
+from common.pool import bounded_map
 
 Geompy = geomBuilder.New()
 
-class Point():
-    def __init__(self, x=0.0, y=0.0, z=0.0):
-        self.x = x
-        self.y = y
-        self.z = z
-
-    def get_coordinate(self):
-        return np.array([self.x, self.y, self.z])
-    
-    def to_dict(self):
-        return dict(x=self.x, y=self.y, z=self.z)
-    
-    def __repr__(self) -> str:
-        return f"Point({self.x}, {self.y}, {self.z})"
-
-class Vector():
-    def __init__(self, vx=0.0, vy=0.0, vz=1.0):
-        self.vx = vx
-        self.vy = vy
-        self.vz = vz
-
-    def get_vector(self):
-        return np.array([self.vx, self.vy, self.vz])
-    
-    def to_dict(self):
-        return dict(vx=self.vx, vy=self.vy, vz=self.vz)
-    
-    def __repr__(self) -> str:
-        return f"Vector({self.vx}, {self.vy}, {self.vz})"
-
 class BasicProperties():
-    def __init__(self, length=0.0, area=0.0, volume=0.0):
-        self.length = length
-        self.area = area
-        self.volume = volume
+    """
+    length, area and volume of a shape
+
+    The values are computed on first access with Geompy.BasicProperties and then cached.
+    set_source bind the GEOM object without any CORBA call, set_basic_properties compute them at once.
+    """
+    def __init__(self, length=None, area=None, volume=None):
+        self._source = None
+        self._length = length
+        self._area = area
+        self._volume = volume
+
+    def _load_basic_properties(self):
+        if self._source is None:
+            basic = (0.0, 0.0, 0.0)
+        else:
+            basic = Geompy.BasicProperties(self._source)
+
+        if self._length is None:
+            self._length = basic[0]
+        if self._area is None:
+            self._area = basic[1]
+        if self._volume is None:
+            self._volume = basic[2]
+
+    def set_source(self, obj):
+        """bind the GEOM object, the properties will be computed on first access"""
+        self._source = obj
+        self._length = None
+        self._area = None
+        self._volume = None
 
     def set_basic_properties(self, obj):
-        basic = Geompy.BasicProperties(obj)
-        self.length = basic[0]
-        self.area = basic[1]
-        self.volume = basic[2]
+        self.set_source(obj)
+        self._load_basic_properties()
+
+    def has_basic_properties(self):
+        return None not in (self._length, self._area, self._volume)
+
+    @property
+    def length(self):
+        if self._length is None:
+            self._load_basic_properties()
+        return self._length
+
+    @length.setter
+    def length(self, value):
+        self._length = value
+
+    @property
+    def area(self):
+        if self._area is None:
+            self._load_basic_properties()
+        return self._area
+
+    @area.setter
+    def area(self, value):
+        self._area = value
+
+    @property
+    def volume(self):
+        if self._volume is None:
+            self._load_basic_properties()
+        return self._volume
+
+    @volume.setter
+    def volume(self, value):
+        self._volume = value
 
 class Shape(BasicProperties):
     def __init__(self, *args, **kwargs):
-        super().__init__(args)
+        super().__init__()
         for key, value in kwargs.items():
             setattr(self, key, value)
-    
-    def set_basic_properties(self, obj):
-        basic = Geompy.BasicProperties(obj)
-        self.length = basic[0]
-        self.area = basic[1]
-        self.volume = basic[2]
 
 class Plane(Shape):
     def __init__(self, origin, axis, *args):
@@ -149,11 +174,60 @@ type_to_class = {
 }
 
 
-def check_cylinder_direction(kos_list,obj):
+class EdgeCache():
+    """
+    Cache of the edge descriptors of a main shape, keyed by the edge sub-shape index
+
+    The edges of the main shape are analyzed once in one pass (kind, centre, axis, radius, endpoints
+    as Circle, ArcCircle, Segment... objects). The faces classification then only does lookups,
+    edges shared between adjacent faces are not analyzed again.
+
+    attributes:
+        main: GEOM object of the main shape (part)
+        edges: dict {edge sub-shape index: Shape or None}
+
+    methods:
+        fill: analyze all the edges of the main shape
+        get: return the descriptor of an edge from its sub-shape index
+        edges_of: return the descriptors of the edges of a face of the main shape
+    """
+    def __init__(self, main):
+        self.main = main
+        self.edges = None
+        self._lock = threading.Lock()
+
+    def fill(self):
+        # the faces of a part can be classified from several threads
+        with self._lock:
+            if self.edges is None:
+                explode = Geompy.SubShapeAll(self.main,GEOM.EDGE)
+                ids = Geompy.SubShapeAllIDs(self.main,GEOM.EDGE)
+                self.edges = {i: get_properties(e) for i, e in zip(ids, explode)}
+        return self.edges
+
+    def get(self, index:int):
+        return self.fill().get(index)
+
+    def edges_of(self, face) -> list:
+        """return the edge descriptors of a face, in the order of Geompy.SubShapeAll"""
+        edges = self.fill()
+        ids = Geompy.GetSubShapesIDs(self.main, Geompy.SubShapeAll(face,GEOM.EDGE))
+        return [edges.get(i) for i in ids]
+
+    def clear(self):
+        self.edges = None
+
+def _get_edges(obj, edge_cache:EdgeCache=None) -> list:
+    """return the properties of the edges of a face, from the cache if available"""
+    if edge_cache is not None:
+        return edge_cache.edges_of(obj)
+    explode = Geompy.SubShapeAll(obj,GEOM.EDGE)
+    return [get_properties(e) for e in explode]
+
+def check_cylinder_direction(kos_list,obj,edge_cache:EdgeCache=None):
     """ Check if the cylinder is in the right directionn and set the origin to the closest circle"""
     #logging.info("Check cylinder direction")
-    explode = Geompy.SubShapeAll(obj,GEOM.EDGE)
-    edges = [get_properties(e) for e in explode]
+    edges = _get_edges(obj, edge_cache)
 
     vector_cylinder = Vector(*kos_list[3:6])
     origin_cylinder = Point(*kos_list[0:3])
@@ -200,21 +274,19 @@ def check_cylinder_direction(kos_list,obj):
                     "height": height_cylinder,
                     "kind": "CYLINDER"}
 
-def is_DiskCircle_or_DiskAnnular(obj):
+def is_DiskCircle_or_DiskAnnular(obj,edge_cache:EdgeCache=None):
     """
         Checks if the face is a disk annular.
         
         Parameters:
         - obj: The object to check.
-        - origin_cylinder: The origin of the cylinder (default: None).
-        - axis_cylinder: The axis of the cylinder (default: None).
+        - edge_cache: EdgeCache of the main shape of the face (default: None, edges are analyzed).
         
         Returns:
         - Dictionary of properties if the face is disk annular, otherwise None.
     """
 
-    explode = Geompy.SubShapeAll(obj,GEOM.EDGE)
-    edges = [get_properties(e) for e in explode]
+    edges = _get_edges(obj, edge_cache)
 
     edges_type = [type(e) for e in edges]
 
@@ -261,12 +333,12 @@ def is_DiskCircle_or_DiskAnnular(obj):
                     "radius2": min(radius),
                     "kind": "DISK_ANNULAR"}
 
-def extract_properties(kos_list,obj):
+def extract_properties(kos_list,obj,edge_cache:EdgeCache=None):
 
     kind = str(kos_list.pop(0))
     
     if kind in ("PLANE","PLANAR",'POLYGON'):
-        test= is_DiskCircle_or_DiskAnnular(obj)
+        test= is_DiskCircle_or_DiskAnnular(obj,edge_cache)
         if test is not None:
             return test
         else:
@@ -277,7 +349,7 @@ def extract_properties(kos_list,obj):
             }
         
     elif kind in ("CYLINDER", "CYLINDER2D"):
-        test = check_cylinder_direction(kos_list,obj)
+        test = check_cylinder_direction(kos_list,obj,edge_cache)
         if test is not None:
             return test
         else:
@@ -377,9 +449,21 @@ def extract_properties(kos_list,obj):
     else:
         return None
     
-def get_properties(obj):
-    kos_lst = Geompy.KindOfShape(obj)
-    props = extract_properties(kos_lst,obj)
+def get_properties(obj, basic_properties:bool=False, edge_cache:EdgeCache=None, kos:list=None):
+    """
+    return the Shape object of a GEOM object
+
+    Parameters:
+    - obj: the GEOM object
+    - basic_properties: compute length, area and volume now. By default they are computed on first access
+    - edge_cache: EdgeCache of the main shape, used for the faces classification
+    - kos: result of Geompy.KindOfShape(obj) if already known
+
+    Returns:
+    - Shape object or None if the kind is not handled
+    """
+    kos_lst = list(kos) if kos is not None else Geompy.KindOfShape(obj)
+    props = extract_properties(kos_lst,obj,edge_cache)
     if not props:
         return None
 
@@ -393,7 +477,51 @@ def get_properties(obj):
 
     if shape_class:
         shape = shape_class(**props)
-        shape.set_basic_properties(obj)
+        if basic_properties:
+            shape.set_basic_properties(obj)
+        else:
+            shape.set_source(obj)
         return shape
     else:
-        return None
\ No newline at end of file
+        return None
+
+def get_areas(shapes:list, max_workers:int=4, max_in_flight:int=None) -> np.ndarray:
+    """
+    return the areas of a list of Shape
+
+    cached areas are reused, only the missing ones are computed: there is no batch request in GEOM,
+    the Geompy.BasicProperties calls of the shapes bound to a source run concurrently in a bounded
+    thread pool (see common.pool.bounded_map) and fill the cache of each shape. None entries return 0.0
+    """
+    missing = [s for s in shapes if s is not None and s._area is None and s._source is not None]
+    # consume the results, the basic properties are cached in the shapes
+    for _ in bounded_map(lambda s: s._load_basic_properties(), missing, max_workers, max_in_flight):
+        pass
+
+    areas = np.zeros(len(shapes))
+    for i, s in enumerate(shapes):
+        if s is not None:
+            areas[i] = s.area
+    return areas
+
+def _get_properties_safe(args):
+    obj, edge_cache = args
+    try:
+        return get_properties(obj, edge_cache=edge_cache)
+    except Exception as e:
+        logging.warning(f"Cannot get properties of {obj}: {e}")
+        return None
+
+def get_properties_many(objs, edge_cache:EdgeCache=None, max_workers:int=4, max_in_flight:int=None):
+    """
+    yield the properties of several GEOM objects, in the order of objs
+
+    The blocking KindOfShape calls run in a bounded thread pool (see common.pool.bounded_map).
+    objs can be a list of GEOM objects or of (GEOM object, EdgeCache) tuples to mix faces of several parts.
+    A failing call is logged and yields None.
+    """
+    def tasks():
+        for o in objs:
+            yield o if isinstance(o, tuple) else (o, edge_cache)
+
+    return bounded_map(_get_properties_safe, tasks(), max_workers, max_in_flight)
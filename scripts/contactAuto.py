@@ -21,7 +21,7 @@ from importlib import reload
 
 # add contact module
 try:
-    modules = ['common.contact.data', 'common.contact.intersect', 'common.contact.contactTree','common.contact.aster', 'common.contact.cgui.mainwin']
+    modules = ['common.columnar', 'common.contact.export', 'common.contact.data', 'common.contact.intersect', 'common.contact.contactTree','common.contact.aster', 'common.contact.delta', 'common.contact.cgui.mainwin']
     for m in modules:
         if m in sys.modules:
             reload(sys.modules[m])
@@ -31,6 +31,8 @@ try:
     from common.contact.contactTree import ContactTree
     from common.contact.cgui.mainwin import ContactGUI
     from common.contact.aster import MakeComm
+    from common.contact.delta import diff_contacts, has_changes, report, merge_in_place, load_state, save_state, delta_path, write_delta
+    from common.contact.export import write_binary
     from common import logging
     
 except:
@@ -42,6 +44,8 @@ except:
     from common.contact.contactTree import ContactTree
     from common.contact.cgui.mainwin import ContactGUI
     from common.contact.aster import MakeComm
+    from common.contact.delta import diff_contacts, has_changes, report, merge_in_place, load_state, save_state, delta_path, write_delta
+    from common.contact.export import write_binary
     from common import logging
 
 # Detect current study
@@ -208,18 +212,69 @@ class ContactAuto(QObject):
         # close auto window
         self.Gui.autoWindow.close()
 
-    @pyqtSlot(str,str,bool)
-    def export_contact(self, filename,export, bonded_regroup_master:bool=True):
+    @pyqtSlot(str,str,bool,bool,bool,bool)
+    def export_contact(self, filename,export, bonded_regroup_master:bool=True, incremental:bool=False, bonded_consolidate:bool=False, contact_merge:bool=False):
+        """
+        export the contacts to filename
+
+        bonded_consolidate: merge the compatible bonded LIAISON_MAIL zones of the ASTER export
+        (see common.contact.aster.consolidateZones)
+        contact_merge: merge the FRICTION and FRICTIONLESS zones of the ASTER export
+        (see common.contact.aster.mergeContactZones)
+
+        incremental: diff the contacts with the previous export of filename by their stable key.
+        The file is not rewritten if nothing changed, otherwise the changes are written in a delta
+        file and the contacts keep their position of the previous export. The file is fully written
+        if it is missing or if it was written with other options.
+
+        The RAW export holds one entry per pair, null for the pairs not completed, unless it is
+        rewritten from a previous export: it then holds the completed contacts only.
+
+        return the delta (see common.contact.delta.diff_contacts), None if not incremental or no previous export
+        """
+        # the records are serialized while they are written, except for the RAW and the incremental export
         if export == "RAW":
-            self.Contact.export(filename)
-            
+            pairs_list = [c.to_dict_for_export() for c in self.Contact.get_contacts()]
+            data = [c for c in pairs_list if c is not None]
+        else:
+            data = self.Contact.iter_export(with_bbox=export == "ASTER" and contact_merge)
+
+        # options changing the written file, kept in the state of an incremental export
+        options = dict(bonded_regroup_master=bonded_regroup_master, bonded_consolidate=bonded_consolidate, contact_merge=contact_merge)
+
+        delta = None
+        if incremental:
+            data = list(data)
+            previous = load_state(filename, export, options)
+            if previous is not None:
+                delta = diff_contacts(previous, data)
+                logging.info(f"export_contact {filename}: {report(delta)}")
+                print(f"{filename}: {report(delta)}")
+                if not has_changes(delta):
+                    return delta
+
+                write_delta(delta_path(filename), delta)
+                data = merge_in_place(previous, data)
+                pairs_list = data
+
+        if export == "RAW":
+            self.Contact.export(filename, pairs_list)
+
+        elif export == "JSONL":
+            self.Contact.export_jsonl(filename, data)
+
         elif export == "ASTER":
-            data = []
-            for c in self.Contact.get_contacts():
-                data.append(c.to_dict_for_export())
-            Mk = MakeComm(data)
             with open(filename, 'w') as f:
-                f.write(Mk.process(bonded_regroup_master))
+                zones = MakeComm.writeRecords(f, data, bonded_regroup_master, bonded_consolidate, contact_merge)
+            for contact_type, count in zones.items():
+                logging.info(f"export_contact {filename}: {contact_type} zones {count['before']} -> {count['after']}")
+
+        elif export == "BINARY":
+            write_binary(filename, data)
+
+        if incremental:
+            save_state(filename, export, data, options)
+        return delta
 
     # manual selection of groups
     @pyqtSlot(int)
@@ -9,13 +9,14 @@ import sys
 import inspect
 import re
 import json
+import threading
 import GEOM
 import salome
 from salome.kernel.studyedit import getStudyEditor
 from salome.geom import geomtools, geomBuilder
 
 from PyQt5.QtCore import pyqtSignal, pyqtSlot, QObject, Qt, QVariant
-from PyQt5.QtWidgets import QDockWidget,QMessageBox
+from PyQt5.QtWidgets import QDockWidget,QMessageBox,QApplication
 
 #for debbuging
 DEBUG = False
@@ -23,7 +24,7 @@ DEBUG = False
 try:
     if DEBUG:
         from importlib import reload 
-        modules = ['common.tree','common.bolt.shape', 'common.bolt.treeBolt', 'common.properties','common.bolt.aster','common.bolt.data','common.bolt.bgui.mainwin','common']
+        modules = ['common.tree','common.bolt.pairing','common.bolt.shape', 'common.bolt.treeBolt', 'common.properties','common.columnar','common.bolt.aster','common.bolt.export','common.bolt.data','common.bolt.bgui.mainwin','common']
         for m in modules:
             if m in sys.modules:
                 reload(sys.modules[m])
@@ -32,9 +33,11 @@ try:
     from common.tree import id_to_tuple
     from common.bolt.treeBolt import TreeBolt
     from common.bolt.data import BoltsManager,VirtualBolt
-    from common.bolt.shape import Method, Parse, Nut, Screw, Thread, pair_screw_nut_threads, pair_holes,create_virtual_bolt,create_virtual_bolt_from_thread,create_virtual_bolt_from_hole
+    from common.bolt.shape import Method, Parse, Nut, Screw, Thread, pair_screw_nut_threads, pair_holes,create_virtual_bolt,create_virtual_bolt_from_thread,create_virtual_bolt_from_hole,create_virtual_bolts
     from common.properties import *
-    from common.bolt.aster import MakeComm
+    from common.bolt.study import create_bolt_lines, rename_objects, read_manifest, write_manifest
+    from common.bolt.cache import ParseCache
+    from common.bolt.export import write_files as write_bolt_files
     from common import logging
 
 except:
@@ -46,9 +49,11 @@ except:
     from common.tree import id_to_tuple
     from common.bolt.treeBolt import TreeBolt
     from common.bolt.data import BoltsManager, VirtualBolt
-    from common.bolt.shape import Method, Parse, Nut, Screw, Thread, pair_screw_nut_threads, pair_holes,create_virtual_bolt,create_virtual_bolt_from_thread,create_virtual_bolt_from_hole
+    from common.bolt.shape import Method, Parse, Nut, Screw, Thread, pair_screw_nut_threads, pair_holes,create_virtual_bolt,create_virtual_bolt_from_thread,create_virtual_bolt_from_hole,create_virtual_bolts
     from common.properties import *
-    from common.bolt.aster import MakeComm
+    from common.bolt.study import create_bolt_lines, rename_objects, read_manifest, write_manifest
+    from common.bolt.cache import ParseCache
+    from common.bolt.export import write_files as write_bolt_files
     from common import logging
 
 StudyEditor = getStudyEditor()
@@ -62,6 +67,12 @@ class Bolt1D(QObject):
     pattern_bolt = re.compile(r'_B\d{1,3}(_-?\d+(\.\d+)?)+')
     vb_folder_name = "Virtual Bolts"
 
+    # worker pool used to parse the parts (threads, or processes if Parse.backend is set)
+    parse_workers = 4
+    parse_in_flight = 8
+    # classify one fastener per circular or linear pattern, the others are replicated
+    parse_patterns = True
+
     parts_selected = pyqtSignal(str,str)
     root_selected = pyqtSignal(str,str)
     parse_progess = pyqtSignal(int)
@@ -72,12 +83,14 @@ class Bolt1D(QObject):
         self.Gui = BoltGUI()
         self.Tree = TreeBolt()
         self.Parse= Parse()
+        self.Parse.cache = ParseCache()
         self.roots =None
         self.vb_folder_sid = None
         self.BoltsMgt = BoltsManager()
 
         self.parts_id =[]
         self.compound_id = None
+        self.parse_cancel = threading.Event()
 
         self.connect()
 
@@ -103,64 +116,63 @@ class Bolt1D(QObject):
 
     def get_existing_bolt(self,roots):
         # get the existing virtual bolts
-        bolts_prop =   self.Tree.parse_for_bolt(roots)
+        bolts_prop =   self.Tree.parse_for_bolt(roots, manifest=read_manifest(self.vb_folder_sid))
         for b in bolts_prop:
             self.BoltsMgt.add_bolt(b['prop'],b['id'])
+        self.save_manifest()
 
         # add virtual bolts to table
         if bolts_prop:
             b_list = self.virtual_bolt_to_table()
             self.Gui.set_data(b_list)
-            self.Gui.model.updateBolt.connect(self.update_bolt)
+            self.connect_model()
+
+
+    def create_salome_lines(self, bolts:list) -> list:
+        """function to create the salome lines of several virtual bolts in the virtual bolts folder"""
+        if self.vb_folder_sid is None:
+            vbf = None
+        else:
+            vbf = salome.IDToSObject(self.vb_folder_sid)
 
+        entries, vbf = create_bolt_lines(bolts, folder=vbf, folder_name=self.vb_folder_name, refresh=False)
+        self.vb_folder_sid = vbf.GetID()
+
+        for b, e in zip(bolts, entries):
+            b.sid = e
+        self.save_manifest()
+        return entries
+
+    def save_manifest(self):
+        """store the endpoints of the virtual bolts in the study, read back when the study is reopened"""
+        if self.vb_folder_sid is not None:
+            write_manifest(self.vb_folder_sid, self.BoltsMgt.bolts)
 
     def create_salome_line(self, bolt:VirtualBolt) -> str:
         """function to create a salome line from a virtual bolt"""
-        p0_val = bolt.start.get_coordinate().tolist()
-        p1_val = bolt.end.get_coordinate().tolist()
-        p0 = Geompy.MakeVertex(*p0_val)
-        p1 = Geompy.MakeVertex(*p1_val)
-        l= Geompy.MakeLineTwoPnt(p0,p1)
-        ld= Geompy.addToStudy(l,bolt.get_detail_name())
-        Gg.setColor(ld,0,255,0)
-
-        #create group for line and points
-        grp_l = Geompy.CreateGroup(l, Geompy.ShapeType["EDGE"])
-        grp_e0 = Geompy.CreateGroup(l, Geompy.ShapeType["VERTEX"])
-        grp_e1 = Geompy.CreateGroup(l, Geompy.ShapeType["VERTEX"])
-
-        # get the vertex of the line
-        li = Geompy.SubShapeAll(l,Geompy.ShapeType["EDGE"])
-        lid = Geompy.GetSubShapeID(l,li[0])
-        Geompy.AddObject(grp_l,lid)
-
-        vi = Geompy.SubShapeAll(l,Geompy.ShapeType["VERTEX"])
-        vid = [Geompy.GetSubShapeID(l,v) for v in vi]
-        Geompy.AddObject(grp_e0,vid[0])
-        Geompy.AddObject(grp_e1,vid[1])
-
-        #add the line and points to the group
-        Geompy.addToStudyInFather(salome.IDToObject(ld),grp_l,bolt.get_bolt_name())
-        Geompy.addToStudyInFather(salome.IDToObject(ld),grp_e0,bolt.get_start_name())
-        Geompy.addToStudyInFather(salome.IDToObject(ld),grp_e1,bolt.get_end_name())
-        
-        return l
+        return self.create_salome_lines([bolt])[0]
 
     # signal slots connection =================================================
     def connect(self):
         # GUI => APP
         self.Gui.select.connect(self.select)
         self.Gui.parse.connect(self.parse_selected)
+        self.Gui.cancel.connect(self.cancel_parse)
         self.Gui.select_root.connect(self.on_root_select)
         self.Gui.export_bolt.connect(self.write_files)
         self.Gui.deleteItem.delBolt.connect(self.delete_bolt)
-        self.Gui.model.updateBolt.connect(self.update_bolt)
+        self.connect_model()
 
         # APP => GUI
         self.parts_selected.connect(self.Gui.on_selection)
         self.parse_progess.connect(self.Gui.on_progress)
         self.root_selected.connect(self.Gui.on_root_selection)
         
+    def connect_model(self):
+        # table model is created again each time the data are set
+        self.Gui.model.updateBolt.connect(self.update_bolt)
+        self.Gui.model.updateBolts.connect(self.update_bolts_rows)
+
     # Slot ====================================================================
     @pyqtSlot()
     def on_root_select(self):
@@ -175,10 +187,9 @@ class Bolt1D(QObject):
                 self.roots = id
                 name = salome.IDToSObject(self.roots).GetName()
                 self.root_selected.emit(f"{name} {id}","green")
-                self.get_existing_bolt(self.roots)
-
-                #get the virtual bolt folder sid
+                #get the virtual bolt folder sid, it holds the bolt manifest
                 self.vb_folder_sid = self.Tree.get_bolt_folder(self.roots,self.vb_folder_name)
+                self.get_existing_bolt(self.roots)
             else:
                 self.root_selected.emit("Selected a component !","red")
                 
@@ -225,6 +236,16 @@ class Bolt1D(QObject):
             else:
                 self.parts_selected.emit("select at least 2 parts (solid or shell) or a compound","red")
                 
+    @pyqtSlot()
+    def cancel_parse(self):
+        logging.info("cancel parse")
+        self.parse_cancel.set()
+
+    def on_parse_progress(self, done:int, total:int):
+        """progress of the parsing between 5 and 85%, keep the GUI responsive to the cancel button"""
+        self.parse_progess.emit(int(5 + 80*done/total))
+        QApplication.processEvents()
+
     @pyqtSlot(QVariant,float,float,float,float)
     def parse_selected(self,method:Method=Method.SCREW,d_min=3,d_max=36,tol_axis=0.01,tol_dist=0.01):
         nuts=[]
@@ -232,7 +253,6 @@ class Bolt1D(QObject):
         threads=[]
         new_bolts_id=[]
         parts_to_delete = []
-        lines_ids = []
 
         self.parse_progess.emit(0)
         logging.info(f"compound_id: {self.compound_id}")
@@ -245,30 +265,31 @@ class Bolt1D(QObject):
             self.compound_id = None
 
         if self.parts_id:
-            progress = 5
             self.parse_progess.emit(5)
-            for p in self.parts_id:
-                logging.info(f"part id: {p}")
-                progress += 80/len(self.parts_id)
-                o = self.Parse.parse_obj(p,min_diameter=d_min,max_diameter=d_max)
-                logging.info(f"o: {o}")
-                
-                if isinstance(o,Nut):
-                    nuts.append(o)
-
-                elif isinstance(o,Screw):
-                    screws.append(o)
-
-                elif isinstance(o,list):
-                    for e in o:
-                        if isinstance(e,Thread):
-                            threads.append(e)
-
-                self.parse_progess.emit(progress)
-
-                logging.info(f"nuts: {nuts}")
-                logging.info(f"screws: {screws}")
-                logging.info(f"threads: {threads}")
+            self.parse_cancel.clear()
+            # parts are parsed in a worker pool, results are merged in the parts order
+            parsed = self.Parse.parse_parts(self.parts_id,
+                                            min_diameter=d_min,
+                                            max_diameter=d_max,
+                                            max_workers=self.parse_workers,
+                                            max_in_flight=self.parse_in_flight,
+                                            progress=self.on_parse_progress,
+                                            cancel=self.parse_cancel,
+                                            patterns=self.parse_patterns)
+            nuts = parsed['nuts']
+            screws = parsed['screws']
+            threads = parsed['threads']
+
+            logging.info(f"nuts: {nuts}")
+            logging.info(f"screws: {screws}")
+            logging.info(f"threads: {threads}")
+
+            if parsed['cancelled']:
+                self.parse_progess.emit(0)
+                self.parts_id =[]
+                self.compound_id = None
+                self.parts_selected.emit("search cancelled, select a compound or several parts","black")
+                return
 
             if Method.SCREW == method:
                 connections = pair_screw_nut_threads(screws,nuts,threads,tol_angle=tol_axis, tol_dist=tol_dist)
@@ -278,52 +299,22 @@ class Bolt1D(QObject):
             
             #logging.info(connections)
 
-            # create virtual bolts
-            if 'bolts' in connections.keys():
-                for bolt in connections['bolts']:
-                    bolt_prop = create_virtual_bolt(bolt)
-                    if bolt_prop: 
-                        new_id = self.BoltsMgt.add_bolt(bolt_prop)
-                        new_bolts_id.append(new_id)  
-                        for p in bolt:
-                            parts_to_delete.append(p.part_id)
-
-            if 'threads' in connections.keys():
-                for threads in connections['threads']:
-                    bolt_prop = create_virtual_bolt_from_thread(threads)
-                    if bolt_prop:
-                        new_id=self.BoltsMgt.add_bolt(bolt_prop)
-                        new_bolts_id.append(new_id)
-                        for p in threads:
-                            if isinstance(p,Screw):
-                                    parts_to_delete.append(p.part_id)
-
-            if 'holes' in connections.keys():
-                for holes in connections['holes']:
-                    bolt_prop = create_virtual_bolt_from_hole(holes)
-                    if bolt_prop:
-                        new_id=self.BoltsMgt.add_bolt(bolt_prop)
-                        new_bolts_id.append(new_id)
-
-            # build geom in salome
-            for id in new_bolts_id:
-                b = self.BoltsMgt.get_bolt(id)
-                sbolt = self.create_salome_line(b)
-                logging.debug(f"sbolt: {dir(sbolt)}")
-                b.sid= sbolt.GetStudyEntry()
-                lines_ids.append(sbolt)
-
-            if self.vb_folder_sid is None:
-                vbf= Geompy.NewFolder(self.vb_folder_name)
-                self.vb_folder_sid = vbf.GetID()
-            else:
-                vbf = salome.IDToSObject(self.vb_folder_sid)
-            Geompy.PutListToFolder(lines_ids, vbf)
+            # create virtual bolts, all the pairs of each kind at once
+            for kind, pair, bolt_prop in create_virtual_bolts(connections):
+                new_id = self.BoltsMgt.add_bolt(bolt_prop)
+                new_bolts_id.append(new_id)
+                if kind == 'bolts':
+                    parts_to_delete.extend(p.part_id for p in pair)
+                elif kind == 'threads':
+                    parts_to_delete.extend(p.part_id for p in pair if isinstance(p,Screw))
+
+            # build geom in salome, all the lines at once
+            self.create_salome_lines([self.BoltsMgt.get_bolt(id) for id in new_bolts_id])
 
             # add virtual bolts to table
             b_list = self.virtual_bolt_to_table()
             self.Gui.set_data(b_list)
-            self.Gui.model.updateBolt.connect(self.update_bolt)
+            self.connect_model()
 
             # delete parts
             delete=False
@@ -359,27 +350,26 @@ class Bolt1D(QObject):
                     preload:float):
         
         bolt_prop = dict(radius=radius,
-                         radius_start=radius_start,
-                         radius_end=radius_end,
+                         start_radius=radius_start,
+                         end_radius=radius_end,
                          start_height=start_height,
                          end_height=end_height,
                          preload=preload)
 
-        # update bolt properties
-        name = self.BoltsMgt.update_bolt(id, bolt_prop)
-        sid = self.BoltsMgt.get_bolt(id).sid
-
-        # update salome name
-        obj = salome.IDToObject(sid)
-        obj.SetName(name)
+        self.update_bolts(bolt_prop, ids=[int(id)])
 
-        # update salome study attribute
-        sobj = salome.IDToSObject(sid)
-        sobjattr = Builder.FindOrCreateAttribute(sobj, "AttributeName")
-        sobjattr.SetValue(name)
+    @pyqtSlot(list,dict)
+    def update_bolts_rows(self, ids:list, bolt_prop:dict):
+        self.update_bolts(bolt_prop, ids=ids)
 
-        #update viewer
-        salome.sg.updateObjBrowser()
+    def update_bolts(self, bolt_prop:dict, ids:list=None, filter=None):
+        """apply the same properties to a selection (ids) and/or a filter of bolts,
+        the study objects are renamed in one transaction and the object browser refreshed once"""
+        names = self.BoltsMgt.update_bolts(bolt_prop, ids=ids, filter=filter)
+        study_names = {self.BoltsMgt.get_bolt(id).sid: name for id, name in names.items() if self.BoltsMgt.get_bolt(id).sid}
+        rename_objects(study_names)
+        self.save_manifest()
+        return names
 
     @pyqtSlot(int)
     def delete_bolt(self, id:int):
@@ -390,20 +380,11 @@ class Bolt1D(QObject):
             logging.info(f"deleting bolt {id} {str(sid)}")
             Gst.removeFromStudy(sid)
             Gst.eraseShapeByEntry(sid)
+            self.save_manifest()
 
     @pyqtSlot(str,str)
     def write_files(self,file:str,export:str):
-        if self.BoltsMgt.bolts:
-            if export=="ASTER":
-                comm = MakeComm()
-                data = comm.process(self.BoltsMgt.bolts)
-                str_data = comm.to_str(data)
-                with open(file, 'w') as f:
-                    f.write(str_data)
-                
-            elif export=="RAW":
-                with open(file, 'w') as f:
-                    json.dump(self.BoltsMgt.bolts, f, default=lambda o: o.__dict__, indent=4)
+        write_bolt_files(self.BoltsMgt.bolts, file, export)
 
 class MyDockWidget(QDockWidget):
     widgetClosed = pyqtSignal()
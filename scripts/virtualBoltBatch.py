@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# Generate virtual bolt from geometry without GUI, ex:
+#   salome -t virtualBoltBatch.py args:--step,model.step,--comm,bolts.comm
+#   salome -t virtualBoltBatch.py args:--study,study.hdf,--entry,0:1:1:3,--method,HOLE,--save
+# License: LGPL v 3.0
+# Autor: Marc DUBOC
+# Version: 19/10/2026
+
+import os
+import sys
+import inspect
+import argparse
+import GEOM
+import salome
+
+script_directory = os.path.dirname(os.path.abspath(inspect.getfile(inspect.currentframe())))
+if script_directory not in sys.path:
+    sys.path.append(script_directory)
+
+salome.salome_init()
+from salome.geom import geomBuilder
+
+from common.tree import id_to_tuple, tuple_to_id
+from common.bolt.treeBolt import TreeBolt
+from common.bolt.data import BoltsManager
+from common.bolt.shape import Method, Parse, pair_screw_nut_threads, pair_holes, create_virtual_bolts
+from common.bolt.study import create_bolt_lines, read_manifest, write_manifest
+from common.bolt.cache import ParseCache
+from common.bolt.export import write_files
+from common import logging
+
+Geompy = geomBuilder.New()
+
+VB_FOLDER_NAME = "Virtual Bolts"
+
+
+def import_step(path:str) -> str:
+    """import a STEP file in the study and return the study entry of the compound"""
+    compound = Geompy.ImportSTEP(path)
+    return Geompy.addToStudy(compound, os.path.splitext(os.path.basename(path))[0])
+
+
+def get_parts(tree:TreeBolt, compound_entry:str) -> list:
+    """return the study entries of the solids and shells of a compound, published if needed"""
+    tree.parse_tree_objects(compound_entry)
+    parts = [p.get_sid() for p in tree.get_parts(type=[GEOM.SOLID,GEOM.SHELL])]
+    if parts:
+        return parts
+
+    compound = salome.IDToObject(compound_entry)
+    for t in (GEOM.SOLID, GEOM.SHELL):
+        for part in Geompy.SubShapeAll(compound, t):
+            parts.append(Geompy.addToStudyInFather(compound, part, f"part_{len(parts)+1}"))
+    return parts
+
+
+def run(entry:str=None, step:str=None, method:Method=Method.SCREW, d_min:float=3, d_max:float=36,
+        tol_angle:float=0.01, tol_dist:float=0.01, workers:int=4, study:bool=True,
+        json_file:str=None, comm_file:str=None, binary_file:str=None, cache:bool=True,
+        patterns:bool=True) -> BoltsManager:
+    """
+    create the virtual bolts of a compound
+
+    Args:
+        entry: study entry of the compound
+        step: STEP file, imported in the study if entry is None
+        method: Method.SCREW or Method.HOLE
+        d_min, d_max: diameter range of the fasteners
+        tol_angle, tol_dist: tolerances of the pairing
+        workers: number of workers of the parsing
+        study: create the bolt lines in the study
+        json_file, comm_file, binary_file: export files, not written if None
+        cache: use the persistent classification cache
+        patterns: classify one fastener per pattern
+
+    Returns:
+        BoltsManager with the existing and the new bolts
+    """
+    if entry is None:
+        if step is None:
+            raise ValueError("a compound entry or a STEP file is required")
+        entry = import_step(step)
+
+    # existing virtual bolts of the component keep their ids
+    bolts = BoltsManager()
+    root = tuple_to_id(id_to_tuple(entry)[:3])
+    root_tree = TreeBolt()
+    folder_sid = root_tree.get_bolt_folder(root, VB_FOLDER_NAME)
+    for b in root_tree.parse_for_bolt(root, manifest=read_manifest(folder_sid)):
+        bolts.add_bolt(b['prop'], b['id'])
+
+    parts = get_parts(TreeBolt(), entry)
+    logging.info(f"{len(parts)} parts in {entry}, {len(bolts)} existing bolts")
+
+    #1. parse
+    parse = Parse()
+    if cache:
+        parse.cache = ParseCache()
+    parsed = parse.parse_parts(parts, d_min, d_max, max_workers=workers, max_in_flight=2*workers, patterns=patterns)
+
+    #2. pair
+    if method == Method.SCREW:
+        connections = pair_screw_nut_threads(parsed['screws'], parsed['nuts'], parsed['threads'], tol_angle=tol_angle, tol_dist=tol_dist)
+    else:
+        connections = pair_holes(parsed['threads'], tol_angle=tol_angle, tol_dist=tol_dist)
+
+    #3. virtual bolts
+    new_bolts = [bolts.get_bolt(bolts.add_bolt(prop)) for _, _, prop in create_virtual_bolts(connections)]
+    logging.info(f"{len(new_bolts)} virtual bolts created")
+    print(f"{len(new_bolts)} virtual bolts created from {len(parts)} parts")
+
+    #4. outputs
+    if study and new_bolts:
+        folder = salome.IDToSObject(folder_sid) if folder_sid is not None else None
+        entries, folder = create_bolt_lines(new_bolts, folder=folder, folder_name=VB_FOLDER_NAME)
+        for b, e in zip(new_bolts, entries):
+            b.sid = e
+        write_manifest(folder.GetID(), bolts.bolts)
+
+    if json_file:
+        write_files(bolts.bolts, json_file, "RAW")
+    if comm_file:
+        write_files(bolts.bolts, comm_file, "ASTER")
+    if binary_file:
+        write_files(bolts.bolts, binary_file, "BINARY")
+
+    return bolts
+
+
+def main(argv:list=None):
+    parser = argparse.ArgumentParser(description="create the virtual bolts of a compound without GUI")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--entry", help="study entry of the compound")
+    source.add_argument("--step", help="STEP file to import")
+    parser.add_argument("--study", help="study (.hdf) to open before the processing")
+    parser.add_argument("--method", choices=[m.name for m in Method], default=Method.SCREW.name)
+    parser.add_argument("--dmin", type=float, default=3.0, help="minimum diameter")
+    parser.add_argument("--dmax", type=float, default=36.0, help="maximum diameter")
+    parser.add_argument("--tol-angle", type=float, default=0.01)
+    parser.add_argument("--tol-dist", type=float, default=0.01)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--json", help="RAW export file")
+    parser.add_argument("--comm", help="Code_Aster export file")
+    parser.add_argument("--binary", help="binary columnar export file")
+    parser.add_argument("--no-lines", action="store_true", help="do not create the bolt lines in the study")
+    parser.add_argument("--no-cache", action="store_true", help="do not use the classification cache")
+    parser.add_argument("--no-patterns", action="store_true", help="do not detect the bolt patterns")
+    parser.add_argument("--save", nargs="?", const="", help="save the study, in a new file if a path is given")
+    args = parser.parse_args(argv)
+
+    if args.study:
+        salome.myStudy.Open(args.study)
+
+    run(entry=args.entry,
+        step=args.step,
+        method=Method[args.method],
+        d_min=args.dmin,
+        d_max=args.dmax,
+        tol_angle=args.tol_angle,
+        tol_dist=args.tol_dist,
+        workers=args.workers,
+        study=not args.no_lines,
+        json_file=args.json,
+        comm_file=args.comm,
+        binary_file=args.binary,
+        cache=not args.no_cache,
+        patterns=not args.no_patterns)
+
+    if args.save is not None:
+        if args.save:
+            salome.myStudy.SaveAs(args.save, False, False)
+        else:
+            salome.myStudy.Save(False, False)
+
+
+if __name__ == "__main__":
+    main()